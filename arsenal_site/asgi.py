@@ -8,4 +8,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'arsenal_site.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# 103 Early Hints, если ASGI-сервер их поддерживает (landing/preload.py)
+from landing.preload import EarlyHintsMiddleware  # noqa: E402
+
+application = EarlyHintsMiddleware(django_application)
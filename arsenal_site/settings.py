@@ -50,14 +50,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'landing.middleware.RequestIdMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'landing.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'landing.middleware.PreloadMiddleware',
 ]
 
 ROOT_URLCONF = 'arsenal_site.urls'
@@ -73,6 +76,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'landing.context_processors.site_settings',
             ],
         },
     },
@@ -80,14 +84,80 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'arsenal_site.wsgi.application'
 
-# Database
+# Database: контент и заявки посетителей — разные файлы SQLite, чтобы
+# запись с сайта не блокировала базу контента (landing/routers.py).
+# Миграции: сначала python manage.py migrate --database=leads, затем migrate
+CONTENT_DB_PATH = BASE_DIR / 'db' / 'db.sqlite3'
+LEADS_DB_PATH = BASE_DIR / 'db' / 'leads.sqlite3'
+
+# WAL: чтение не ждёт записи; synchronous=NORMAL в режиме WAL не
+# нарушает целостность при сбое (теряется только последняя транзакция).
+# BEGIN IMMEDIATE: транзакция сразу берёт блокировку записи и ждёт её
+# timeout секунд, а не падает с "database is locked" посередине
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+SQLITE_WRITE_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; '
+        f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 10,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db' / 'db.sqlite3',
+        'NAME': CONTENT_DB_PATH,
+        'OPTIONS': SQLITE_WRITE_OPTIONS,
+    },
+    # Та же база контента только на чтение — для страниц сайта
+    'content_ro': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'{CONTENT_DB_PATH.as_uri()}?mode=ro',
+        'OPTIONS': {
+            'init_command': f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}',
+            'timeout': 10,
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+    # Заявки, счётчики скачиваний, сессии
+    'leads': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': LEADS_DB_PATH,
+        'OPTIONS': SQLITE_WRITE_OPTIONS,
+    },
+}
+DATABASE_ROUTERS = ['landing.routers.DatabaseRouter']
+
+# Cache (общий для всех воркеров gunicorn: версии контента, синглтоны)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'db' / 'cache')),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
     }
 }
 
+# Время жизни фрагментов секций (ключ меняется вместе с версией контента)
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '86400'))
+
+# Сколько секунд браузер использует фрагмент секции без перепроверки ETag
+SECTION_FRAGMENT_MAX_AGE = int(os.getenv('SECTION_FRAGMENT_MAX_AGE', '60'))
+
+# Галерея: снимков на странице и предел суммарного размера их миниатюр
+# (байт) — одна подгрузка не тянет больше этого объёма изображений
+GALLERY_PAGE_SIZE = int(os.getenv('GALLERY_PAGE_SIZE', '12'))
+GALLERY_PAGE_BYTES = int(os.getenv('GALLERY_PAGE_BYTES', str(400 * 1024)))
+
+# То же для ответов JSON API (/api/v1/...)
+API_CACHE_MAX_AGE = int(os.getenv('API_CACHE_MAX_AGE', '60'))
+
+# Поиск (/search/?q=...): длиннее строку запроса не разбираем
+SEARCH_MAX_QUERY_LENGTH = 100
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -116,12 +186,30 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Имена файлов с хэшем содержимого (nginx отдаёт /static/ как immutable).
+# С Django 5.1 хранилища задаются только через STORAGES
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Media files (uploaded documents, images)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Загрузка больших документов по частям (каталог на том же томе, что и MEDIA_ROOT)
+CHUNKED_UPLOAD_DIR = MEDIA_ROOT / '.uploads'
+CHUNKED_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY = 24 * 60 * 60
+# Файл документа, сохранённый или использованный повторно за последние
+# N секунд, не удаляется: ссылающийся на него документ ещё сохраняется
+DOCUMENT_RELEASE_GRACE = 60
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -134,6 +222,96 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@npo-arsenal.ru')
 CONTACT_EMAIL = os.getenv('CONTACT_EMAIL', 'npo.arsenal.info@mail.ru')
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '10'))
+
+# Уведомления о заявках (landing/notifications.py): 0 — письмо на каждую
+# заявку сразу, N — одно письмо-дайджест за N минут
+NOTIFY_DIGEST_MINUTES = int(os.getenv('NOTIFY_DIGEST_MINUTES', '0'))
+# Сколько секунд SMTP-соединение остаётся открытым без писем
+NOTIFY_SMTP_IDLE_TIMEOUT = int(os.getenv('NOTIFY_SMTP_IDLE_TIMEOUT', '60'))
+# Через сколько секунд заявку, забранную на отправку, но не отмеченную
+# отправленной (воркер перезапущен посреди отправки), забирает другой
+NOTIFY_CLAIM_TIMEOUT = int(os.getenv('NOTIFY_CLAIM_TIMEOUT', '300'))
+
+# Фильтр повторяющихся заявок (landing/spam.py)
+SPAM_FILTER_ENABLED = os.getenv('SPAM_FILTER_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# flag — повтор сохраняется с отметкой is_duplicate (виден в админке,
+# письмо не отправляется), reject — повтор получает «успех» без сохранения.
+# По умолчанию flag: фильтр ошибается и на части похожих настоящих заявок
+SPAM_FILTER_ACTION = os.getenv('SPAM_FILTER_ACTION', 'flag')
+# Окно в секундах: текст помнится от одного до двух окон
+SPAM_FILTER_WINDOW = int(os.getenv('SPAM_FILTER_WINDOW', str(24 * 3600)))
+# Сколько заявок за окно фильтр держит с расчётной точностью
+SPAM_FILTER_CAPACITY = int(os.getenv('SPAM_FILTER_CAPACITY', '10000'))
+# Файл фильтра, общий для воркеров (отображается в память)
+SPAM_FILTER_PATH = os.getenv('SPAM_FILTER_PATH', str(BASE_DIR / 'db' / 'spam-filter.bin'))
+
+# Logging: потоки запросов только кладут записи в очередь (landing/log.py),
+# в stdout пишет отдельный поток. JSON по умолчанию, text — для разработки
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text' if DEBUG else 'json')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'landing.log.RequestIdFilter'},
+        # Шумные события: в лог попадает каждое N-е (с полем sampled=N).
+        # Повторы заявок (landing.spam.duplicates) пишутся все
+        'sampling': {
+            '()': 'landing.log.SamplingFilter',
+            'rates': {
+                'landing.spam': int(os.getenv('LOG_SAMPLE_SPAM', '10')),
+                'landing.fragments': int(os.getenv('LOG_SAMPLE_FRAGMENTS', '100')),
+            },
+        },
+    },
+    'formatters': {
+        'json': {'()': 'landing.log.JsonFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'async': {
+            # '()' а не 'class': dictConfig (Python 3.12+) иначе сам собирает
+            # очередь и слушатель для подклассов QueueHandler
+            '()': 'landing.log.AsyncHandler',
+            'queue_size': LOG_QUEUE_SIZE,
+            'filters': ['request_id', 'sampling'],
+            'formatter': LOG_FORMAT,
+        },
+    },
+    'root': {
+        'handlers': ['async'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'django': {'handlers': ['async'], 'level': 'INFO', 'propagate': False},
+        'landing': {'handlers': ['async'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# Профилирование запросов (landing/profiling.py): заголовок X-Profile с
+# токеном из админки, ?_profile=1 для сотрудников или доля всех запросов
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True').lower() in ('true', '1', 'yes')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.001'))
+PROFILE_DIR = BASE_DIR / 'db' / 'profiles'
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '200'))
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+# Телеметрия памяти воркеров (landing/memory.py, /admin/memory/)
+MEMORY_TELEMETRY_ENABLED = os.getenv('MEMORY_TELEMETRY_ENABLED', 'True').lower() in ('true', '1', 'yes')
+MEMORY_TELEMETRY_INTERVAL = int(os.getenv('MEMORY_TELEMETRY_INTERVAL', '60'))
+# Точек истории на воркер (1440 при интервале 60 с — сутки)
+MEMORY_HISTORY = int(os.getenv('MEMORY_HISTORY', '1440'))
+# Глубина стека tracemalloc; 0 — выключен (замедляет воркер и расходует память)
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv('MEMORY_TRACEMALLOC_FRAMES', '0'))
+MEMORY_DIR = BASE_DIR / 'db' / 'memory'
+# Сколько файлов остановленных воркеров хранить
+MEMORY_MAX_FILES = int(os.getenv('MEMORY_MAX_FILES', '50'))
+# Бюджет памяти воркера, МБ — тот же, по которому gunicorn.conf.py считает воркеры
+MEMORY_WORKER_BUDGET_MB = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', '120'))
 
 # CSRF settings
 CSRF_COOKIE_HTTPONLY = False  # Allow JavaScript to read CSRF cookie
@@ -6,7 +6,16 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from landing.admin import memory_snapshot_view, memory_view, profile_detail_view, profile_list_view
+
 urlpatterns = [
+    # Страницы админки без модели — доступны только сотрудникам (admin_view)
+    path('admin/profiles/', admin.site.admin_view(profile_list_view), name='admin_profiles'),
+    path('admin/profiles/<slug:profile_id>/', admin.site.admin_view(profile_detail_view),
+         name='admin_profile'),
+    path('admin/memory/', admin.site.admin_view(memory_view), name='admin_memory'),
+    path('admin/memory/<slug:label>/', admin.site.admin_view(memory_snapshot_view),
+         name='admin_memory_snapshot'),
     path('admin/', admin.site.urls),
     path('', include('landing.urls')),
 ]
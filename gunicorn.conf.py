@@ -0,0 +1,94 @@
+"""
+Конфигурация gunicorn для лендинга "Птицелов"
+
+Приложение загружается в мастер-процессе (preload_app) и прогревается
+до fork, воркеры после fork загружают кэши контента.
+
+Число воркеров и потоков подбирается по доступным CPU и памяти
+(с учётом лимитов cgroup в Docker). Любой параметр можно переопределить
+переменными окружения GUNICORN_*.
+"""
+import os
+
+# Оценка памяти одного воркера (Django + кэши), МБ
+WORKER_MEMORY_MB = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', '120'))
+# Память, которую оставляем системе и nginx, МБ
+RESERVED_MEMORY_MB = int(os.getenv('GUNICORN_RESERVED_MEMORY_MB', '256'))
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_count():
+    """Число доступных CPU с учётом affinity и квоты cgroup v2"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    quota = _read('/sys/fs/cgroup/cpu.max')
+    if quota and not quota.startswith('max'):
+        limit, period = quota.split()
+        count = min(count, max(1, int(limit) // int(period)))
+    return count
+
+
+def available_memory_mb():
+    """Доступная память: лимит cgroup (v2/v1) или MemAvailable хоста"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        value = _read(path)
+        if value and value.isdigit() and int(value) < 1 << 60:
+            return int(value) // (1024 * 1024)
+    meminfo = _read('/proc/meminfo') or ''
+    for line in meminfo.splitlines():
+        if line.startswith('MemAvailable:'):
+            return int(line.split()[1]) // 1024
+    return None
+
+
+def default_workers(cpus, threaded):
+    # Для потоковых воркеров хватает процесса на ядро, sync — классика 2*CPU+1
+    workers = cpus + 1 if threaded else 2 * cpus + 1
+    memory = available_memory_mb()
+    if memory is not None:
+        workers = min(workers, (memory - RESERVED_MEMORY_MB) // WORKER_MEMORY_MB)
+    return max(1, workers)
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# gthread — для I/O-bound запросов (капча, SMTP): пока один поток ждёт
+# внешний сервис, остальные потоки воркера обслуживают страницы
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '4')) if worker_class == 'gthread' else 1
+workers = int(os.getenv('GUNICORN_WORKERS', '0')) or default_workers(cpu_count(), worker_class == 'gthread')
+
+# Таймауты согласованы с proxy_read_timeout 30s в nginx
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Плавный перезапуск воркеров после N запросов (0 — отключено)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# Heartbeat-файлы воркеров в памяти, а не на overlayfs контейнера
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+# Django, views и шаблоны загружаются один раз и разделяются воркерами (copy-on-write)
+preload_app = True
+
+
+def when_ready(server):
+    server.log.info('Workers: %s x %s (%s), max_requests=%s', workers, threads, worker_class, max_requests)
+    from landing.warmup import preload
+    preload()
+
+
+def post_fork(server, worker):
+    from landing.warmup import warm_up
+    warm_up()
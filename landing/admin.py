@@ -1,20 +1,41 @@
 """
 Django Admin конфигурация для лендинга "Птицелов"
 """
-from django.contrib import admin
+import json
+import re
+import time
+import zlib
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.html import format_html
 from .models import (
     DocumentCategory, Document, Feature, 
     SpecificationGroup, Specification, 
-    GalleryImage, ContactRequest, SiteSettings,
+    GalleryImage, ContactRequest, DownloadCounter, SiteSettings,
     SoftwarePlatform, SoftwareModule, HardwareInterface, DevelopmentPlan
 )
+from .forms import DocumentAdminForm
+from .memory import (
+    diff_allocators, growth_per_request, list_snapshots, list_workers, load_snapshot,
+    polyline, request_snapshot, top_allocators,
+)
+from .profiling import flame_graph, list_profiles, load_profile, make_token, top_functions
+from .uploads import UploadError, append_chunk, complete_upload, create_upload, finish_upload, get_upload
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
 
 
 # Кастомизация заголовков админки
 admin.site.site_header = 'НПО Арсенал — Управление сайтом'
 admin.site.site_title = 'Арсенал Admin'
 admin.site.index_title = 'Панель управления'
+admin.site.index_template = 'admin/landing/index.html'
 
 
 @admin.register(DocumentCategory)
@@ -29,8 +50,19 @@ class DocumentCategoryAdmin(admin.ModelAdmin):
     documents_count.short_description = 'Документов'
 
 
+class DocumentChangeList(ChangeList):
+    """Счётчики скачиваний страницы списка — одним запросом к базе заявок"""
+
+    def get_results(self, request):
+        super().get_results(request)
+        counts = DownloadCounter.counts([document.pk for document in self.result_list])
+        for document in self.result_list:
+            document.downloads = counts.get(document.pk, 0)
+
+
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
+    form = DocumentAdminForm
     list_display = ['title', 'category', 'file_size_display', 'download_count', 'uploaded_at', 'is_active']
     list_filter = ['category', 'is_active', 'uploaded_at']
     list_editable = ['is_active']
@@ -40,7 +72,7 @@ class DocumentAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Основное', {
-            'fields': ('category', 'title', 'description', 'file')
+            'fields': ('category', 'title', 'description', 'file', 'chunked_upload')
         }),
         ('Статистика', {
             'fields': ('download_count', 'uploaded_at', 'file_size_display'),
@@ -51,9 +83,86 @@ class DocumentAdmin(admin.ModelAdmin):
         }),
     )
     
+    class Media:
+        js = ('js/admin_chunked_upload.js',)
+    
+    def get_changelist(self, request, **kwargs):
+        return DocumentChangeList
+    
     def file_size_display(self, obj):
         return obj.file_size
     file_size_display.short_description = 'Размер файла'
+    
+    def download_count(self, obj):
+        if not obj.pk:
+            return 0
+        if not hasattr(obj, 'downloads'):
+            obj.downloads = DownloadCounter.counts([obj.pk]).get(obj.pk, 0)
+        return obj.downloads
+    download_count.short_description = 'Количество скачиваний'
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        upload = form.cleaned_data.get('chunked_upload')
+        if upload:
+            finish_upload(upload['id'])
+    
+    # ---------- Загрузка больших файлов по частям ----------
+    
+    def get_urls(self):
+        return [
+            path('upload/', self.admin_site.admin_view(self.upload_start_view),
+                 name='landing_document_upload'),
+            path('upload/<str:upload_id>/', self.admin_site.admin_view(self.upload_chunk_view),
+                 name='landing_document_upload_chunk'),
+        ] + super().get_urls()
+    
+    def _check_upload_permission(self, request):
+        if not (self.has_add_permission(request) or self.has_change_permission(request)):
+            raise PermissionDenied
+    
+    def upload_start_view(self, request):
+        """POST {filename, size} — начать загрузку"""
+        self._check_upload_permission(request)
+        if request.method != 'POST':
+            return JsonResponse({'error': 'Метод не поддерживается'}, status=405)
+        try:
+            data = json.loads(request.body)
+            return JsonResponse(create_upload(str(data['filename']), int(data['size'])))
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': 'Некорректный запрос'}, status=400)
+        except UploadError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+    
+    def upload_chunk_view(self, request, upload_id):
+        """
+        GET — текущее смещение (для возобновления);
+        PUT с заголовком Content-Range — очередная часть файла.
+        """
+        self._check_upload_permission(request)
+        try:
+            if request.method == 'GET':
+                return JsonResponse(get_upload(upload_id))
+            if request.method != 'PUT':
+                return JsonResponse({'error': 'Метод не поддерживается'}, status=405)
+            
+            match = CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+            if not match:
+                return JsonResponse({'error': 'Нужен заголовок Content-Range'}, status=400)
+            start, end = int(match.group(1)), int(match.group(2))
+            length = end - start + 1
+            if length <= 0 or int(request.headers.get('Content-Length') or 0) != length:
+                return JsonResponse({'error': 'Размер части не совпадает с Content-Range'}, status=400)
+            
+            # Тело читается из потока запроса блоками, а не через request.body
+            offset = append_chunk(upload_id, start, request, length)
+            upload = get_upload(upload_id)
+            if offset == upload['size']:
+                complete_upload(upload_id, self.model._meta.get_field('file').upload_to)
+                upload = get_upload(upload_id)
+            return JsonResponse(upload)
+        except UploadError as e:
+            return JsonResponse({'error': str(e), 'offset': e.offset}, status=e.status)
 
 
 @admin.register(Feature)
@@ -96,10 +205,12 @@ class GalleryImageAdmin(admin.ModelAdmin):
     ordering = ['order']
     
     def image_preview(self, obj):
-        if obj.image:
+        # Миниатюра WebP вместо оригинала — список не тянет полноразмерные снимки
+        preview = obj.thumbnail or obj.image
+        if preview:
             return format_html(
                 '<img src="{}" style="max-height: 50px; max-width: 100px; object-fit: cover;"/>',
-                obj.image.url
+                preview.url
             )
         return "—"
     image_preview.short_description = 'Превью'
@@ -107,11 +218,11 @@ class GalleryImageAdmin(admin.ModelAdmin):
 
 @admin.register(ContactRequest)
 class ContactRequestAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'phone', 'company', 'created_at', 'is_processed']
-    list_filter = ['is_processed', 'created_at']
+    list_display = ['name', 'email', 'phone', 'company', 'created_at', 'is_duplicate', 'is_processed']
+    list_filter = ['is_processed', 'is_duplicate', 'created_at']
     list_editable = ['is_processed']
     search_fields = ['name', 'email', 'phone', 'company', 'message']
-    readonly_fields = ['name', 'email', 'phone', 'company', 'message', 'created_at']
+    readonly_fields = ['name', 'email', 'phone', 'company', 'message', 'created_at', 'notified_at', 'is_duplicate']
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
     
@@ -120,7 +231,7 @@ class ContactRequestAdmin(admin.ModelAdmin):
             'fields': ('name', 'email', 'phone', 'company')
         }),
         ('Сообщение', {
-            'fields': ('message', 'created_at')
+            'fields': ('message', 'created_at', 'notified_at', 'is_duplicate')
         }),
         ('Обработка', {
             'fields': ('is_processed', 'notes')
@@ -227,3 +338,163 @@ class DevelopmentPlanAdmin(admin.ModelAdmin):
             'fields': ('order', 'is_active')
         }),
     )
+
+
+# ============================================
+# Профили запросов (landing/profiling.py)
+# ============================================
+
+FLAME_WIDTH = 1200
+FLAME_ROW_HEIGHT = 18
+
+
+def _flame_color(label):
+    # Код приложения — холодные цвета, библиотеки и Django — тёплые
+    hue = zlib.crc32(label.encode()) % 50
+    if label.split('(', 1)[-1].startswith('landing'):
+        return f'hsl({190 + hue}, 60%, 60%)'
+    return f'hsl({hue}, 75%, 60%)'
+
+
+def profile_list_view(request):
+    """Список сохранённых профилей и токен для заголовка X-Profile"""
+    context = dict(
+        admin.site.each_context(request),
+        title='Профили запросов',
+        profiles=list_profiles(),
+        token=make_token(request.user),
+    )
+    return TemplateResponse(request, 'admin/landing/profiles.html', context)
+
+
+def profile_detail_view(request, profile_id):
+    """Flame graph и самые затратные функции одного профиля"""
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise Http404('Профиль не найден')
+    stacks = profile['stacks']
+
+    if request.GET.get('format') == 'folded':
+        # Для speedscope / flamegraph.pl
+        response = HttpResponse(
+            ''.join(f'{stack} {count}\n' for stack, count in stacks.items()),
+            content_type='text/plain; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{profile_id}.folded"'
+        return response
+
+    total = sum(stacks.values()) or 1
+    rects = [
+        dict(
+            rect,
+            left=round(rect['x'] * FLAME_WIDTH, 2),
+            top=rect['depth'] * FLAME_ROW_HEIGHT,
+            width_px=round(rect['width'] * FLAME_WIDTH, 2),
+            percent=round(rect['width'] * 100, 1),
+            fill=_flame_color(rect['label']),
+        )
+        for rect in flame_graph(stacks)
+    ]
+    depth = max((rect['depth'] for rect in rects), default=0) + 1
+    top = [
+        {
+            'name': name, 'own': own, 'total': count,
+            'own_percent': round(own * 100 / total, 1),
+            'total_percent': round(count * 100 / total, 1),
+        }
+        for name, own, count in top_functions(stacks)
+    ]
+    context = dict(
+        admin.site.each_context(request),
+        title=f'Профиль {profile["method"]} {profile["path"]}',
+        profile=profile,
+        rects=rects,
+        flame_width=FLAME_WIDTH,
+        flame_height=depth * FLAME_ROW_HEIGHT,
+        row_height=FLAME_ROW_HEIGHT - 1,
+        top=top,
+    )
+    return TemplateResponse(request, 'admin/landing/profile_detail.html', context)
+
+
+# ============================================
+# Память воркеров (landing/memory.py)
+# ============================================
+
+SPARKLINE_WIDTH = 160
+SPARKLINE_HEIGHT = 24
+
+
+def memory_view(request):
+    """Память, сборщик мусора и рост на запрос по воркерам; запрос снимка tracemalloc"""
+    if request.method == 'POST':
+        label = request_snapshot()
+        messages.success(request, f'Снимок {label} запрошен — воркеры сохранят его в течение нескольких секунд')
+        return HttpResponseRedirect(reverse('admin_memory'))
+
+    workers = list_workers()
+    snapshots = list_snapshots()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'workers': workers, 'snapshots': snapshots})
+
+    budget = settings.MEMORY_WORKER_BUDGET_MB * 1024 * 1024
+    now = time.time()
+    rows = []
+    for worker in workers:
+        history = worker.get('history', [])
+        growth = growth_per_request(history)
+        uss = worker['memory'].get('uss')
+        rows.append(dict(
+            worker,
+            uptime_hours=round((now - worker['started']) / 3600, 1),
+            growth_kb=round(growth * 1000 / 1024, 1) if growth is not None else None,
+            # Сколько ещё запросов до бюджета памяти при текущем росте
+            headroom=int((budget - uss) / growth) if growth and growth > 0 and uss else None,
+            sparkline=polyline([point[3] for point in history], SPARKLINE_WIDTH, SPARKLINE_HEIGHT),
+        ))
+    context = dict(
+        admin.site.each_context(request),
+        title='Память воркеров',
+        workers=rows,
+        # (метка, предыдущая метка) — для ссылки «разница с предыдущим»
+        snapshots=list(zip(snapshots, snapshots[1:] + [None])),
+        tracing=bool(settings.MEMORY_TRACEMALLOC_FRAMES),
+        interval=settings.MEMORY_TELEMETRY_INTERVAL,
+        budget_mb=settings.MEMORY_WORKER_BUDGET_MB,
+        sparkline_width=SPARKLINE_WIDTH,
+        sparkline_height=SPARKLINE_HEIGHT,
+    )
+    return TemplateResponse(request, 'admin/landing/memory.html', context)
+
+
+def memory_snapshot_view(request, label):
+    """Самые крупные места выделения памяти в снимке или разница с более ранним (?compare=)"""
+    workers = load_snapshot(label)
+    if workers is None:
+        raise Http404('Снимок не найден')
+    compare = request.GET.get('compare')
+    old_workers = load_snapshot(compare) if compare else None
+    if compare and old_workers is None:
+        raise Http404('Снимок для сравнения не найден')
+
+    rows = []
+    for pid, (report, snapshot) in sorted(workers.items()):
+        row = dict(report, traced=snapshot is not None)
+        if old_workers and pid in old_workers:
+            old_report = old_workers[pid][0]
+            row['requests_diff'] = report['requests'] - old_report['requests']
+            row['uss_diff'] = report['memory'].get('uss', 0) - old_report['memory'].get('uss', 0)
+        rows.append(row)
+
+    context = dict(
+        admin.site.each_context(request),
+        title=f'Снимок памяти {label}' + (f' против {compare}' if compare else ''),
+        label=label,
+        compare=compare,
+        workers=rows,
+        tracing=any(snapshot is not None for _, snapshot in workers.values()),
+        snapshots=[other for other in list_snapshots() if other < label],
+        top=top_allocators(workers) if old_workers is None else None,
+        diff=diff_allocators(old_workers, workers) if old_workers is not None else None,
+    )
+    return TemplateResponse(request, 'admin/landing/memory_snapshot.html', context)
@@ -0,0 +1,157 @@
+"""
+JSON API контента лендинга "Птицелов" (только чтение)
+
+Ответ каждого ресурса — готовый снимок: JSON и его gzip-версия
+сериализуются один раз на версию контента, а не на каждый запрос.
+Снимки хранятся в памяти процесса и в общем кэше, поэтому после смены
+версии данные сериализует только один воркер.
+"""
+import gzip
+import hashlib
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import (
+    DocumentCategory, Document,
+    SpecificationGroup, Specification,
+    SoftwareModule, HardwareInterface, DevelopmentPlan
+)
+from .versioning import get_versions
+
+API_VERSION = 1
+SNAPSHOT_KEY_PREFIX = 'landing:api:'
+
+# etag — хэш тела ответа, body — компактный JSON, gzipped — он же в gzip
+Snapshot = namedtuple('Snapshot', 'version etag body gzipped')
+
+# Локальные снимки процесса: ресурс -> Snapshot
+_snapshots = {}
+
+
+def serialize_specs():
+    return [
+        {
+            'name': group.name,
+            'specifications': [
+                {'name': spec.name, 'value': spec.value}
+                for spec in group.specifications.all()
+            ],
+        }
+        for group in SpecificationGroup.objects.prefetch_related('specifications')
+    ]
+
+
+def serialize_software_modules():
+    return [
+        {
+            'id': module.pk,
+            'title': module.title,
+            'icon': module.icon,
+            'description': module.description,
+            'tech_details': module.tech_details,
+        }
+        for module in SoftwareModule.objects.filter(is_active=True)
+    ]
+
+
+def serialize_hardware_interfaces():
+    return [
+        {'name': iface.name, 'value': iface.value}
+        for iface in HardwareInterface.objects.filter(is_active=True)
+    ]
+
+
+def serialize_roadmap():
+    return [
+        {
+            'id': plan.pk,
+            'title': plan.title,
+            'description': plan.description,
+            'status': plan.status,
+            'status_display': plan.get_status_display(),
+        }
+        for plan in DevelopmentPlan.objects.filter(is_active=True)
+    ]
+
+
+def serialize_documents():
+    documents = Document.objects.filter(is_active=True).select_related('category')
+    items = []
+    for document in documents:
+        try:
+            size = document.file.size
+        except (FileNotFoundError, ValueError):
+            size = None
+        items.append({
+            'id': document.pk,
+            'title': document.title,
+            'description': document.description,
+            'category': {'slug': document.category.slug, 'name': document.category.name},
+            'extension': document.file_extension,
+            'size': size,
+            'uploaded_at': document.uploaded_at.isoformat(),
+            'url': reverse('landing:document_download', args=[document.pk]),
+            'preview': document.preview.url if document.preview else None,
+        })
+    return items
+
+
+# Ресурс -> (модели, от которых он зависит; функция сериализации)
+API_RESOURCES = {
+    'specs': ((SpecificationGroup, Specification), serialize_specs),
+    'software-modules': ((SoftwareModule,), serialize_software_modules),
+    'hardware-interfaces': ((HardwareInterface,), serialize_hardware_interfaces),
+    'roadmap': ((DevelopmentPlan,), serialize_roadmap),
+    'documents': ((DocumentCategory, Document), serialize_documents),
+}
+
+# Все ресурсы одним ответом — для полной синхронизации
+ALL_RESOURCES = 'all'
+
+
+def resource_version(resource):
+    """Версия ресурса по версиям его моделей (одно обращение к кэшу)"""
+    if resource == ALL_RESOURCES:
+        models = [model for deps, _ in API_RESOURCES.values() for model in deps]
+    else:
+        models = API_RESOURCES[resource][0]
+    return '.'.join(str(v) for v in get_versions(models))
+
+
+def _encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _build_snapshot(resource, version):
+    if resource == ALL_RESOURCES:
+        # Склеиваем уже сериализованные ресурсы, не разбирая их заново
+        parts = [
+            _encode(name) + b':' + get_snapshot(name).body
+            for name in API_RESOURCES
+        ]
+        body = b'{"api_version":%d,' % API_VERSION + b','.join(parts) + b'}'
+    else:
+        body = _encode(API_RESOURCES[resource][1]())
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    # mtime=0 — одинаковые данные дают одинаковые байты во всех воркерах
+    return Snapshot(version, etag, body, gzip.compress(body, compresslevel=9, mtime=0))
+
+
+def get_snapshot(resource):
+    """Снимок ресурса для текущей версии контента"""
+    version = resource_version(resource)
+    snapshot = _snapshots.get(resource)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    key = f'{SNAPSHOT_KEY_PREFIX}{resource}:{version}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _build_snapshot(resource, version)
+        cache.set(key, snapshot, settings.FRAGMENT_CACHE_TIMEOUT)
+    _snapshots[resource] = snapshot
+    return snapshot
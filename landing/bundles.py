@@ -0,0 +1,103 @@
+"""
+Потоковые ZIP-архивы документов категории
+
+Архив собирается на лету из частей файлов: без временных файлов и без
+хранения архива в памяти. Документы уже сжаты (PDF, DOCX, XLSX),
+поэтому файлы кладутся в архив без сжатия (ZIP_STORED).
+"""
+import hashlib
+import io
+import os
+import zipfile
+
+from django.utils import timezone
+
+BUNDLE_CHUNK_SIZE = 256 * 1024
+
+
+class ZipStreamSink(io.RawIOBase):
+    """
+    Приёмник для zipfile без seek: копит записанные байты до выгрузки.
+
+    zipfile видит, что поток не поддерживает seek, и пишет размеры и CRC
+    в data descriptor после каждого файла.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def bundle_entries(documents):
+    """Список (документ, имя в архиве, размер) для файлов, которые есть на диске"""
+    entries = []
+    used_names = set()
+    for document in documents:
+        try:
+            size = document.file.size
+        except (FileNotFoundError, ValueError):
+            continue
+        base, ext = os.path.splitext(document.download_filename)
+        arcname, n = document.download_filename, 1
+        while arcname in used_names:
+            n += 1
+            arcname = f'{base} ({n}){ext}'
+        used_names.add(arcname)
+        entries.append((document, arcname, size))
+    return entries
+
+
+def bundle_version(entries):
+    """
+    Версия архива по его содержимому.
+
+    Файлы названы по хэшу содержимого, поэтому имена файлов и имена в
+    архиве однозначно определяют байты архива.
+    """
+    digest = hashlib.sha256()
+    for document, arcname, size in entries:
+        digest.update(f'{arcname}\0{document.file.name}\0{document.uploaded_at.isoformat()}\n'.encode())
+    return digest.hexdigest()[:32]
+
+
+def stream_bundle(entries, chunk_size=BUNDLE_CHUNK_SIZE):
+    """Генератор частей ZIP-архива"""
+    sink = ZipStreamSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for document, arcname, size in entries:
+            uploaded = timezone.localtime(document.uploaded_at)
+            info = zipfile.ZipInfo(arcname, date_time=uploaded.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            # Известный заранее размер позволяет zipfile включить ZIP64 только при необходимости
+            info.file_size = size
+            with document.file.open('rb') as src, archive.open(info, 'w') as dest:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Центральный каталог записывается при закрытии архива
+    yield sink.drain()
@@ -0,0 +1,251 @@
+"""
+Перенос контента лендинга "Птицелов" между окружениями
+
+Пакет контента — все модели CONTENT_MODELS (заявки ContactRequest —
+персональные данные, в пакет не входят). Формат — JSON или NDJSON:
+
+    {"format": "landing-content", "version": 1}
+    {"model": "landing.feature", "pk": 1, "title": "…", "order": 1, …}
+
+Внешние ключи — pk связанной записи, файлы — имя в хранилище (сами
+файлы переносятся отдельно, импорт только проверяет, что они есть).
+
+Импорт сравнивает пакет с БД по pk и применяет разницу одной
+транзакцией: bulk_create, bulk_update только изменённых полей и
+удаление записей, которых нет в пакете. Массовые операции не вызывают
+post_save, поэтому версии контента и поисковый индекс обновляются
+явно (finish_bulk_changes).
+"""
+import json
+from collections import namedtuple
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+
+from . import search
+from .signals import CONTENT_MODELS, VOLATILE_FIELDS, bulk_changes, release_document_file
+from .models import Document
+from .versioning import bump_version
+
+BUNDLE_FORMAT = 'landing-content'
+BUNDLE_VERSION = 1
+BATCH_SIZE = 500
+
+
+class BundleError(Exception):
+    pass
+
+
+# Изменения одной модели: новые объекты; изменённые объекты и поля для bulk_update;
+# pk на удаление; прежние имена заменённых файлов
+ModelDiff = namedtuple('ModelDiff', 'model create update update_fields delete replaced_files')
+
+
+def bundle_fields(model):
+    """
+    Поля модели в пакете: все конкретные поля, кроме pk, служебных
+    счётчиков (VOLATILE_FIELDS) и автоматических дат — их значения
+    в каждом окружении свои.
+    """
+    volatile = VOLATILE_FIELDS.get(model, set())
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+        and field.name not in volatile
+        and not getattr(field, 'auto_now', False)
+        and not getattr(field, 'auto_now_add', False)
+    ]
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+# ==================== ЭКСПОРТ ====================
+
+def export_rows(model):
+    """Строки модели для пакета (одним запросом)"""
+    fields = bundle_fields(model)
+    label = _label(model)
+    attnames = [field.attname for field in fields]
+    for pk, *values in model._default_manager.order_by('pk').values_list('pk', *attnames):
+        row = {'model': label, 'pk': pk}
+        row.update(zip((field.name for field in fields), values))
+        yield row
+
+
+def write_bundle(stream, ndjson=False):
+    """Записать пакет в текстовый поток, вернуть {модель: число записей}"""
+    header = {'format': BUNDLE_FORMAT, 'version': BUNDLE_VERSION}
+    counts = {}
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    if ndjson:
+        stream.write(encoder.encode(header) + '\n')
+        for model in CONTENT_MODELS:
+            counts[_label(model)] = 0
+            for row in export_rows(model):
+                stream.write(encoder.encode(row) + '\n')
+                counts[_label(model)] += 1
+    else:
+        rows = [row for model in CONTENT_MODELS for row in export_rows(model)]
+        for row in rows:
+            counts[row['model']] = counts.get(row['model'], 0) + 1
+        stream.write(encoder.encode(dict(header, rows=rows)))
+    return counts
+
+
+# ==================== ИМПОРТ ====================
+
+def read_bundle(stream):
+    """Строки пакета {модель: [строки]} из JSON или NDJSON"""
+    text = stream.read()
+    try:
+        data = json.loads(text)
+        header, rows = data, data.get('rows', [])
+    except ValueError:
+        # Не один JSON-документ — значит NDJSON: заголовок и строка на запись
+        try:
+            lines = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except ValueError as e:
+            raise BundleError(f'Некорректный JSON: {e}')
+        header, rows = (lines[0], lines[1:]) if lines else ({}, [])
+    if not isinstance(header, dict):
+        raise BundleError('Некорректный пакет')
+
+    if header.get('format') != BUNDLE_FORMAT or header.get('version') != BUNDLE_VERSION:
+        raise BundleError(f'Не пакет контента {BUNDLE_FORMAT} v{BUNDLE_VERSION}')
+
+    labels = {_label(model) for model in CONTENT_MODELS}
+    by_model = {}
+    for row in rows:
+        if row.get('model') not in labels or 'pk' not in row:
+            raise BundleError(f'Неизвестная модель или нет pk: {str(row)[:100]}')
+        by_model.setdefault(row['model'], []).append(row)
+    return by_model
+
+
+def diff_model(model, rows, delete_missing=True):
+    """Сравнить строки пакета с таблицей модели (один SELECT)"""
+    fields = bundle_fields(model)
+    attnames = [field.attname for field in fields]
+    current = {
+        pk: values for pk, *values
+        in model._default_manager.values_list('pk', *attnames)
+    }
+
+    create, update, update_fields, replaced_files = [], [], set(), []
+    seen = set()
+    for row in rows:
+        pk = model._meta.pk.to_python(row['pk'])
+        seen.add(pk)
+        try:
+            values = [
+                field.to_python(row[field.name]) if field.name in row else field.get_default()
+                for field in fields
+            ]
+        except Exception as e:
+            raise BundleError(f'{_label(model)} pk={pk}: {e}')
+        if pk not in current:
+            create.append(model(pk=pk, **dict(zip(attnames, values))))
+            continue
+        changed = [
+            (field, old) for field, old, new in zip(fields, current[pk], values)
+            if old != new
+        ]
+        if changed:
+            update.append(model(pk=pk, **dict(zip(attnames, values))))
+            update_fields.update(field.name for field, _ in changed)
+            replaced_files += [
+                old for field, old in changed if isinstance(field, models.FileField) and old
+            ]
+
+    delete = sorted(set(current) - seen) if delete_missing else []
+    return ModelDiff(model, create, update, sorted(update_fields), delete, replaced_files)
+
+
+def file_references(diffs):
+    """(поле, имя файла) всех файлов, на которые ссылаются новые и изменённые записи"""
+    for diff in diffs:
+        for field in bundle_fields(diff.model):
+            if isinstance(field, models.FileField):
+                for obj in diff.create + diff.update:
+                    name = getattr(obj, field.attname)
+                    if name:
+                        yield field, str(name)
+
+
+def missing_files(diffs):
+    return sorted({
+        name for field, name in file_references(diffs)
+        if not field.storage.exists(name)
+    })
+
+
+def diff_bundle(by_model, delete_missing=True):
+    """Разница для всех моделей, в порядке CONTENT_MODELS (родители раньше детей)"""
+    return [
+        diff_model(model, by_model.get(_label(model), []), delete_missing)
+        for model in CONTENT_MODELS
+        if _label(model) in by_model or delete_missing
+    ]
+
+
+def apply_diff(diffs):
+    """
+    Применить разницу одной транзакцией: создание и обновление от
+    родителей к детям, удаление — от детей к родителям (документ,
+    перенесённый в другую категорию, уже обновлён, и каскад его не
+    заденет).
+    """
+    with transaction.atomic(), bulk_changes():
+        for diff in diffs:
+            if diff.create:
+                diff.model._default_manager.bulk_create(diff.create, batch_size=BATCH_SIZE)
+            if diff.update:
+                diff.model._default_manager.bulk_update(
+                    diff.update, diff.update_fields, batch_size=BATCH_SIZE
+                )
+        # Записи созданы с явными pk — счётчики автоинкремента (PostgreSQL) сдвигаем за них
+        created = [diff.model for diff in diffs if diff.create]
+        if created:
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), created):
+                    cursor.execute(sql)
+        for diff in reversed(diffs):
+            if diff.delete:
+                # delete() по queryset отправляет post_delete — файлы документов освобождаются
+                diff.model._default_manager.filter(pk__in=diff.delete).delete()
+        for diff in diffs:
+            if diff.model is Document:
+                for name in diff.replaced_files:
+                    transaction.on_commit(lambda name=name: release_document_file(name))
+        finish_bulk_changes([
+            diff.model for diff in diffs if diff.create or diff.update or diff.delete
+        ])
+
+
+def seed_missing(model, key, rows):
+    """
+    Создать записи из rows, которых ещё нет (сравнение по полю key):
+    один SELECT и один bulk_create вместо get_or_create на строку.
+    Возвращает созданные объекты.
+    """
+    existing = set(model._default_manager.filter(
+        **{f'{key}__in': [row[key] for row in rows]}
+    ).values_list(key, flat=True))
+    missing = [model(**row) for row in rows if row[key] not in existing]
+    return model._default_manager.bulk_create(missing, batch_size=BATCH_SIZE)
+
+
+def finish_bulk_changes(changed_models):
+    """
+    То, что для одиночных save() делают сигналы: новые версии моделей
+    (после коммита) и поисковый индекс (в той же транзакции).
+    """
+    if not changed_models:
+        return
+    for model in changed_models:
+        transaction.on_commit(lambda model=model: bump_version(model))
+    if search.is_available():
+        search.rebuild()
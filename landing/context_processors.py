@@ -0,0 +1,11 @@
+"""
+Context processors для лендинга "Птицелов"
+"""
+from django.utils.functional import SimpleLazyObject
+
+from .models import SiteSettings
+
+
+def site_settings(request):
+    """Настройки сайта в каждом шаблоне (загружаются при первом обращении)"""
+    return {'settings': SimpleLazyObject(SiteSettings.get_settings)}
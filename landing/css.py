@@ -0,0 +1,60 @@
+"""
+Разбор CSS для сборочных команд (vendor_assets, build_critical_css)
+
+Это не полноценный парсер: его хватает для style.css и минифицированных
+стилей библиотек — блоки верхнего уровня, вложенные @media, списки
+селекторов и имена анимаций.
+"""
+import re
+
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+PSEUDO_RE = re.compile(r'::?[\w-]+(\([^)]*\))?')
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+CLASS_RE = re.compile(r'\.([\w-]+)')
+ID_RE = re.compile(r'#([\w-]+)')
+TAG_RE = re.compile(r'(?:^|[\s>+~])([a-z][a-z0-9]*)')
+ANIMATION_RE = re.compile(r'animation(?:-name)?\s*:\s*([^;]+)')
+
+
+def strip_comments(css):
+    return COMMENT_RE.sub('', css)
+
+
+def css_blocks(css):
+    """Блоки CSS верхнего уровня: (селектор или @-правило, содержимое)"""
+    depth, start, prelude = 0, 0, ''
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude, start = css[start:i].strip(), i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[start:i]
+                start = i + 1
+
+
+def split_selectors(prelude):
+    return [selector.strip() for selector in prelude.split(',') if selector.strip()]
+
+
+def selector_tokens(selector):
+    """
+    Теги, классы и id, которые должны быть в документе, чтобы селектор
+    мог совпасть. Псевдоклассы (с аргументами) и атрибуты не учитываются.
+    """
+    selector = ATTRIBUTE_RE.sub('', PSEUDO_RE.sub('', selector))
+    return (
+        set(TAG_RE.findall(selector)),
+        set(CLASS_RE.findall(selector)),
+        set(ID_RE.findall(selector)),
+    )
+
+
+def animation_names(body):
+    """Имена, упомянутые в animation / animation-name (кандидаты в @keyframes)"""
+    names = set()
+    for value in ANIMATION_RE.findall(body):
+        names.update(re.findall(r'[A-Za-z_][\w-]*', value))
+    return names
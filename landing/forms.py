@@ -1,8 +1,15 @@
 """
 Формы для лендинга "Птицелов"
 """
+import os
+
 from django import forms
-from .models import ContactRequest
+from django.conf import settings
+from django.urls import reverse
+
+from .models import ContactRequest, Document, DOCUMENT_EXTENSIONS
+from .storage import document_storage
+from .uploads import UploadError, discard_upload, get_upload
 
 
 class ContactForm(forms.ModelForm):
@@ -63,3 +70,61 @@ class ContactForm(forms.ModelForm):
         if cleaned_data.get('consent'):
             cleaned_data['consent_given'] = True
         return cleaned_data
+
+
+class DocumentAdminForm(forms.ModelForm):
+    """Форма документа в админке с поддержкой загрузки файла по частям"""
+    
+    chunked_upload = forms.CharField(required=False, widget=forms.HiddenInput(attrs={
+        'class': 'chunked-upload-id',
+    }))
+    
+    class Meta:
+        model = Document
+        fields = '__all__'
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Файл может прийти либо обычной формой, либо по частям
+        self.fields['file'].required = False
+        self.fields['chunked_upload'].widget.attrs.update({
+            'data-upload-url': reverse('admin:landing_document_upload'),
+            'data-chunk-size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        })
+    
+    def clean_chunked_upload(self):
+        upload_id = self.cleaned_data.get('chunked_upload')
+        if not upload_id:
+            return None
+        try:
+            upload = get_upload(upload_id)
+        except UploadError:
+            raise forms.ValidationError('Загрузка файла не найдена, загрузите файл заново')
+        if not upload['stored_name']:
+            raise forms.ValidationError('Файл загружен не полностью')
+        ext = os.path.splitext(upload['filename'])[1].lower().lstrip('.')
+        if ext not in DOCUMENT_EXTENSIONS:
+            # Файл уже в публичном хранилище — не оставляем его там
+            discard_upload(upload_id)
+            raise forms.ValidationError(f'Недопустимое расширение файла: .{ext}')
+        # Между загрузкой и отправкой формы файл мог удалиться вместе
+        # с последним документом — отмечаем его как используемый
+        if not document_storage.claim(upload['stored_name']):
+            raise forms.ValidationError('Загруженный файл удалён, загрузите файл заново')
+        return upload
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('file') and not cleaned_data.get('chunked_upload'):
+            self.add_error('file', 'Обязательное поле.')
+        return cleaned_data
+    
+    def save(self, commit=True):
+        document = super().save(commit=False)
+        upload = self.cleaned_data.get('chunked_upload')
+        if upload:
+            document.file.name = upload['stored_name']
+        if commit:
+            document.save()
+            self.save_m2m()
+        return document
@@ -0,0 +1,78 @@
+"""
+Галерея лендинга "Птицелов": миниатюры и постраничная выдача
+
+В сетке показываются только миниатюры WebP (GalleryImage.thumbnail),
+оригинал загружает GLightbox при открытии снимка. Страницы выдаются по
+ключу (order, id) — без OFFSET, следующая страница не зависит от того,
+сколько снимков было до неё. Страница ограничена и числом снимков
+(GALLERY_PAGE_SIZE), и суммарным размером миниатюр (GALLERY_PAGE_BYTES):
+одна загрузка не тянет больше заданного объёма изображений.
+"""
+import io
+import os
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+# 4:3, как .gallery-item; вдвое больше ячейки сетки (280px) для HiDPI
+THUMBNAIL_SIZE = (560, 420)
+THUMBNAIL_QUALITY = 75
+
+CURSOR_RE = re.compile(r'^(\d+)-(\d+)$')
+
+
+def make_thumbnail(image_file):
+    """Миниатюра WebP (ContentFile) из файла изображения"""
+    image_file.open('rb')
+    try:
+        with Image.open(image_file) as image:
+            # Снимки с телефона повёрнуты через EXIF
+            image = ImageOps.exif_transpose(image)
+            thumbnail = ImageOps.fit(image.convert('RGB'), THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    finally:
+        image_file.close()
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, 'WEBP', quality=THUMBNAIL_QUALITY, method=6)
+    name = os.path.splitext(os.path.basename(image_file.name))[0] + '.webp'
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+def format_cursor(image):
+    return f'{image.order}-{image.pk}'
+
+
+def parse_cursor(value):
+    """(order, id) из ?after= или None; ValueError — неверный формат"""
+    if not value:
+        return None
+    match = CURSOR_RE.match(value)
+    if not match:
+        raise ValueError(value)
+    return int(match[1]), int(match[2])
+
+
+def gallery_page(after=None):
+    """
+    Снимки страницы после курсора (order, id) и курсор следующей страницы
+    (None — страница последняя). Первый снимок входит всегда, даже если
+    его миниатюра одна больше GALLERY_PAGE_BYTES.
+    """
+    from .models import GalleryImage
+
+    images = GalleryImage.objects.filter(is_active=True).exclude(thumbnail='').order_by('order', 'id')
+    if after is not None:
+        order, pk = after
+        images = images.filter(Q(order__gt=order) | Q(order=order, id__gt=pk))
+    candidates = list(images[:settings.GALLERY_PAGE_SIZE + 1])
+
+    page, total = [], 0
+    for image in candidates[:settings.GALLERY_PAGE_SIZE]:
+        if page and total + image.thumbnail_bytes > settings.GALLERY_PAGE_BYTES:
+            break
+        page.append(image)
+        total += image.thumbnail_bytes
+    next_cursor = format_cursor(page[-1]) if len(candidates) > len(page) else None
+    return page, next_cursor
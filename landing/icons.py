@@ -0,0 +1,90 @@
+"""
+Реестр SVG-иконок лендинга "Птицелов"
+
+Все иконки собираются в один спрайт из <symbol> (/icons.svg), который
+браузер кэширует; в разметке остаётся только <use href="…#icon-имя">.
+Имена совпадают со значениями полей icon моделей (Feature,
+DocumentCategory, SoftwareModule.ICON_CHOICES), поэтому новая иконка
+добавляется сюда, без правки шаблонов.
+
+Рисунки — контурные 24×24 в стиле Lucide: цвет и толщину линии задаёт
+внешний <svg> (stroke="currentColor").
+"""
+import hashlib
+from functools import lru_cache
+
+ICON_PREFIX = 'icon-'
+
+FILE_OUTLINE = (
+    '<path d="M14.5 2H6a2 2 0 0 0-2 2v16a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2V7.5L14.5 2z"/>'
+    '<polyline points="14 2 14 8 20 8"/>'
+)
+
+ICONS = {
+    # Преимущества (Feature.icon)
+    'target': '<circle cx="12" cy="12" r="10"/><circle cx="12" cy="12" r="6"/><circle cx="12" cy="12" r="2"/>',
+    'eye': '<path d="M2 12s3-7 10-7 10 7 10 7-3 7-10 7-10-7-10-7Z"/><circle cx="12" cy="12" r="3"/>',
+    'cpu': (
+        '<rect width="16" height="16" x="4" y="4" rx="2"/><rect width="6" height="6" x="9" y="9" rx="1"/>'
+        '<path d="M15 2v2"/><path d="M15 20v2"/><path d="M2 15h2"/><path d="M2 9h2"/>'
+        '<path d="M20 15h2"/><path d="M20 9h2"/><path d="M9 2v2"/><path d="M9 20v2"/>'
+    ),
+    'shield': '<path d="M12 22s8-4 8-10V5l-8-3-8 3v7c0 6 8 10 8 10z"/>',
+    'check-circle': '<path d="M22 11.08V12a10 10 0 1 1-5.93-9.14"/><polyline points="22 4 12 14.01 9 11.01"/>',
+
+    # Модули ПО (SoftwareModule.ICON_CHOICES)
+    'crosshair': (
+        '<circle cx="12" cy="12" r="10"/><line x1="22" x2="18" y1="12" y2="12"/>'
+        '<line x1="6" x2="2" y1="12" y2="12"/><line x1="12" x2="12" y1="6" y2="2"/>'
+        '<line x1="12" x2="12" y1="22" y2="18"/>'
+    ),
+    'video': '<path d="m22 8-6 4 6 4V8Z"/><rect width="14" height="12" x="2" y="6" rx="2"/>',
+    'settings': (
+        '<circle cx="12" cy="12" r="3"/>'
+        '<path d="M19.4 15a1.65 1.65 0 0 0 .33 1.82l.06.06a2 2 0 1 1-2.83 2.83l-.06-.06'
+        'a1.65 1.65 0 0 0-1.82-.33 1.65 1.65 0 0 0-1 1.51V21a2 2 0 1 1-4 0v-.09'
+        'A1.65 1.65 0 0 0 9 19.4a1.65 1.65 0 0 0-1.82.33l-.06.06a2 2 0 1 1-2.83-2.83l.06-.06'
+        'A1.65 1.65 0 0 0 4.68 15a1.65 1.65 0 0 0-1.51-1H3a2 2 0 1 1 0-4h.09'
+        'A1.65 1.65 0 0 0 4.6 9a1.65 1.65 0 0 0-.33-1.82l-.06-.06a2 2 0 1 1 2.83-2.83l.06.06'
+        'A1.65 1.65 0 0 0 9 4.68a1.65 1.65 0 0 0 1-1.51V3a2 2 0 1 1 4 0v.09'
+        'a1.65 1.65 0 0 0 1 1.51 1.65 1.65 0 0 0 1.82-.33l.06-.06a2 2 0 1 1 2.83 2.83l-.06.06'
+        'A1.65 1.65 0 0 0 19.4 9a1.65 1.65 0 0 0 1.51 1H21a2 2 0 1 1 0 4h-.09a1.65 1.65 0 0 0-1.51 1z"/>'
+    ),
+    'chip': (
+        '<path d="M6 19v-3"/><path d="M10 19v-3"/><path d="M14 19v-3"/><path d="M18 19v-3"/>'
+        '<path d="M8 11V9"/><path d="M16 11V9"/><path d="M12 11V9"/><path d="M2 15h20"/>'
+        '<path d="M2 7a2 2 0 0 1 2-2h16a2 2 0 0 1 2 2v1.1a2 2 0 0 0 0 3.837V17a2 2 0 0 1-2 2H4'
+        'a2 2 0 0 1-2-2v-5.1a2 2 0 0 0 0-3.837Z"/>'
+    ),
+    'wifi': (
+        '<path d="M5 12.55a11 11 0 0 1 14.08 0"/><path d="M1.42 9a16 16 0 0 1 21.16 0"/>'
+        '<path d="M8.53 16.11a6 6 0 0 1 6.95 0"/><line x1="12" x2="12.01" y1="20" y2="20"/>'
+    ),
+    'terminal': '<polyline points="4 17 10 11 4 5"/><line x1="12" x2="20" y1="19" y2="19"/>',
+    'code': '<polyline points="16 18 22 12 16 6"/><polyline points="8 6 2 12 8 18"/>',
+
+    # Документы (DocumentCategory.icon, карточки файлов)
+    'file': FILE_OUTLINE,
+    'file-text': FILE_OUTLINE + '<path d="M10 12h4"/><path d="M10 16h4"/>',
+    'award': '<circle cx="12" cy="8" r="6"/><path d="M15.477 12.89 17 22l-5-3-5 3 1.523-9.11"/>',
+    'presentation': '<path d="M2 3h20"/><path d="M21 3v11a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V3"/><path d="m7 21 5-5 5 5"/>',
+    'download': (
+        '<path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/><polyline points="7 10 12 15 17 10"/>'
+        '<line x1="12" x2="12" y1="15" y2="3"/>'
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def build_sprite():
+    """SVG-спрайт со всеми иконками и его версия (хэш содержимого)"""
+    symbols = ''.join(
+        f'<symbol id="{ICON_PREFIX}{name}" viewBox="0 0 24 24">{body}</symbol>'
+        for name, body in sorted(ICONS.items())
+    )
+    sprite = f'<svg xmlns="http://www.w3.org/2000/svg">{symbols}</svg>'.encode()
+    return sprite, hashlib.sha256(sprite).hexdigest()[:12]
+
+
+def sprite_version():
+    return build_sprite()[1]
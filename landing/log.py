@@ -0,0 +1,169 @@
+"""
+Логирование лендинга "Птицелов": очередь, JSON и ID запроса
+
+Потоки запросов только кладут запись в очередь (AsyncHandler), запись
+в stdout делает отдельный поток QueueListener — медленный приёмник логов
+(переполненный pipe Docker, journald) не задерживает ответы. Если
+очередь заполнена, запись отбрасывается, а число потерянных записей
+попадает в лог следующим сообщением.
+
+Сообщение форматируется в потоке слушателя, поэтому аргументы
+логирования (logger.info('...%s', value)) не должны меняться после
+вызова — как и при обычном отложенном форматировании logging.
+
+Настройка — LOGGING в settings.py.
+"""
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import weakref
+from datetime import datetime, timezone
+
+# ID текущего запроса (RequestIdMiddleware); вне запроса — '-'
+request_id_var = contextvars.ContextVar('request_id', default='-')
+
+# Стандартные атрибуты LogRecord — всё остальное пришло через extra=
+RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'sampled',
+}
+
+# Обработчики процесса: после fork их слушатели запускаются заново
+_handlers = weakref.WeakSet()
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет к записи request_id текущего запроса"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает каждую N-ю запись шумных логгеров: rates = {логгер: N}.
+    Счётчик ведётся по логгеру и шаблону сообщения, поэтому первая
+    запись каждого вида проходит всегда. Пропущенной записи ставится
+    sampled=N — при подсчёте событий её нужно умножать на N.
+    Записи, где сообщение не строка (logger.warning(dict)), проходят
+    без выборки: у них нет шаблона, по которому вести счётчик.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+        self.counters = {}
+
+    def filter(self, record):
+        rate = self.rates.get(record.name)
+        if not rate or rate <= 1 or record.levelno >= logging.ERROR or not isinstance(record.msg, str):
+            return True
+        counter = self.counters.setdefault((record.name, record.msg), itertools.count())
+        if next(counter) % rate:
+            return False
+        record.sampled = rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON"""
+
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        if getattr(record, 'sampled', None):
+            data['sampled'] = record.sampled
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exc'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Очередь ограничена: при остановке ждём место, а не теряем sentinel
+        try:
+            self.queue.put(self._sentinel, timeout=5)
+        except queue.Full:
+            pass
+
+
+class AsyncHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler со своим слушателем: пишет в stream (по умолчанию
+    stdout) из отдельного потока. Форматтер, заданный в LOGGING,
+    передаётся внутреннему обработчику.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.queue_size = queue_size
+        self.dropped = 0
+        super().__init__(queue.Queue(queue_size))
+        self.start()
+        _handlers.add(self)
+
+    def start(self):
+        self._listener = _Listener(self.queue, self.target)
+        self._listener.start()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # В отличие от QueueHandler.prepare сообщение не форматируется
+        # здесь: очередь внутри процесса, pickle не нужен, а форматирование
+        # (и JSON) переносится в поток слушателя
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            warning = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                'Log queue full: dropped %d records', (dropped,), None,
+            )
+            warning.request_id = '-'
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                self.dropped += dropped
+
+    def close(self):
+        _handlers.discard(self)
+        if self._listener._thread is not None:
+            self._listener.stop()
+        self.target.close()
+        super().close()
+
+
+def _restart_after_fork():
+    """Поток слушателя не переживает fork (gunicorn preload_app) — новая очередь и поток"""
+    for handler in list(_handlers):
+        handler.queue = queue.Queue(handler.queue_size)
+        handler.dropped = 0
+        handler.start()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
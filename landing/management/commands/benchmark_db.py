@@ -0,0 +1,205 @@
+"""
+Management команда: задержка чтения контента под нагрузкой записью
+
+Сравнивает схемы хранения на копиях баз во временном каталоге (рабочие
+файлы не меняются, команду можно запускать на сервере):
+
+    shared-delete — одна база, журнал отката (схема до разделения баз);
+    shared-wal    — одна база в режиме WAL;
+    split-wal     — заявки в отдельной базе, контент читается через
+                    read-only соединение (текущая схема, landing/routers.py).
+
+Писатели — отдельные процессы (как воркеры gunicorn), каждый без пауз
+сохраняет заявки короткими транзакциями. Читатель выполняет запросы
+контента главной страницы (SQL строится из querysets моделей) и меряет
+время одного прохода по ним.
+
+    python manage.py benchmark_db --seconds 10 --writers 4
+"""
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from landing.routers import LEADS_DB
+from landing.stats import percentile
+
+# Схема -> (режим журнала, заявки в отдельной базе)
+SCENARIOS = {
+    'shared-delete': ('delete', False),
+    'shared-wal': ('wal', False),
+    'split-wal': ('wal', True),
+}
+
+# Плейсхолдеры Django (%s) -> sqlite3 (?)
+PLACEHOLDER_RE = re.compile(r'(?<!%)%s')
+
+
+def read_queries():
+    """SQL и параметры запросов контента главной страницы"""
+    from landing.models import (
+        DevelopmentPlan, Document, DocumentCategory, Feature, HardwareInterface,
+        SiteSettings, SoftwareModule, SoftwarePlatform, Specification, SpecificationGroup,
+    )
+    querysets = [
+        SiteSettings.objects.filter(pk=1),
+        Feature.objects.all(),
+        SpecificationGroup.objects.all(),
+        Specification.objects.select_related('group'),
+        SoftwarePlatform.objects.all(),
+        SoftwareModule.objects.filter(is_active=True),
+        HardwareInterface.objects.filter(is_active=True),
+        DevelopmentPlan.objects.filter(is_active=True),
+        DocumentCategory.objects.filter(documents__is_active=True).distinct(),
+        Document.objects.filter(is_active=True).select_related('category'),
+    ]
+    queries = []
+    for queryset in querysets:
+        sql, params = queryset.query.sql_with_params()
+        queries.append((PLACEHOLDER_RE.sub('?', sql).replace('%%', '%'), params))
+    return queries
+
+
+def write_statement():
+    """INSERT тестовой заявки и DDL её таблицы"""
+    from landing.models import ContactRequest
+
+    connection = connections[LEADS_DB]
+    request = ContactRequest(
+        name='Нагрузочный тест', email='bench@example.com',
+        message='Проверка задержки чтения. ' * 20, consent_given=True,
+    )
+    fields = [field for field in ContactRequest._meta.concrete_fields if not field.primary_key]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    table = ContactRequest._meta.db_table
+    sql = f'INSERT INTO {connection.ops.quote_name(table)} ({columns}) VALUES ({", ".join("?" * len(fields))})'
+    params = [field.get_db_prep_save(field.pre_save(request, True), connection) for field in fields]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+        row = cursor.fetchone()
+    if row is None:
+        raise CommandError('Нет таблицы заявок: python manage.py migrate --database=leads')
+    return sql, params, row[0].replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1)
+
+
+def writer(path, journal_mode, sql, params, stop_at, writes, errors):
+    """Процесс-писатель: заявка за заявкой до stop_at"""
+    db = sqlite3.connect(path, timeout=10, isolation_level=None)
+    db.execute(f'PRAGMA synchronous={"NORMAL" if journal_mode == "wal" else "FULL"}')
+    while time.time() < stop_at:
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute(sql, params)
+            db.execute('COMMIT')
+        except sqlite3.OperationalError:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            with errors.get_lock():
+                errors.value += 1
+            continue
+        with writes.get_lock():
+            writes.value += 1
+    db.close()
+
+
+class Command(BaseCommand):
+    help = 'Сравнить задержку чтения контента под нагрузкой записью для схем хранения SQLite'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Длительность каждой схемы, с')
+        parser.add_argument('--writers', type=int, default=2, help='Процессов-писателей')
+        parser.add_argument(
+            '--scenario', action='append', choices=list(SCENARIOS),
+            help='Схема (можно несколько), по умолчанию все',
+        )
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('Сравнение имеет смысл только для SQLite')
+
+        queries = read_queries()
+        insert_sql, insert_params, table_sql = write_statement()
+        source = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+
+        header = f'{"Схема":<14} {"Чтений":>7} {"p50":>7} {"p90":>7} {"p99":>7} {"max":>8} {"Записей/с":>10} {"Ошибки":>7}'
+        rows = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in options['scenario'] or SCENARIOS:
+                journal_mode, split = SCENARIOS[name]
+                content_path = os.path.join(tmp, f'{name}.sqlite3')
+                leads_path = os.path.join(tmp, f'{name}-leads.sqlite3') if split else content_path
+
+                # Копия базы контента через backup API — консистентна и при WAL
+                with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(content_path)) as dst:
+                    src.backup(dst)
+                for path in {content_path, leads_path}:
+                    with closing(sqlite3.connect(path, isolation_level=None)) as db:
+                        db.execute(f'PRAGMA journal_mode={journal_mode}')
+                        db.execute(table_sql)
+
+                self.stdout.write(f'  {name}: {options["writers"]} писателей, {options["seconds"]:.0f} с…')
+                rows.append((name, *self.run_scenario(
+                    content_path, leads_path, journal_mode, queries,
+                    insert_sql, insert_params, options['writers'], options['seconds'],
+                )))
+
+        self.stdout.write('')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, latencies, write_rate, errors in rows:
+            self.stdout.write(
+                f'{name:<14} {len(latencies):>7} {percentile(latencies, 0.5):>7.2f} '
+                f'{percentile(latencies, 0.9):>7.2f} {percentile(latencies, 0.99):>7.2f} '
+                f'{(latencies[-1] if latencies else 0):>8.2f} {write_rate:>10.0f} {errors:>7}'
+            )
+        self.stdout.write('')
+        self.stdout.write('Задержка одного прохода по запросам главной страницы, мс')
+        self.stdout.write(self.style.SUCCESS('✓ Готово'))
+
+    def run_scenario(self, content_path, leads_path, journal_mode, queries,
+                     insert_sql, insert_params, writer_count, seconds):
+        # Читатель открывает базу так же, как content_ro в settings.DATABASES
+        if journal_mode == 'wal':
+            reader = sqlite3.connect(f'file:{content_path}?mode=ro', uri=True, timeout=10)
+        else:
+            reader = sqlite3.connect(content_path, timeout=10)
+        reader.execute(f'PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}')
+        for sql, params in queries:
+            reader.execute(sql, params).fetchall()
+
+        writes = multiprocessing.Value('i', 0)
+        errors = multiprocessing.Value('i', 0)
+        started = time.time()
+        stop_at = started + seconds
+        processes = [
+            multiprocessing.Process(
+                target=writer,
+                args=(leads_path, journal_mode, insert_sql, insert_params, stop_at, writes, errors),
+            )
+            for _ in range(writer_count)
+        ]
+        for process in processes:
+            process.start()
+
+        latencies = []
+        while time.time() < stop_at:
+            began = time.perf_counter()
+            try:
+                for sql, params in queries:
+                    reader.execute(sql, params).fetchall()
+            except sqlite3.OperationalError:
+                with errors.get_lock():
+                    errors.value += 1
+                continue
+            latencies.append((time.perf_counter() - began) * 1000)
+        for process in processes:
+            process.join()
+        reader.close()
+        return sorted(latencies), writes.value / (time.time() - started), errors.value
@@ -0,0 +1,205 @@
+"""
+Management команда для сборки критического CSS первого экрана
+
+Рендерит страницы (главная, политики), собирает теги, классы и id
+элементов первого экрана и оставляет из style.css только правила,
+которые могут к ним примениться. Результат — static/css/critical.css:
+base.html встраивает его в <style>, а полные стили грузит асинхронно
+(см. {% critical_css %} и {% stylesheet %}).
+
+Первый экран — всё, кроме второй и следующих секций <main> и футера:
+прелоадер, навигация, hero (или страница политики целиком) и
+фиксированные элементы. Классы, которые добавляет JS (scrolled,
+visible, …), в него не попадают — к этому моменту полные стили уже
+загружены.
+
+С --report-unused выводит селекторы, классы и id которых не встречаются
+ни в шаблонах, ни в JS, ни в Python-коде приложения (кандидаты на
+удаление из style.css; удалять стоит вручную — классы библиотек вроде
+AOS и GLightbox тоже попадут в отчёт).
+"""
+import os
+import re
+from html.parser import HTMLParser
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import resolve
+
+from landing.css import (
+    PSEUDO_RE, animation_names, css_blocks, selector_tokens, split_selectors, strip_comments
+)
+
+SOURCE_CSS = settings.BASE_DIR / 'static' / 'css' / 'style.css'
+CRITICAL_CSS = settings.BASE_DIR / 'static' / 'css' / 'critical.css'
+PAGES = ['/', '/privacy/', '/cookies/']
+
+# Селекторы, которые всегда совпадают (корень документа)
+ALWAYS_TAGS = {'html', 'body'}
+
+
+class FirstScreenParser(HTMLParser):
+    """Собирает теги, классы и id элементов первого экрана"""
+
+    VOID_TAGS = {
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+        'link', 'meta', 'source', 'track', 'wbr',
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.tags, self.classes, self.ids = set(ALWAYS_TAGS), set(), set()
+        self.stack = []
+        self.main_sections = 0
+        self.excluded_depth = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'html':
+            # Следующая страница
+            self.stack, self.excluded_depth = [], None
+        if tag == 'main':
+            self.main_sections = 0
+        parent = self.stack[-1] if self.stack else None
+        if tag not in self.VOID_TAGS:
+            self.stack.append(tag)
+        if self.excluded_depth is not None:
+            return
+
+        below_fold = tag == 'footer' or (tag == 'section' and parent == 'main' and self.main_sections >= 1)
+        if tag == 'section' and parent == 'main':
+            self.main_sections += 1
+        if below_fold:
+            self.excluded_depth = len(self.stack)
+            return
+
+        attrs = dict(attrs)
+        self.tags.add(tag)
+        self.classes.update((attrs.get('class') or '').split())
+        if attrs.get('id'):
+            self.ids.add(attrs['id'])
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID_TAGS or tag not in self.stack:
+            return
+        while self.stack:
+            if self.excluded_depth == len(self.stack):
+                self.excluded_depth = None
+            if self.stack.pop() == tag:
+                break
+
+
+def _matches(selector, tags, classes, ids):
+    selector_tags, selector_classes, selector_ids = selector_tokens(selector)
+    if selector.startswith(':root') or PSEUDO_RE.sub('', selector).strip() == '*':
+        return True
+    return (
+        selector_tags <= tags and selector_classes <= classes and selector_ids <= ids
+        and bool(selector_tags or selector_classes or selector_ids)
+    )
+
+
+def _select(css, keep):
+    """
+    Правила (с учётом @media), для которых keep(selector) истинно.
+    Возвращает (правила, имена анимаций, отброшенные селекторы).
+    """
+    rules, animations, dropped = [], set(), []
+    for prelude, body in css_blocks(css):
+        if prelude.startswith('@media') or prelude.startswith('@supports'):
+            inner, inner_animations, inner_dropped = _select(body, keep)
+            if inner:
+                rules.append(f'{prelude}{{{"".join(inner)}}}')
+            animations |= inner_animations
+            dropped += inner_dropped
+        elif prelude.startswith('@'):
+            continue
+        else:
+            selectors = split_selectors(prelude)
+            kept = [selector for selector in selectors if keep(selector)]
+            dropped += [selector for selector in selectors if selector not in kept]
+            if kept:
+                rules.append(f'{",".join(kept)}{{{_minify(body)}}}')
+                animations |= animation_names(body)
+    return rules, animations, dropped
+
+
+def _at_rules(css, keyframes):
+    """@font-face и нужные @keyframes верхнего уровня"""
+    rules = []
+    for prelude, body in css_blocks(css):
+        name = prelude.split()[-1] if prelude.startswith('@keyframes') else None
+        if prelude.startswith('@font-face') or (name and name in keyframes):
+            rules.append(f'{prelude}{{{_minify(body)}}}')
+    return rules
+
+
+def _minify(body):
+    body = re.sub(r'\s+', ' ', body).strip()
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', body).rstrip(';')
+
+
+class Command(BaseCommand):
+    help = 'Собрать критический CSS первого экрана (static/css/critical.css)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--report-unused',
+            action='store_true',
+            help='Показать селекторы, которые не встречаются в шаблонах и JS',
+        )
+
+    def handle(self, *args, **options):
+        css = strip_comments(SOURCE_CSS.read_text(encoding='utf-8'))
+
+        parser = FirstScreenParser()
+        factory = RequestFactory(HTTP_HOST='localhost')
+        for path in PAGES:
+            request = factory.get(path)
+            response = resolve(path).func(request)
+            parser.feed(response.content.decode())
+        self.stdout.write(
+            f'Первый экран: {len(parser.tags)} тегов, {len(parser.classes)} классов, {len(parser.ids)} id'
+        )
+
+        rules, animations, _ = _select(
+            css, lambda selector: _matches(selector, parser.tags, parser.classes, parser.ids)
+        )
+        critical = '\n'.join(_at_rules(css, animations) + rules) + '\n'
+        tmp_path = f'{CRITICAL_CSS}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(critical)
+        os.replace(tmp_path, CRITICAL_CSS)
+
+        source_size = os.path.getsize(SOURCE_CSS)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ critical.css: {len(critical.encode()) // 1024} КБ из {source_size // 1024} КБ style.css'
+        ))
+
+        if options['report_unused']:
+            self.report_unused(css)
+
+    def referenced_words(self):
+        """Все слова из шаблонов и JS (имена классов могут собираться в коде)"""
+        words = set()
+        roots = [apps.get_app_config('landing').path, settings.BASE_DIR / 'static' / 'js']
+        for root in roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                for filename in filenames:
+                    if filename.endswith(('.html', '.js', '.py')):
+                        with open(os.path.join(dirpath, filename), encoding='utf-8') as f:
+                            words.update(re.findall(r'[\w-]+', f.read()))
+        return words
+
+    def report_unused(self, css):
+        words = self.referenced_words()
+
+        def referenced(selector):
+            tags, classes, ids = selector_tokens(selector)
+            return classes <= words and ids <= words
+
+        _, _, dropped = _select(css, referenced)
+        for selector in dropped:
+            self.stdout.write(f'  {selector}')
+        self.stdout.write(f'Не используется: {len(dropped)} селекторов')
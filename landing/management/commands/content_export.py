@@ -0,0 +1,37 @@
+"""
+Management команда для выгрузки контента в пакет (см. landing/content.py)
+
+    python manage.py content_export content.json
+    python manage.py content_export content.ndjson
+    python manage.py content_export - > content.json
+"""
+import os
+import sys
+
+from django.core.management.base import BaseCommand
+
+from landing.content import write_bundle
+
+
+class Command(BaseCommand):
+    help = 'Выгрузить контент лендинга в JSON/NDJSON-пакет'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл пакета (.json или .ndjson), "-" — stdout')
+        parser.add_argument('--ndjson', action='store_true', help='NDJSON независимо от расширения')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        ndjson = options['ndjson'] or path.endswith('.ndjson')
+        if path == '-':
+            write_bundle(sys.stdout, ndjson)
+            return
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            counts = write_bundle(f, ndjson)
+        os.replace(tmp_path, path)
+
+        for label, count in counts.items():
+            self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'✓ {path}: {sum(counts.values())} записей'))
@@ -0,0 +1,76 @@
+"""
+Management команда для загрузки пакета контента (см. landing/content.py)
+
+Сравнивает пакет с БД и применяет разницу одной транзакцией: при любой
+ошибке БД остаётся в прежнем состоянии. Записи, которых нет в пакете,
+удаляются (--keep-missing — оставить). С --dry-run только печатает,
+что изменится.
+
+Файлы (документы, изображения) в пакет не входят — их нужно перенести
+отдельно (rsync media/). Импорт с отсутствующими файлами прерывается,
+если не указан --allow-missing-files.
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from landing.content import BundleError, apply_diff, diff_bundle, missing_files, read_bundle
+
+
+class Command(BaseCommand):
+    help = 'Загрузить контент лендинга из JSON/NDJSON-пакета'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл пакета, "-" — stdin')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать изменения')
+        parser.add_argument(
+            '--keep-missing', action='store_true',
+            help='Не удалять записи, которых нет в пакете',
+        )
+        parser.add_argument(
+            '--allow-missing-files', action='store_true',
+            help='Импортировать, даже если файлов из пакета нет в хранилище',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            if options['path'] == '-':
+                by_model = read_bundle(sys.stdin)
+            else:
+                with open(options['path'], encoding='utf-8') as f:
+                    by_model = read_bundle(f)
+            diffs = diff_bundle(by_model, delete_missing=not options['keep_missing'])
+        except (OSError, BundleError) as e:
+            raise CommandError(str(e))
+
+        changed = False
+        for diff in diffs:
+            if diff.create or diff.update or diff.delete:
+                changed = True
+                fields = f' ({", ".join(diff.update_fields)})' if diff.update_fields else ''
+                self.stdout.write(
+                    f'  {diff.model._meta.label_lower}: +{len(diff.create)} '
+                    f'~{len(diff.update)}{fields} -{len(diff.delete)}'
+                )
+
+        missing = missing_files(diffs)
+        for name in missing:
+            self.stdout.write(self.style.WARNING(f'  нет файла: {name}'))
+
+        if not changed:
+            self.stdout.write(self.style.SUCCESS('✓ Контент уже совпадает с пакетом'))
+            return
+        if options['dry_run']:
+            self.stdout.write('Пробный запуск — изменения не применены')
+            return
+        if missing and not options['allow_missing_files']:
+            raise CommandError(
+                f'Нет {len(missing)} файлов — перенесите media/ или укажите --allow-missing-files'
+            )
+
+        apply_diff(diffs)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Импорт применён за {time.monotonic() - started:.2f} с'
+        ))
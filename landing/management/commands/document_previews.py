@@ -0,0 +1,74 @@
+"""
+Management команда для превью документов
+
+Превью строятся в фоне при загрузке документа; команда нужна для
+документов, загруженных раньше, и после смены PREVIEW_WIDTH или
+качества WebP (--all). Рендер идёт в пуле процессов: PDFium держит GIL
+и не потокобезопасен, а отдельные процессы загружают все ядра.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from landing import previews
+from landing.models import Document
+
+
+class Command(BaseCommand):
+    help = 'Построить превью первой страницы PDF-документов (--all — пересоздать все)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Пересоздать превью всех документов')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Число процессов рендера')
+
+    def handle(self, *args, **options):
+        if not previews.is_available():
+            raise CommandError('Не установлен pypdfium2 (pip install pypdfium2)')
+
+        documents = [
+            document for document in Document.objects.exclude(file='')
+            if previews.has_preview(document)
+        ]
+        if not options['all']:
+            documents = [
+                document for document in documents
+                if document.preview.name != previews.preview_name(document.file.name)
+            ]
+        # Один файл у нескольких документов рендерим один раз
+        by_file = {}
+        for document in documents:
+            by_file.setdefault(document.file.name, document)
+        if not by_file:
+            self.stdout.write(self.style.SUCCESS('✓ Все превью на месте'))
+            return
+
+        started = time.monotonic()
+        built, failed, total_bytes = 0, 0, 0
+        # Дочерние процессы не должны наследовать открытые соединения с БД
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {
+                pool.submit(previews.render_first_page, document.file.path): document
+                for document in by_file.values()
+            }
+            for future in as_completed(futures):
+                document = futures[future]
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'  {document.pk} {document.file.name}: {e}')
+                    continue
+                name = previews.store_preview(document, rendered)
+                built += 1
+                total_bytes += len(rendered[0])
+                self.stdout.write(f'  {document.pk} {name}: {len(rendered[0]) / 1024:.1f} КБ')
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Не удалось обработать: {failed}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Превью создано: {built}, {total_bytes / 1024:.1f} КБ за {time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,44 @@
+"""
+Management команда для миниатюр галереи
+
+Миниатюры создаются при сохранении снимка; команда нужна для снимков,
+загруженных до появления миниатюр, и после смены THUMBNAIL_SIZE или
+качества WebP (--all).
+"""
+from django.core.management.base import BaseCommand
+
+from landing.models import GalleryImage
+
+
+class Command(BaseCommand):
+    help = 'Создать недостающие миниатюры галереи (--all — пересоздать все)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Пересоздать миниатюры всех снимков')
+
+    def handle(self, *args, **options):
+        images = GalleryImage.objects.all()
+        if not options['all']:
+            images = images.filter(thumbnail='')
+
+        built, failed, total_bytes = 0, 0, 0
+        for image in images:
+            previous = image.thumbnail.name
+            image.thumbnail = ''
+            try:
+                image.save()
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f'  {image.pk} {image.image.name}: {e}')
+                continue
+            if previous and previous != image.thumbnail.name:
+                image.thumbnail.storage.delete(previous)
+            built += 1
+            total_bytes += image.thumbnail_bytes
+            self.stdout.write(f'  {image.pk} {image.thumbnail.name}: {image.thumbnail_bytes / 1024:.1f} КБ')
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Не удалось обработать: {failed}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Миниатюр создано: {built}, {total_bytes / 1024:.1f} КБ'
+        ))
@@ -2,6 +2,9 @@
 Management команда для инициализации данных раздела ПО
 """
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from landing.content import finish_bulk_changes, seed_missing
+from landing.signals import bulk_changes
 from landing.models import (
     SoftwarePlatform, SoftwareModule, 
     HardwareInterface, DevelopmentPlan
@@ -14,6 +17,13 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Создание данных для раздела ПО...')
         
+        # Всё одной транзакцией: при ошибке раздел не остаётся заполненным наполовину
+        with transaction.atomic(), bulk_changes():
+            self.create_all()
+        
+        self.stdout.write(self.style.SUCCESS('\n✓ Раздел ПО успешно инициализирован!'))
+
+    def create_all(self):
         # 1. Платформа (singleton)
         platform, created = SoftwarePlatform.objects.get_or_create(
             pk=1,
@@ -88,13 +98,8 @@ class Command(BaseCommand):
             },
         ]
         
-        for data in modules_data:
-            module, created = SoftwareModule.objects.get_or_create(
-                title=data['title'],
-                defaults=data
-            )
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'  ✓ Модуль: {data["title"]}'))
+        for obj in seed_missing(SoftwareModule, 'title', modules_data):
+            self.stdout.write(self.style.SUCCESS(f'  ✓ Модуль: {obj.title}'))
         
         # 3. Аппаратные интерфейсы
         interfaces_data = [
@@ -106,13 +111,8 @@ class Command(BaseCommand):
             {'name': 'Питание', 'value': '48V DC → 5V/12V stepdown', 'order': 6},
         ]
         
-        for data in interfaces_data:
-            iface, created = HardwareInterface.objects.get_or_create(
-                name=data['name'],
-                defaults=data
-            )
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'  ✓ Интерфейс: {data["name"]}'))
+        for obj in seed_missing(HardwareInterface, 'name', interfaces_data):
+            self.stdout.write(self.style.SUCCESS(f'  ✓ Интерфейс: {obj.name}'))
         
         # 4. Планы развития
         plans_data = [
@@ -148,12 +148,8 @@ class Command(BaseCommand):
             },
         ]
         
-        for data in plans_data:
-            plan, created = DevelopmentPlan.objects.get_or_create(
-                title=data['title'],
-                defaults=data
-            )
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'  ✓ План: {data["title"]}'))
+        for obj in seed_missing(DevelopmentPlan, 'title', plans_data):
+            self.stdout.write(self.style.SUCCESS(f'  ✓ План: {obj.title}'))
         
-        self.stdout.write(self.style.SUCCESS('\n✓ Раздел ПО успешно инициализирован!'))
+        # bulk_create не отправляет post_save — версии контента и поиск обновляем сами
+        finish_bulk_changes([SoftwareModule, HardwareInterface, DevelopmentPlan])
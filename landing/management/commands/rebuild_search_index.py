@@ -0,0 +1,30 @@
+"""
+Management команда для пересборки поискового индекса (FTS5)
+
+Обычно индекс обновляется сигналами при сохранении записей; пересборка
+нужна после массовых изменений в обход ORM (update(), загрузка дампа
+с отключёнными сигналами, правка БД вручную).
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from landing import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобрать полнотекстовый поисковый индекс'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('Поиск работает только на SQLite (FTS5)')
+
+        started = time.monotonic()
+        with transaction.atomic():
+            counts = search.rebuild()
+        for kind, count in counts.items():
+            self.stdout.write(f'  {kind}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Индекс пересобран: {sum(counts.values())} записей за {time.monotonic() - started:.2f} с'
+        ))
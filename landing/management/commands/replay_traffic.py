@@ -0,0 +1,329 @@
+"""
+Management команда для воспроизведения трафика из access.log nginx
+
+Читает лог в формате combined (формат nginx по умолчанию) и повторяет
+запросы к локальному серверу с исходными интервалами между ними
+(--speed 1), в ускоренном темпе (--speed 10) или без пауз (--speed 0).
+Одновременно выполняется не больше --concurrency запросов; каждый
+исполнитель держит своё keep-alive соединение.
+
+В конце — отчёт по маршрутам (имя URL из landing/urls.py, для
+статики и неизвестных путей — первый сегмент): число запросов,
+пропускная способность, перцентили задержки, доля ошибок (5xx и сбои
+соединения) и 4xx.
+
+POST воспроизводится только для формы обратной связи: тела запросов
+в логе нет, поэтому отправляется тестовая заявка (с CSRF-токеном,
+полученным с главной). Запускайте против стенда без
+SMARTCAPTCHA_SERVER_KEY — тогда проверка капчи заглушена, а заявки
+пишутся в БД стенда, не в рабочую.
+
+    python manage.py replay_traffic access.log --target http://127.0.0.1:8000 --speed 10 --concurrency 16
+"""
+import asyncio
+import gzip
+import re
+import ssl
+import time
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import Resolver404, resolve
+
+from landing.stats import percentile
+
+LOG_RE = re.compile(
+    r'^(?P<ip>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+)[^"]*" '
+    r'(?P<status>\d{3}) \S+(?: "[^"]*" "[^"]*")?'
+)
+LOG_TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+
+# POST-маршруты, для которых умеем собрать тело запроса
+REPLAYED_POSTS = {'landing:contact_submit'}
+
+CONTACT_FORM = {
+    'name': 'Replay',
+    'email': 'replay@example.com',
+    'phone': '',
+    'company': 'replay_traffic',
+    'message': 'Тестовая заявка (replay_traffic)',
+    'consent': 'on',
+    'consent_given': 'on',
+    'smart-token': '',
+}
+
+LogEntry = namedtuple('LogEntry', 'time method path route')
+Result = namedtuple('Result', 'route status latency')
+
+
+def parse_log(lines):
+    """Записи лога (LogEntry) в порядке следования; нераспознанные строки пропускаются"""
+    for line in lines:
+        match = LOG_RE.match(line)
+        if not match:
+            continue
+        try:
+            moment = datetime.strptime(match['time'], LOG_TIME_FORMAT)
+        except ValueError:
+            continue
+        yield LogEntry(moment, match['method'], match['path'], route_name(match['path']))
+
+
+def route_name(path):
+    path = urlsplit(path).path
+    try:
+        return resolve(path).view_name
+    except Resolver404:
+        segment = path.strip('/').split('/', 1)[0]
+        return f'/{segment}/*' if segment else '/'
+
+
+class HttpConnection:
+    """Минимальный HTTP/1.1-клиент с keep-alive поверх asyncio streams"""
+
+    def __init__(self, target, host, timeout):
+        url = urlsplit(target)
+        self.address = (url.hostname, url.port or (443 if url.scheme == 'https' else 80))
+        self.ssl = ssl.create_default_context() if url.scheme == 'https' else None
+        self.host = host or url.netloc
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers=None, body=b''):
+        """(статус, заголовки) — тело ответа читается и отбрасывается"""
+        for attempt in (1, 2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(*self.address, ssl=self.ssl)
+            try:
+                return await asyncio.wait_for(self._exchange(method, path, headers or {}, body), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Сервер закрыл keep-alive соединение — повторяем один раз на новом
+                await self.close()
+                if attempt == 2:
+                    raise
+            except BaseException:
+                await self.close()
+                raise
+
+    async def _exchange(self, method, path, headers, body):
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}', 'User-Agent: replay_traffic']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        if body or method == 'POST':
+            lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1', 'replace') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Соединение закрыто сервером')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.setdefault(name.strip().lower(), []).append(value.strip())
+
+        await self._skip_body(method, status, response_headers)
+        if 'close' in response_headers.get('connection', [''])[0].lower():
+            await self.close()
+        return status, response_headers
+
+    async def _skip_body(self, method, status, headers):
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return
+        if 'chunked' in headers.get('transfer-encoding', [''])[0].lower():
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    return
+        length = headers.get('content-length')
+        if length:
+            remaining = int(length[0])
+            while remaining:
+                chunk = await self.reader.read(min(remaining, 1 << 16))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                remaining -= len(chunk)
+            return
+        # Ни длины, ни chunked — тело до закрытия соединения
+        while await self.reader.read(1 << 16):
+            pass
+        await self.close()
+
+
+class Command(BaseCommand):
+    help = 'Воспроизвести трафик из access.log nginx и показать задержки по маршрутам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('logfile', help='access.log (формат combined, можно .gz)')
+        parser.add_argument('--target', default='http://127.0.0.1:8000', help='Адрес сервера')
+        parser.add_argument('--host', default='localhost', help='Заголовок Host (должен быть в ALLOWED_HOSTS)')
+        parser.add_argument(
+            '--speed', type=float, default=1.0,
+            help='Ускорение относительно исходного времени (1 — как в логе, 0 — без пауз)',
+        )
+        parser.add_argument('--concurrency', type=int, default=8, help='Одновременных запросов')
+        parser.add_argument('--limit', type=int, default=0, help='Воспроизвести только первые N запросов')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Таймаут запроса, с')
+        parser.add_argument(
+            '--no-post', action='store_true',
+            help='Не отправлять заявки с формы обратной связи',
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['speed'] < 0:
+            raise CommandError('--concurrency должен быть ≥ 1, --speed ≥ 0')
+
+        entries, skipped = self.load_entries(options)
+        if not entries:
+            raise CommandError('В логе нет запросов для воспроизведения')
+        span = (entries[-1].time - entries[0].time).total_seconds()
+        self.stdout.write(
+            f'Запросов: {len(entries)} за {span:.0f} с по логу, пропущено: {skipped}; '
+            f'ускорение ×{options["speed"] or "∞"}, параллельно {options["concurrency"]}'
+        )
+
+        results, elapsed, lag = asyncio.run(self.replay(entries, options))
+        self.report(results, elapsed, lag)
+
+    def load_entries(self, options):
+        opener = gzip.open if options['logfile'].endswith('.gz') else open
+        try:
+            with opener(options['logfile'], 'rt', encoding='utf-8', errors='replace') as f:
+                parsed = list(parse_log(f))
+        except OSError as e:
+            raise CommandError(f'Не удалось прочитать лог: {e}')
+
+        entries, skipped = [], 0
+        for entry in parsed:
+            replayable = entry.method in ('GET', 'HEAD') or (
+                entry.method == 'POST' and entry.route in REPLAYED_POSTS and not options['no_post']
+            )
+            if not replayable:
+                skipped += 1
+                continue
+            entries.append(entry)
+            if options['limit'] and len(entries) >= options['limit']:
+                break
+        entries.sort(key=lambda entry: entry.time)
+        return entries, skipped
+
+    # ==================== ВОСПРОИЗВЕДЕНИЕ ====================
+
+    async def csrf_token(self, options):
+        """CSRF-cookie с главной — нужна для POST формы обратной связи"""
+        connection = HttpConnection(options['target'], options['host'], options['timeout'])
+        try:
+            _, headers = await connection.request('GET', '/')
+        finally:
+            await connection.close()
+        for cookie in headers.get('set-cookie', []):
+            name, _, value = cookie.split(';', 1)[0].partition('=')
+            if name.strip() == 'csrftoken':
+                return value
+        raise CommandError('Сервер не выдал csrftoken — POST на /contact/ воспроизвести нельзя')
+
+    async def replay(self, entries, options):
+        post_headers = {}
+        post_body = b''
+        if any(entry.method == 'POST' for entry in entries):
+            token = await self.csrf_token(options)
+            post_headers = {
+                'Cookie': f'csrftoken={token}',
+                'X-CSRFToken': token,
+                'X-Requested-With': 'XMLHttpRequest',
+                'Content-Type': 'application/x-www-form-urlencoded',
+            }
+            post_body = urlencode(CONTACT_FORM).encode()
+
+        queue = asyncio.Queue(maxsize=options['concurrency'] * 2)
+        results = []
+
+        async def worker():
+            connection = HttpConnection(options['target'], options['host'], options['timeout'])
+            try:
+                while True:
+                    entry = await queue.get()
+                    if entry is None:
+                        return
+                    is_post = entry.method == 'POST'
+                    started = time.perf_counter()
+                    try:
+                        status, _ = await connection.request(
+                            entry.method, entry.path,
+                            post_headers if is_post else None,
+                            post_body if is_post else b'',
+                        )
+                    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                        status = None
+                    results.append(Result(entry.route, status, time.perf_counter() - started))
+            finally:
+                await connection.close()
+
+        loop = asyncio.get_running_loop()
+        workers = [asyncio.create_task(worker()) for _ in range(options['concurrency'])]
+        started = loop.time()
+        first = entries[0].time
+        lag = 0.0
+        for entry in entries:
+            if options['speed']:
+                due = started + (entry.time - first).total_seconds() / options['speed']
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    # Исполнители не успевают — запросы уходят позже расписания
+                    lag = max(lag, -delay)
+            await queue.put(entry)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        return results, loop.time() - started, lag
+
+    # ==================== ОТЧЁТ ====================
+
+    def report(self, results, elapsed, lag):
+        by_route = defaultdict(list)
+        for result in results:
+            by_route[result.route].append(result)
+
+        header = f'{"Маршрут":<34} {"Запр.":>6} {"RPS":>7} {"p50":>7} {"p90":>7} {"p99":>7} {"max":>7} {"Ошибки":>7} {"4xx":>6}'
+        self.stdout.write('')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        rows = sorted(by_route.items(), key=lambda item: -len(item[1]))
+        for route, route_results in rows + [('ВСЕГО', results)]:
+            self.stdout.write(self.format_row(route, route_results, elapsed))
+
+        self.stdout.write('')
+        self.stdout.write(f'Время: {elapsed:.1f} с, задержки в мс')
+        if lag > 0.1:
+            self.stdout.write(self.style.WARNING(
+                f'Отставание от расписания до {lag:.1f} с — сервер (или --concurrency) '
+                f'не справляется с темпом лога'
+            ))
+
+    def format_row(self, route, results, elapsed):
+        latencies = sorted(result.latency * 1000 for result in results)
+        errors = sum(1 for result in results if result.status is None or result.status >= 500)
+        client_errors = sum(1 for result in results if result.status and 400 <= result.status < 500)
+        return (
+            f'{route[:34]:<34} {len(results):>6} {len(results) / elapsed:>7.1f} '
+            f'{percentile(latencies, 0.5):>7.1f} {percentile(latencies, 0.9):>7.1f} '
+            f'{percentile(latencies, 0.99):>7.1f} {latencies[-1]:>7.1f} '
+            f'{errors * 100 / len(results):>6.1f}% {client_errors * 100 / len(results):>5.1f}%'
+        )
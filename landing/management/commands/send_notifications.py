@@ -0,0 +1,39 @@
+"""
+Management команда для отправки накопившихся уведомлений о заявках
+
+Обычно письма отправляет поток уведомлений воркера (landing/notifications.py);
+команда нужна, чтобы разослать очередь вручную — например, после сбоя
+SMTP или чтобы не ждать окна дайджеста (--force).
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from landing.notifications import Dispatcher, pending
+
+
+class Command(BaseCommand):
+    help = 'Отправить накопившиеся уведомления о заявках'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Отправить дайджест сразу, не дожидаясь окна NOTIFY_DIGEST_MINUTES',
+        )
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher()
+        total = 0
+        try:
+            while True:
+                count, delay = dispatcher.dispatch(force=options['force'])
+                total += count
+                if delay != 0:
+                    break
+        finally:
+            dispatcher.close()
+
+        left = pending().count()
+        self.stdout.write(self.style.SUCCESS(f'✓ Отправлено уведомлений по заявкам: {total}'))
+        if left:
+            mode = f'дайджест раз в {settings.NOTIFY_DIGEST_MINUTES} мин' if settings.NOTIFY_DIGEST_MINUTES else 'ошибка отправки'
+            self.stdout.write(self.style.WARNING(f'  В очереди осталось {left} ({mode})'))
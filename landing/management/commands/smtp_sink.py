@@ -0,0 +1,129 @@
+"""
+Management команда: локальный SMTP-сервер для проверки уведомлений
+
+Принимает любые письма (без TLS; AUTH PLAIN принимается с любым
+паролем), печатает отправителя, получателей и тему, с --outdir
+сохраняет письма в .eml. Письма считаются по соединениям — видно,
+переиспользует ли отправитель SMTP-соединение.
+
+    python manage.py smtp_sink --port 1025 --connect-delay 0.3
+
+Сайт, отправляющий почту в sink:
+
+    EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend EMAIL_HOST=127.0.0.1 \\
+    EMAIL_PORT=1025 EMAIL_USE_TLS=False python manage.py runserver
+
+--connect-delay задерживает приветствие сервера — так же, как установка
+соединения и TLS с удалённым SMTP-сервером.
+"""
+import asyncio
+import itertools
+import os
+import time
+from email import policy
+from email.parser import BytesHeaderParser
+
+from django.core.management.base import BaseCommand
+
+HOSTNAME = 'smtp-sink.local'
+
+
+class Command(BaseCommand):
+    help = 'Локальный SMTP-сервер, принимающий письма для проверки уведомлений'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Адрес')
+        parser.add_argument('--port', type=int, default=1025, help='Порт')
+        parser.add_argument('--outdir', help='Каталог для писем (.eml)')
+        parser.add_argument(
+            '--connect-delay', type=float, default=0.0,
+            help='Задержка приветствия, с (имитация TLS-рукопожатия)',
+        )
+
+    def handle(self, *args, **options):
+        self.outdir = options['outdir']
+        self.connect_delay = options['connect_delay']
+        self.connection_ids = itertools.count(1)
+        self.total = 0
+        if self.outdir:
+            os.makedirs(self.outdir, exist_ok=True)
+        try:
+            asyncio.run(self.serve(options['host'], options['port']))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'✓ Принято писем: {self.total}'))
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.session, host, port)
+        self.stdout.write(f'SMTP sink на {host}:{port}, Ctrl+C — остановить')
+        async with server:
+            await server.serve_forever()
+
+    async def session(self, reader, writer):
+        connection_id = next(self.connection_ids)
+        messages = 0
+        sender, recipients = None, []
+
+        async def reply(line):
+            writer.write(line.encode() + b'\r\n')
+            await writer.drain()
+
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        await reply(f'220 {HOSTNAME} ESMTP sink')
+        try:
+            while line := await reader.readline():
+                command = line.decode('utf-8', 'replace').rstrip('\r\n')
+                verb = command.split(' ', 1)[0].upper()
+                if verb == 'EHLO':
+                    await reply(f'250-{HOSTNAME}\r\n250-8BITMIME\r\n250-SMTPUTF8\r\n250 AUTH PLAIN')
+                elif verb == 'HELO':
+                    await reply(f'250 {HOSTNAME}')
+                elif verb == 'AUTH':
+                    await reply('235 2.7.0 Authentication successful')
+                elif verb == 'MAIL':
+                    sender, recipients = command[10:].strip(), []
+                    await reply('250 OK')
+                elif verb == 'RCPT':
+                    recipients.append(command[8:].strip())
+                    await reply('250 OK')
+                elif verb == 'DATA':
+                    await reply('354 End data with <CR><LF>.<CR><LF>')
+                    data = await self.read_data(reader)
+                    messages += 1
+                    self.total += 1
+                    self.received(connection_id, messages, sender, recipients, data)
+                    await reply('250 OK: queued')
+                elif verb == 'RSET':
+                    sender, recipients = None, []
+                    await reply('250 OK')
+                elif verb == 'NOOP':
+                    await reply('250 OK')
+                elif verb == 'QUIT':
+                    await reply('221 Bye')
+                    break
+                else:
+                    await reply('502 Command not implemented')
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        self.stdout.write(f'[{connection_id}] соединение закрыто, писем: {messages}')
+
+    async def read_data(self, reader):
+        lines = []
+        while (line := await reader.readline()) not in (b'.\r\n', b'.\n', b''):
+            # Снять dot-stuffing (RFC 5321, 4.5.2)
+            lines.append(line[1:] if line.startswith(b'.') else line)
+        return b''.join(lines)
+
+    def received(self, connection_id, number, sender, recipients, data):
+        headers = BytesHeaderParser(policy=policy.default).parsebytes(data)
+        subject = str(headers.get('Subject', '')).strip()
+        self.stdout.write(
+            f'[{connection_id}] #{number} {sender} -> {", ".join(recipients)}: {subject}'
+        )
+        if self.outdir:
+            name = f'{time.strftime("%Y%m%d-%H%M%S")}-{connection_id}-{number}.eml'
+            with open(os.path.join(self.outdir, name), 'wb') as f:
+                f.write(data)
@@ -0,0 +1,325 @@
+"""
+Management команда: длительная нагрузка и рост памяти воркеров по маршрутам
+
+Часами гоняет GET-запросы к серверу фазами: каждая фаза (--phase секунд)
+нагружает один маршрут, маршруты идут по кругу. До и после фазы, а также
+каждые --sample секунд снимается суммарная память воркеров; рост USS за
+фазу, делённый на число запросов, — рост памяти маршрута на запрос.
+Перед замерами каждый маршрут прогревается (--warmup запросов): первые
+запросы заполняют кэши, это не утечка.
+
+Воркеры и их PID команда берёт из телеметрии (landing/memory.py, MEMORY_DIR),
+память читает из /proc — запускайте на той же машине (в том же
+контейнере), что и gunicorn. Перезапуск воркеров посреди фазы портит
+замер, такие фазы не учитываются — на время теста отключите его:
+
+    GUNICORN_MAX_REQUESTS=0 MEMORY_TELEMETRY_INTERVAL=10 gunicorn arsenal_site.wsgi -c gunicorn.conf.py
+    python manage.py soak_test --duration 4h --phase 300 --out soak
+
+В --out: samples.csv (все замеры), phases.csv (фазы) и memory.svg —
+график USS по времени с фазами маршрутов и рост по маршрутам. В конце —
+оценка GUNICORN_MAX_REQUESTS по бюджету памяти воркера.
+
+Маршруты с записью в БД (заявки, скачивания) не нагружаются.
+"""
+import argparse
+import asyncio
+import csv
+import html
+import itertools
+import os
+import random
+import re
+import statistics
+import time
+import zlib
+from collections import defaultdict, namedtuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from landing.api import ALL_RESOURCES, API_RESOURCES
+from landing.management.commands.replay_traffic import HttpConnection
+from landing.management.commands.spam_filter import vocabulary
+from landing.memory import list_workers, polyline, process_memory
+from landing.sections import SECTION_DEPENDENCIES
+
+DURATION_RE = re.compile(r'^(\d+(?:\.\d+)?)([smh]?)$')
+DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600}
+
+Sample = namedtuple('Sample', 'elapsed route requests rss uss workers')
+Phase = namedtuple('Phase', 'route started requests errors growth restarted')
+
+CHART_WIDTH = 1000
+CHART_HEIGHT = 300
+BAR_HEIGHT = 18
+
+
+def duration(value):
+    """'90', '90s', '30m', '4h' -> секунды"""
+    match = DURATION_RE.match(value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f'Неверная длительность: {value}')
+    return float(match[1]) * DURATION_UNITS[match[2]]
+
+
+def soak_routes():
+    """Маршрут -> пути GET без записи в БД"""
+    words = vocabulary()
+    return {
+        'landing:index': ['/'],
+        'landing:section_fragment': [
+            reverse('landing:section_fragment', args=[name]) for name in SECTION_DEPENDENCIES
+        ],
+        'landing:privacy': [reverse('landing:privacy')],
+        'landing:cookies': [reverse('landing:cookies')],
+        'landing:api_resource': [
+            reverse('landing:api_resource', args=[resource]) for resource in [*API_RESOURCES, ALL_RESOURCES]
+        ],
+        # Разные запросы: неограниченно растущий кэш по строке запроса тоже утечка
+        'landing:search': [f'{reverse("landing:search")}?q={quote(word)}' for word in words],
+        'landing:icon_sprite': [reverse('landing:icon_sprite')],
+    }
+
+
+def worker_memory():
+    """(PID живых воркеров, суммарный RSS, суммарный USS)"""
+    pids, rss, uss = [], 0, 0
+    for worker in list_workers():
+        if not worker['alive']:
+            continue
+        # /proc точнее и свежее файла телеметрии; файл — если /proc недоступен
+        memory = process_memory(worker['pid']) or worker['memory']
+        pids.append(worker['pid'])
+        rss += memory.get('rss', 0)
+        uss += memory.get('uss', 0)
+    return sorted(pids), rss, uss
+
+
+def route_color(route):
+    return f'hsl({zlib.crc32(route.encode()) % 360}, 55%, 80%)'
+
+
+class Command(BaseCommand):
+    help = 'Длительная нагрузка по маршрутам с замером роста памяти воркеров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', default='http://127.0.0.1:8000', help='Адрес сервера')
+        parser.add_argument('--host', default='localhost', help='Заголовок Host (должен быть в ALLOWED_HOSTS)')
+        parser.add_argument('--duration', type=duration, default='1h', help='Длительность: 90s, 30m, 4h')
+        parser.add_argument('--phase', type=duration, default='5m', help='Длительность фазы одного маршрута')
+        parser.add_argument('--sample', type=duration, default='5s', help='Интервал замеров памяти')
+        parser.add_argument('--concurrency', type=int, default=8, help='Одновременных запросов')
+        parser.add_argument('--warmup', type=int, default=200, help='Запросов прогрева на маршрут')
+        parser.add_argument('--routes', help='Только эти маршруты, через запятую (landing:index,...)')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Таймаут запроса, с')
+        parser.add_argument('--out', default='soak', help='Каталог для CSV и графика')
+
+    def handle(self, *args, **options):
+        routes = soak_routes()
+        if options['routes']:
+            names = [name.strip() for name in options['routes'].split(',')]
+            unknown = set(names) - set(routes)
+            if unknown:
+                raise CommandError(f'Неизвестные маршруты: {", ".join(sorted(unknown))}; есть: {", ".join(routes)}')
+            routes = {name: routes[name] for name in names}
+        if options['concurrency'] < 1 or options['phase'] <= 0:
+            raise CommandError('--concurrency должен быть ≥ 1, --phase > 0')
+
+        pids, _, _ = worker_memory()
+        if not pids:
+            raise CommandError(
+                f'Нет телеметрии живых воркеров в {settings.MEMORY_DIR}: сервер должен работать '
+                f'на этой машине с MEMORY_TELEMETRY_ENABLED=True'
+            )
+        self.stdout.write(
+            f'Воркеров: {len(pids)}, маршрутов: {len(routes)}, фаза {options["phase"]:.0f} с, '
+            f'всего {options["duration"] / 3600:.1f} ч, параллельно {options["concurrency"]}'
+        )
+
+        samples, phases = asyncio.run(self.soak(routes, options))
+        os.makedirs(options['out'], exist_ok=True)
+        self.write_csv(options['out'], samples, phases)
+        growth = self.report(phases)
+        self.write_chart(os.path.join(options['out'], 'memory.svg'), samples, phases, growth)
+        self.stdout.write(self.style.SUCCESS(f'✓ Результаты в {options["out"]}/'))
+
+    # ==================== НАГРУЗКА ====================
+
+    async def soak(self, routes, options):
+        connections = [
+            HttpConnection(options['target'], options['host'], options['timeout'])
+            for _ in range(options['concurrency'])
+        ]
+        rng = random.Random(1)
+        samples, phases = [], []
+        started = time.monotonic()
+        requests = 0
+
+        def sample(route):
+            pids, rss, uss = worker_memory()
+            samples.append(Sample(round(time.monotonic() - started, 1), route, requests, rss, uss, len(pids)))
+            return pids, uss
+
+        async def drive(paths, until=None, count=None):
+            """Запросы к путям маршрута до момента until или count штук: (ответов, ошибок)"""
+            done, errors = 0, 0
+            budget = itertools.count() if count is None else iter(range(count))
+
+            async def client(connection):
+                nonlocal done, errors, requests
+                while (until is None or time.monotonic() < until) and next(budget, None) is not None:
+                    try:
+                        status, _ = await connection.request('GET', rng.choice(paths))
+                    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                        status = None
+                    done += 1
+                    requests += 1
+                    if status is None or status >= 500:
+                        errors += 1
+
+            await asyncio.gather(*(client(connection) for connection in connections))
+            return done, errors
+
+        async def sampler(route, until):
+            while time.monotonic() < until:
+                await asyncio.sleep(min(options['sample'], max(0, until - time.monotonic())))
+                sample(route)
+
+        try:
+            self.stdout.write('Прогрев маршрутов...')
+            for route, paths in routes.items():
+                await drive(paths, count=options['warmup'])
+            sample('warmup')
+
+            deadline = started + options['duration']
+            for route in itertools.cycle(routes):
+                now = time.monotonic()
+                if now >= deadline - 1:
+                    break
+                until = min(now + options['phase'], deadline)
+                pids_before, uss_before = sample(route)
+                phase_started = samples[-1].elapsed
+                sampling = asyncio.create_task(sampler(route, until))
+                done, errors = await drive(routes[route], until=until)
+                await sampling
+                pids_after, uss_after = sample(route)
+                phase = Phase(
+                    route, phase_started, done, errors, uss_after - uss_before, pids_before != pids_after,
+                )
+                phases.append(phase)
+                self.stdout.write(
+                    f'  {route:<26} {done:>7} запр. {errors:>4} ошибок  '
+                    f'USS {phase.growth / 1024:+9.0f} КБ'
+                    + ('  (воркеры перезапускались — не учитывается)' if phase.restarted else '')
+                )
+        finally:
+            for connection in connections:
+                await connection.close()
+        return samples, phases
+
+    # ==================== ОТЧЁТ ====================
+
+    def write_csv(self, out, samples, phases):
+        with open(os.path.join(out, 'samples.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['elapsed_s', 'route', 'requests', 'rss_bytes', 'uss_bytes', 'workers'])
+            writer.writerows(samples)
+        with open(os.path.join(out, 'phases.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['route', 'started_s', 'requests', 'errors', 'uss_growth_bytes', 'workers_restarted'])
+            writer.writerows(phases)
+
+    def report(self, phases):
+        """Печатает таблицу по маршрутам; возвращает {маршрут: КБ на 1000 запросов}"""
+        by_route = defaultdict(list)
+        for phase in phases:
+            if not phase.restarted and phase.requests:
+                by_route[phase.route].append(phase)
+
+        header = f'{"Маршрут":<26} {"Фаз":>4} {"Запросов":>9} {"Ошибок":>7} {"Рост USS, КБ":>13} {"КБ/1000 запр.":>14}'
+        self.stdout.write('')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        growth = {}
+        for route, route_phases in by_route.items():
+            # Медиана по фазам: разовые выбросы (сборка мусора, кэш) не искажают оценку
+            rate = statistics.median(phase.growth / phase.requests for phase in route_phases) * 1000 / 1024
+            growth[route] = rate
+            self.stdout.write(
+                f'{route:<26} {len(route_phases):>4} {sum(p.requests for p in route_phases):>9} '
+                f'{sum(p.errors for p in route_phases):>7} '
+                f'{sum(p.growth for p in route_phases) / 1024:>13.0f} {rate:>14.2f}'
+            )
+
+        valid = [phase for phase in phases if not phase.restarted]
+        total_requests = sum(phase.requests for phase in valid)
+        if not total_requests:
+            self.stdout.write(self.style.WARNING('Нет фаз без перезапуска воркеров — оценки нет'))
+            return growth
+        per_request = sum(phase.growth for phase in valid) / total_requests
+        self.stdout.write('')
+        self.stdout.write(f'В среднем по всем фазам: {per_request * 1000 / 1024:.2f} КБ на 1000 запросов')
+
+        pids, _, uss = worker_memory()
+        budget = settings.MEMORY_WORKER_BUDGET_MB * 1024 * 1024
+        if per_request <= 0 or not pids:
+            self.stdout.write('Устойчивого роста памяти нет — перезапуск воркеров по числу запросов не нужен')
+        else:
+            headroom = int((budget - uss / len(pids)) / per_request)
+            self.stdout.write(
+                f'Воркер дойдёт до бюджета {settings.MEMORY_WORKER_BUDGET_MB} МБ примерно за '
+                f'{max(headroom, 0)} запросов — ориентир для GUNICORN_MAX_REQUESTS'
+            )
+        return growth
+
+    def write_chart(self, path, samples, phases, growth):
+        """SVG: суммарный USS по времени на фоне фаз маршрутов и рост по маршрутам"""
+        total_time = (samples[-1].elapsed or 1) if samples else 1
+        bars_top = CHART_HEIGHT + 40
+        height = bars_top + BAR_HEIGHT * len(growth) + 20
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH + 220}" height="{height}" '
+            f'font-family="sans-serif" font-size="12">'
+        ]
+        for i, phase in enumerate(phases):
+            end = phases[i + 1].started if i + 1 < len(phases) else total_time
+            x = phase.started / total_time * CHART_WIDTH
+            width = max((end - phase.started) / total_time * CHART_WIDTH, 0.5)
+            parts.append(
+                f'<rect x="{x:.1f}" y="0" width="{width:.1f}" height="{CHART_HEIGHT}" '
+                f'fill="{route_color(phase.route)}"><title>{html.escape(phase.route)}</title></rect>'
+            )
+
+        uss = [sample.uss for sample in samples]
+        if len(uss) > 1:
+            # polyline равномерна по точкам, замеры — почти равномерны по времени
+            parts.append(
+                f'<polyline points="{polyline(uss, CHART_WIDTH, CHART_HEIGHT)}" '
+                f'fill="none" stroke="#1f3b57" stroke-width="1.5"/>'
+            )
+            parts.append(
+                f'<text x="{CHART_WIDTH + 8}" y="12">USS макс. {max(uss) / 2 ** 20:.1f} МБ</text>'
+                f'<text x="{CHART_WIDTH + 8}" y="{CHART_HEIGHT}">USS мин. {min(uss) / 2 ** 20:.1f} МБ</text>'
+            )
+        parts.append(
+            f'<text x="0" y="{CHART_HEIGHT + 16}">0 с</text>'
+            f'<text x="{CHART_WIDTH}" y="{CHART_HEIGHT + 16}" text-anchor="end">{total_time:.0f} с</text>'
+        )
+
+        scale = max((abs(rate) for rate in growth.values()), default=0) or 1
+        middle = CHART_WIDTH / 2
+        parts.append(f'<text x="0" y="{bars_top - 8}">Рост USS, КБ на 1000 запросов</text>')
+        for i, (route, rate) in enumerate(sorted(growth.items(), key=lambda item: -item[1])):
+            y = bars_top + i * BAR_HEIGHT
+            width = abs(rate) / scale * (CHART_WIDTH / 2 - 10)
+            x = middle if rate >= 0 else middle - width
+            parts.append(
+                f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{BAR_HEIGHT - 4}" fill="{route_color(route)}" stroke="#555"/>'
+                f'<text x="{CHART_WIDTH + 8}" y="{y + 11}">{html.escape(route)}: {rate:.2f}</text>'
+            )
+        parts.append('</svg>')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(parts))
@@ -0,0 +1,199 @@
+"""
+Management команда: состояние фильтра повторяющихся заявок
+
+Без аргументов печатает размер файла фильтра, заполнение поколений и
+оценку вероятности ложного срабатывания при текущем заполнении.
+
+    python manage.py spam_filter
+    python manage.py spam_filter --clear
+    python manage.py spam_filter --evaluate 10000
+
+--evaluate меряет фильтр на синтетических заявках во временном файле
+(рабочий фильтр не меняется): половина корпуса записывается, по второй
+половине — другие заявки из тех же типовых фраз и слов шаблонов сайта —
+считается доля ложных срабатываний (сработало, а сходство шинглов с любой
+записанной заявкой ниже NEAR_DUPLICATE); по изменённым копиям спам-текста —
+доля пойманных повторов.
+"""
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from landing import spam
+from landing.stats import percentile
+
+# Сходство (Жаккар по шинглам), начиная с которого срабатывание не ложное
+NEAR_DUPLICATE = 0.5
+
+# Типовые фразы заявок: у настоящих заявок много общих оборотов
+GREETINGS = ['Здравствуйте.', 'Добрый день!', 'Добрый вечер.', 'Приветствую.', '']
+REQUESTS = [
+    'Интересует стоимость системы', 'Прошу выслать коммерческое предложение на',
+    'Хотим рассмотреть поставку', 'Нужна консультация по', 'Рассматриваем закупку',
+    'Подскажите сроки поставки', 'Просим рассчитать цену на', 'Интересует возможность тестирования',
+]
+OBJECTS = [
+    'комплекса для аэродрома', 'системы отпугивания птиц', 'двух турелей с сервером',
+    'комплекта для полигона ТБО', 'оборудования для сельхозпредприятия', 'установки на объект',
+    'системы с радаром', 'пилотного комплекта', 'комплекса для порта', 'решения для АЭС',
+]
+DETAILS = [
+    'Площадь объекта около {n} га.', 'Взлётно-посадочная полоса {n} метров.',
+    'Планируем {n} точек установки.', 'Бюджет на {year} год уже утверждён.',
+    'Нужен монтаж в {city}.', 'Объект находится в {city}.', 'Требуется интеграция с нашей системой.',
+    'Есть ли опыт работы на подобных объектах?', 'Какие гарантийные условия?',
+    'Работаем с НДС.', 'Закупка по 223-ФЗ.', 'Нужна документация для тендера.',
+]
+CLOSINGS = [
+    'Свяжитесь со мной, пожалуйста.', 'Жду ответа на почту.', 'Перезвоните по телефону {phone}.',
+    'Спасибо.', 'С уважением, {name}.', '',
+]
+CITIES = ['Казани', 'Самаре', 'Новосибирске', 'Мурманске', 'Сочи', 'Екатеринбурге', 'Калининграде']
+NAMES = ['Игорь', 'Анна', 'Сергей Петрович', 'Ольга', 'Дмитрий', 'Мария', 'Алексей']
+
+SPAM_TEXTS = [
+    'Продвижение вашего сайта в топ поисковых систем за 7 дней. Гарантия результата, '
+    'оплата после выхода в топ. Подробности и цены по ссылке, пишите в телеграм.',
+    'Предлагаем базы данных предприятий вашего региона с контактами руководителей. '
+    'Актуализация каждый месяц, выгрузка в Excel, скидка при заказе сегодня.',
+    'Ваш сайт теряет клиентов! Бесплатный аудит и разработка нового дизайна под ключ. '
+    'Сделаем лендинг за три дня, первые заявки уже через неделю.',
+]
+
+
+def vocabulary():
+    """Слова шаблонов сайта — словарь для свободного текста заявок"""
+    templates = Path(apps.get_app_config('landing').path) / 'templates'
+    words = set()
+    for path in templates.rglob('*.html'):
+        words.update(word for word in spam.WORD_RE.findall(spam.normalize(path.read_text(encoding='utf-8'))) if len(word) > 3 and not word.isascii())
+    return sorted(words)
+
+
+def legit_message(rng, words):
+    fill = {
+        'n': rng.randint(2, 900), 'year': rng.choice([2026, 2027]),
+        'city': rng.choice(CITIES), 'phone': f'+7 9{rng.randint(10, 99)} {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}',
+        'name': rng.choice(NAMES),
+    }
+    parts = [rng.choice(GREETINGS), f'{rng.choice(REQUESTS)} {rng.choice(OBJECTS)}.']
+    parts += [detail.format(**fill) for detail in rng.sample(DETAILS, rng.randint(0, 2))]
+    parts += [
+        ' '.join(rng.choices(words, k=rng.randint(4, 10))).capitalize() + '.'
+        for _ in range(rng.randint(1, 3))
+    ]
+    parts.append(rng.choice(CLOSINGS).format(**fill))
+    return ' '.join(part for part in parts if part)
+
+
+def spam_variant(rng, text):
+    """Копия спама с правками: замена слов, подпись, регистр, пробелы"""
+    words = text.split()
+    for _ in range(rng.randint(0, 2)):
+        words[rng.randrange(len(words))] = rng.choice(['срочно', 'выгодно', 'недорого', 'сейчас'])
+    if rng.random() < 0.5:
+        words.append(f'{rng.choice(NAMES)}, +7 9{rng.randint(10, 99)} {rng.randint(1000000, 9999999)}')
+    if rng.random() < 0.3:
+        words = [word.upper() for word in words]
+    return rng.choice([' ', '  ', '\n']).join(words)
+
+
+def similarity(a, b):
+    return len(a & b) / len(a | b)
+
+
+class Command(BaseCommand):
+    help = 'Состояние фильтра повторяющихся заявок (размер, заполнение, ложные срабатывания)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Очистить фильтр')
+        parser.add_argument(
+            '--evaluate', type=int, metavar='N',
+            help='Проверить фильтр на N синтетических заявках во временном файле',
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Seed генератора заявок')
+
+    def handle(self, *args, **options):
+        if options['evaluate']:
+            return self.evaluate(options['evaluate'], options['seed'])
+
+        if options['clear']:
+            if os.path.exists(settings.SPAM_FILTER_PATH):
+                os.remove(settings.SPAM_FILTER_PATH)
+            self.stdout.write(self.style.SUCCESS('✓ Фильтр очищен'))
+            return
+
+        self.report(spam.get_filter().stats())
+
+    def report(self, stats):
+        self.stdout.write(
+            f'Файл: {stats["bytes"] / 1024:.0f} КБ '
+            f'({stats["bits"]} бит x {spam.GENERATIONS} поколения, хэш-функций: {stats["hashes"]})'
+        )
+        if not stats['fill']:
+            self.stdout.write('Живых поколений нет — фильтр пуст')
+        for slot, ratio in stats['fill'].items():
+            self.stdout.write(f'Поколение {slot}: заполнено {ratio:.2%} бит')
+        self.stdout.write(
+            f'Ложное совпадение полосы: {stats["key_error_rate"]:.2e}, '
+            f'заявки ({spam.MATCH_BANDS}+ полос из {spam.BANDS}): {stats["message_error_rate"]:.2e}'
+        )
+
+    def evaluate(self, count, seed):
+        rng = random.Random(seed)
+        capacity = settings.SPAM_FILTER_CAPACITY
+        words = vocabulary()
+        legit = list(dict.fromkeys(legit_message(rng, words) for _ in range(count * 2)))
+        stored, probes = legit[:count // 2], legit[count // 2:count]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            bloom = spam.SharedBloom(os.path.join(tmp, 'spam-filter.bin'), capacity, settings.SPAM_FILTER_WINDOW)
+            check_times = []
+
+            def is_duplicate(message):
+                started = time.perf_counter()
+                keys = spam.fingerprint(message)
+                result = keys is not None and bloom.count(keys) >= spam.MATCH_BANDS
+                check_times.append(time.perf_counter() - started)
+                return result
+
+            skipped = 0
+            for message in stored:
+                keys = spam.fingerprint(message)
+                if keys is None:
+                    skipped += 1
+                else:
+                    bloom.add(keys)
+            for text in SPAM_TEXTS:
+                bloom.add(spam.fingerprint(text))
+
+            flagged = [message for message in probes if is_duplicate(message)]
+            variants = [spam_variant(rng, rng.choice(SPAM_TEXTS)) for _ in range(len(probes))]
+            caught = sum(is_duplicate(message) for message in variants)
+            stats = bloom.stats()
+            bloom.close()
+
+        self.stdout.write(f'Записано заявок: {len(stored) - skipped} (коротких, без проверки: {skipped})')
+        self.report(stats)
+        # Настоящее сходство считаем только для сработавших — их немного
+        stored_shingles = [spam.shingles(message) for message in stored]
+        false_positives = sum(
+            max(similarity(spam.shingles(message), other) for other in stored_shingles) < NEAR_DUPLICATE
+            for message in flagged
+        )
+        self.stdout.write(
+            f'Сработало на других заявках: {len(flagged)}/{len(probes)}, из них ложно '
+            f'(сходство < {NEAR_DUPLICATE}): {false_positives} ({false_positives / len(probes):.3%})'
+        )
+        self.stdout.write(f'Пойманы изменённые копии спама: {caught}/{len(variants)} ({caught / len(variants):.1%})')
+        check_times.sort()
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Проверка заявки: p50 {percentile(check_times, 0.5) * 1e6:.0f} мкс, '
+            f'p99 {percentile(check_times, 0.99) * 1e6:.0f} мкс'
+        ))
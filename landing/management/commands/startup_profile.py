@@ -0,0 +1,120 @@
+"""
+Management команда для профилирования холодного старта воркера
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном интерпретаторе с -X importtime
+PROBE = '''
+import json, time
+timings = {}
+started = time.perf_counter()
+def mark(name):
+    global started
+    now = time.perf_counter()
+    timings[name] = (now - started) * 1000
+    started = now
+
+import django
+mark('import django')
+django.setup()
+mark('django.setup')
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+mark('wsgi application')
+from landing import warmup
+warmup.load_urlconf()
+mark('urlconf + views')
+warmup.compile_templates()
+mark('templates')
+try:
+    warmup.prime_caches()
+except Exception as exc:
+    timings['caches_error'] = str(exc)
+mark('content caches')
+import sys
+timings['requests_loaded'] = 'requests' in sys.modules
+print(json.dumps(timings))
+'''
+
+
+def parse_importtime(stderr):
+    """Разбор вывода -X importtime: [(модуль, self_us, cumulative_us)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            rows.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Профиль холодного старта: время этапов загрузки и импорта модулей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15,
+                            help='Сколько модулей и пакетов показать')
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести результат в JSON (для отслеживания в CI)')
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'arsenal_site.settings')
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        if proc.returncode != 0:
+            raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr else 'Probe failed')
+
+        phases = json.loads(proc.stdout.strip().splitlines()[-1])
+        imports = parse_importtime(proc.stderr)
+
+        packages = defaultdict(int)
+        for name, self_us, _ in imports:
+            packages[name.split('.')[0]] += self_us
+        top_packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:options['top']]
+        top_modules = sorted(imports, key=lambda row: row[2], reverse=True)[:options['top']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'phases_ms': {k: v for k, v in phases.items() if isinstance(v, float)},
+                'packages_ms': {name: us / 1000 for name, us in top_packages},
+                'modules_cumulative_ms': {name: cum / 1000 for name, _, cum in top_modules},
+                'total_import_ms': sum(row[1] for row in imports) / 1000,
+                'requests_loaded': phases.get('requests_loaded'),
+            }, ensure_ascii=False))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Этапы загрузки'))
+        total = 0.0
+        for name, value in phases.items():
+            if isinstance(value, float):
+                total += value
+                self.stdout.write(f'  {name:<20} {value:9.1f} мс')
+        self.stdout.write(f'  {"итого":<20} {total:9.1f} мс')
+        if 'caches_error' in phases:
+            self.stdout.write(self.style.WARNING(f'  Кэши не прогреты: {phases["caches_error"]}'))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Импорт по пакетам (self)'))
+        for name, us in top_packages:
+            self.stdout.write(f'  {name:<30} {us / 1000:9.1f} мс')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Самые дорогие модули (cumulative)'))
+        for name, _, cumulative_us in top_modules:
+            self.stdout.write(f'  {name:<45} {cumulative_us / 1000:9.1f} мс')
+
+        self.stdout.write(
+            f'\nВсего на импорт: {sum(row[1] for row in imports) / 1000:.1f} мс, '
+            f'requests загружен: {"да" if phases.get("requests_loaded") else "нет"}'
+        )
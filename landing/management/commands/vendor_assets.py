@@ -0,0 +1,259 @@
+"""
+Management команда для сборки локальных копий сторонних ассетов
+
+Берёт исходники из vendor/ и пишет в static/vendor/:
+    fonts.css, fonts/inter.woff2, fonts/jetbrains-mono.woff2
+    fontawesome.css, fonts/fa-solid-900.woff2
+    aos.css, aos.js, glightbox.css, glightbox.js
+
+Иконочный шрифт урезается до иконок, которые встречаются в шаблонах
+и JS (поля icon моделей рисуются SVG-спрайтом, см. landing/icons.py);
+текстовые шрифты — до символов шаблонов и контента плюс базовые
+диапазоны (TEXT_UNICODE_RANGES). Отсутствующие исходники
+пропускаются — такие ассеты по-прежнему идут с CDN. Сейчас в vendor/
+лежит только Font Awesome; исходники Inter, JetBrains Mono, AOS и
+GLightbox кладутся по путям из landing/vendor.py (TEXT_FONTS,
+COPIED_ASSETS), после чего команда собирает и их.
+
+Нужен fontTools (pip install fonttools brotli) — только для сборки,
+на сервере он не требуется.
+"""
+import os
+import re
+from importlib.util import find_spec
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, models
+
+from landing.css import css_blocks, split_selectors
+from landing.vendor import (
+    COPIED_ASSETS, ICON_FONT, STATIC_VENDOR_DIR, TEXT_FONTS,
+    TEXT_UNICODE_RANGES, VENDOR_DIR
+)
+
+SCANNED_SUFFIXES = ('.html', '.js')
+ICON_CLASS_RE = re.compile(r'\bfa-([a-z0-9-]+)')
+GLYPH_RULE_RE = re.compile(r'([^{}]+)\{content:"\\([0-9a-f]+)"\}')
+
+# Базовые правила иконочного шрифта (из fontawesome.css — только нужное)
+ICON_BASE_CSS = (
+    '.fa,.fas,.fa-solid{display:inline-block;font-family:"%(family)s";'
+    'font-style:normal;font-variant:normal;font-weight:%(weight)d;line-height:1;'
+    'text-rendering:auto;-webkit-font-smoothing:antialiased;'
+    '-moz-osx-font-smoothing:grayscale}'
+)
+
+
+def _write(path, data):
+    """Атомарно записать файл"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data if isinstance(data, bytes) else data.encode())
+    os.replace(tmp_path, path)
+
+
+def _select_rules(css, classes):
+    """Правила (в т.ч. внутри @media), где среди селекторов есть один из classes"""
+    rules, animations = [], set()
+    for prelude, body in css_blocks(css):
+        if prelude.startswith('@media'):
+            inner, inner_animations = _select_rules(body, classes)
+            if inner:
+                rules.append(f'{prelude}{{{"".join(inner)}}}')
+                animations |= inner_animations
+        elif not prelude.startswith('@') and set(split_selectors(prelude)) & classes:
+            rules.append(f'{prelude}{{{body}}}')
+            animations.update(re.findall(r'(?<![\w-])animation-name:([\w-]+)', body))
+    return rules, animations
+
+
+def _unicode_range(codepoints):
+    """Сжать набор кодов в значение unicode-range: U+20-7E,U+A0-FF,…"""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ','.join(
+        f'U+{start:X}' if start == end else f'U+{start:X}-{end:X}'
+        for start, end in ranges
+    )
+
+
+class Command(BaseCommand):
+    help = 'Собрать локальные копии шрифтов, иконок и JS-библиотек в static/vendor/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-db',
+            action='store_true',
+            help='Не читать контент из БД (только шаблоны и базовые диапазоны)',
+        )
+
+    def handle(self, *args, **options):
+        if find_spec('fontTools') is None:
+            raise CommandError('Нужен fontTools: pip install fonttools brotli')
+
+        if find_spec('brotli') is not None:
+            self.flavor = 'woff2'
+        else:
+            self.stdout.write(self.style.WARNING('brotli не установлен — шрифты будут в WOFF'))
+            self.flavor = 'woff'
+
+        texts = self.collect_texts(use_db=not options['no_db'])
+
+        self.copy_assets()
+        self.build_icon_font(texts)
+        self.build_text_fonts(texts)
+
+    # ==================== ИСТОЧНИКИ ====================
+
+    def collect_texts(self, use_db):
+        """Тексты шаблонов, JS и (по возможности) контента из БД"""
+        texts = []
+        roots = [apps.get_app_config('landing').path, STATIC_VENDOR_DIR.parent / 'js']
+        for root in roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                for filename in filenames:
+                    if filename.endswith(SCANNED_SUFFIXES):
+                        with open(os.path.join(dirpath, filename), encoding='utf-8') as f:
+                            texts.append(f.read())
+
+        if use_db:
+            try:
+                texts.extend(self.content_texts())
+            except DatabaseError as e:
+                self.stdout.write(self.style.WARNING(f'БД недоступна, контент не учтён: {e}'))
+        return texts
+
+    def content_texts(self):
+        """Значения текстовых полей моделей лендинга"""
+        from landing.signals import CONTENT_MODELS
+
+        for model in CONTENT_MODELS:
+            fields = [
+                field.name for field in model._meta.get_fields()
+                if isinstance(field, (models.CharField, models.TextField))
+            ]
+            for row in model.objects.values_list(*fields):
+                yield ' '.join(value for value in row if value)
+
+    # ==================== КОПИРОВАНИЕ ====================
+
+    def copy_assets(self):
+        for name, source in COPIED_ASSETS.items():
+            path = VENDOR_DIR / source
+            if not path.exists():
+                self.stdout.write(f'  {name}: нет {path.relative_to(VENDOR_DIR.parent)}, остаётся CDN')
+                continue
+            _write(STATIC_VENDOR_DIR / name, path.read_bytes())
+            self.stdout.write(self.style.SUCCESS(f'✓ {name}'))
+
+    # ==================== ШРИФТЫ ====================
+
+    def subset_font(self, source, output, codepoints, axes=None):
+        """Урезать шрифт до codepoints, вернуть (имя файла, итоговые коды)"""
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+        from fontTools.varLib import instancer
+
+        # Без новой отметки времени: одинаковый вход даёт одинаковые байты (и хэш в имени)
+        font = TTFont(source, recalcTimestamp=False)
+        if axes and 'fvar' in font:
+            present = {axis.axisTag for axis in font['fvar'].axes}
+            font = instancer.instantiateVariableFont(
+                font, {tag: value for tag, value in axes.items() if tag in present}
+            )
+
+        options = subset.Options()
+        options.flavor = self.flavor
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+
+        filename = f'fonts/{output}.{self.flavor}'
+        path = STATIC_VENDOR_DIR / filename
+        os.makedirs(path.parent, exist_ok=True)
+        font.flavor = self.flavor
+        font.save(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {filename}: {os.path.getsize(source) // 1024} КБ → {os.path.getsize(path) // 1024} КБ'
+        ))
+        return filename, set(font.getBestCmap())
+
+    def font_face(self, family, filename, weight, codepoints, display):
+        return (
+            f'@font-face{{font-family:"{family}";font-style:normal;font-weight:{weight};'
+            f'font-display:{display};src:url({filename}) format("{self.flavor}");'
+            f'unicode-range:{_unicode_range(codepoints)}}}'
+        )
+
+    def build_icon_font(self, texts):
+        source = VENDOR_DIR / ICON_FONT['source']
+        css_source = VENDOR_DIR / ICON_FONT['css']
+        if not source.exists() or not css_source.exists():
+            self.stdout.write('  fontawesome.css: нет исходников, остаётся CDN')
+            return
+
+        css = css_source.read_text(encoding='utf-8')
+        # Имя иконки -> код символа (с учётом алиасов: .fa-cog:before,.fa-gear:before)
+        glyphs = {}
+        for selectors, code in GLYPH_RULE_RE.findall(css):
+            for selector in selectors.split(','):
+                match = re.fullmatch(r'\.fa-([a-z0-9-]+):{1,2}before', selector.strip())
+                if match:
+                    glyphs[match.group(1)] = int(code, 16)
+
+        used = set()
+        for text in texts:
+            used.update(ICON_CLASS_RE.findall(text))
+        icons = sorted(name for name in used if name in glyphs)
+        utilities = {f'.fa-{name}' for name in used if name not in glyphs}
+        if not icons:
+            raise CommandError('Не найдено ни одной иконки Font Awesome')
+
+        filename, _ = self.subset_font(source, ICON_FONT['output'], {glyphs[name] for name in icons})
+
+        rules = [
+            f'@font-face{{font-family:"{ICON_FONT["family"]}";font-style:normal;'
+            f'font-weight:{ICON_FONT["weight"]};font-display:block;'
+            f'src:url({filename}) format("{self.flavor}")}}',
+            ICON_BASE_CSS % ICON_FONT,
+        ]
+        # Вспомогательные классы (fa-spin и т.п.) — правила как в оригинале
+        utility_rules, animations = _select_rules(css, utilities)
+        rules.extend(utility_rules)
+        rules.extend(
+            f'{prelude}{{{body}}}' for prelude, body in css_blocks(css)
+            if prelude.split()[0] == '@keyframes' and prelude.split()[-1] in animations
+        )
+        rules.extend(f'.fa-{name}:before{{content:"\\{glyphs[name]:x}"}}' for name in icons)
+
+        _write(STATIC_VENDOR_DIR / 'fontawesome.css', '\n'.join(rules) + '\n')
+        self.stdout.write(self.style.SUCCESS(f'✓ fontawesome.css: {len(icons)} иконок ({", ".join(icons)})'))
+
+    def build_text_fonts(self, texts):
+        codepoints = set()
+        for start, end in TEXT_UNICODE_RANGES:
+            codepoints.update(range(start, end + 1))
+        for text in texts:
+            codepoints.update(ord(char) for char in text if ord(char) >= 0x20)
+
+        faces = []
+        for font in TEXT_FONTS:
+            source = VENDOR_DIR / font['source']
+            if not source.exists():
+                self.stdout.write(f'  {font["family"]}: нет {source.relative_to(VENDOR_DIR.parent)}, остаётся CDN')
+                return
+            filename, covered = self.subset_font(source, font['output'], codepoints, font['axes'])
+            weight = font['axes'].get('wght', 400)
+            if isinstance(weight, tuple):
+                weight = '%d %d' % weight
+            faces.append(self.font_face(font['family'], filename, weight, covered, 'swap'))
+
+        # fonts.css пишется только если есть все семейства — иначе шаблон берёт CDN целиком
+        _write(STATIC_VENDOR_DIR / 'fonts.css', '\n'.join(faces) + '\n')
+        self.stdout.write(self.style.SUCCESS('✓ fonts.css'))
@@ -0,0 +1,350 @@
+"""
+Телеметрия памяти воркеров лендинга "Птицелов"
+
+Каждый воркер gunicorn запускает поток телеметрии (warm_up). Раз в
+MEMORY_TELEMETRY_INTERVAL секунд поток пишет в MEMORY_DIR файл <pid>.json:
+
+    - память процесса из /proc/<pid>/smaps_rollup: RSS, PSS и USS
+      (собственные страницы воркера — без общих с мастером после fork;
+      утечка видна именно по USS, RSS растёт и от копирования общих страниц);
+    - счётчики сборщика мусора по поколениям; число отслеживаемых объектов —
+      только с tracemalloc (gc.get_objects() обходит всю кучу);
+    - число обработанных запросов и история замеров (MEMORY_HISTORY точек).
+
+Запрос в админку попадает в один воркер, а страница /admin/memory/
+читает файлы всех — включая уже перезапущенные воркеры.
+
+С MEMORY_TRACEMALLOC_FRAMES > 0 воркер включает tracemalloc после fork.
+Кнопка в админке записывает метку снимка в MEMORY_DIR/snapshot-request;
+воркеры замечают её в течение SNAPSHOT_POLL секунд и сохраняют снимок
+(snapshots/<метка>/<pid>.pickle). Самые крупные места выделения памяти
+и разница двух снимков показывают, какие строки кода держат растущую память.
+"""
+import gc
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.dispatch import receiver
+
+from .profiling import short_path
+
+logger = logging.getLogger(__name__)
+
+# Как часто поток проверяет запрос снимка, с
+SNAPSHOT_POLL = 5
+SNAPSHOT_LABEL_RE = re.compile(r'^\d{8}-\d{6}$')
+# Сколько снимков хранить (снимок tracemalloc — мегабайты на воркер)
+MAX_SNAPSHOTS = 20
+# Поля smaps_rollup (кБ) -> ключ в телеметрии
+SMAPS_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Private_Clean': 'uss',
+    'Private_Dirty': 'uss',
+    'Swap': 'swap',
+}
+
+_requests = 0
+
+
+@receiver(request_started)
+def count_request(**kwargs):
+    # Гонка потоков gthread может потерять инкремент — для оценки роста не важно
+    global _requests
+    _requests += 1
+
+
+# ==================== ЗАМЕРЫ ====================
+
+def process_memory(pid='self'):
+    """RSS, PSS, USS и swap процесса в байтах (None, если /proc недоступен)"""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    memory = dict.fromkeys(set(SMAPS_FIELDS.values()), 0)
+    for line in lines:
+        name, _, value = line.partition(':')
+        key = SMAPS_FIELDS.get(name)
+        if key:
+            memory[key] += int(value.split()[0]) * 1024
+    return memory
+
+
+def gc_stats():
+    stats = gc.get_stats()
+    return {
+        'counts': list(gc.get_count()),
+        'collections': [generation['collections'] for generation in stats],
+        'collected': [generation['collected'] for generation in stats],
+        'uncollectable': sum(generation['uncollectable'] for generation in stats),
+        # Обход всей кучи — только при отладке с tracemalloc
+        'objects': len(gc.get_objects()) if tracemalloc.is_tracing() else None,
+    }
+
+
+def growth_per_request(history):
+    """
+    Рост USS на запрос, байт (наклон МНК по точкам истории), или None.
+    Первая точка — сразу после прогрева — не учитывается.
+    """
+    points = [(requests, uss) for _, requests, _, uss in history[1:] if uss is not None]
+    if len(points) < 3 or points[-1][0] == points[0][0]:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def polyline(values, width, height):
+    """Точки SVG polyline для ряда значений (ось Y снизу вверх)"""
+    values = [value for value in values if value is not None]
+    if len(values) < 2:
+        return ''
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    step = width / (len(values) - 1)
+    return ' '.join(
+        f'{i * step:.1f},{height - (value - low) / span * height:.1f}'
+        for i, value in enumerate(values)
+    )
+
+
+# ==================== ПОТОК ВОРКЕРА ====================
+
+class Telemetry:
+    def __init__(self):
+        self.pid = None
+        self.thread = None
+        self.history = deque(maxlen=settings.MEMORY_HISTORY)
+        self.started = None
+        self.snapshot_label = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Запустить поток (после fork; повторный вызов ничего не делает)"""
+        if not settings.MEMORY_TELEMETRY_ENABLED or self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        self.started = time.time()
+        self.history.clear()
+        self.snapshot_label = read_snapshot_request()
+        os.makedirs(settings.MEMORY_DIR, exist_ok=True)
+        if settings.MEMORY_TRACEMALLOC_FRAMES and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACEMALLOC_FRAMES)
+        cleanup()
+        self.thread = threading.Thread(target=self._run, name='memory-telemetry', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        next_sample = 0
+        while not self._stop.wait(SNAPSHOT_POLL if next_sample else 0):
+            try:
+                label = read_snapshot_request()
+                if label and label != self.snapshot_label:
+                    self.snapshot_label = label
+                    self.save_snapshot(label)
+                if time.monotonic() >= next_sample:
+                    self.sample()
+                    next_sample = time.monotonic() + settings.MEMORY_TELEMETRY_INTERVAL
+            except Exception:
+                # Телеметрия не должна мешать воркеру
+                logger.exception('Memory telemetry failed')
+                next_sample = time.monotonic() + settings.MEMORY_TELEMETRY_INTERVAL
+
+    def report(self):
+        memory = process_memory() or {}
+        traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+        return {
+            'pid': self.pid,
+            'started': self.started,
+            'updated': time.time(),
+            'requests': _requests,
+            'memory': memory,
+            'gc': gc_stats(),
+            'tracemalloc': {'current': traced[0], 'peak': traced[1]} if traced else None,
+        }
+
+    def sample(self):
+        data = self.report()
+        self.history.append((
+            round(data['updated']), data['requests'], data['memory'].get('rss'), data['memory'].get('uss'),
+        ))
+        data['history'] = list(self.history)
+        _write_json(os.path.join(settings.MEMORY_DIR, f'{self.pid}.json'), data)
+
+    def save_snapshot(self, label):
+        directory = os.path.join(settings.MEMORY_DIR, 'snapshots', label)
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, f'{self.pid}.json'), self.report())
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                # Память самого tracemalloc и импорта не интересна
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            ])
+            snapshot.dump(os.path.join(directory, f'{self.pid}.pickle'))
+
+
+telemetry = Telemetry()
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ==================== ДАННЫЕ ДЛЯ АДМИНКИ ====================
+
+def is_alive(worker):
+    """Воркер жив: процесс есть и файл обновлялся в последние три интервала"""
+    if time.time() - worker['updated'] > 3 * settings.MEMORY_TELEMETRY_INTERVAL + SNAPSHOT_POLL:
+        return False
+    try:
+        os.kill(worker['pid'], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def list_workers():
+    """Телеметрия воркеров, живые первыми, затем по времени запуска"""
+    if not os.path.isdir(settings.MEMORY_DIR):
+        return []
+    workers = []
+    for name in os.listdir(settings.MEMORY_DIR):
+        if name.endswith('.json'):
+            data = _read_json(os.path.join(settings.MEMORY_DIR, name))
+            if data:
+                data['alive'] = is_alive(data)
+                workers.append(data)
+    return sorted(workers, key=lambda worker: (not worker['alive'], -worker['started']))
+
+
+def cleanup():
+    """Удалить файлы остановленных воркеров сверх MEMORY_MAX_FILES"""
+    dead = [worker for worker in list_workers() if not worker['alive']]
+    for worker in dead[settings.MEMORY_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(settings.MEMORY_DIR, f'{worker["pid"]}.json'))
+        except FileNotFoundError:
+            pass
+
+
+def _request_path():
+    return os.path.join(settings.MEMORY_DIR, 'snapshot-request')
+
+
+def read_snapshot_request():
+    try:
+        with open(_request_path(), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def request_snapshot():
+    """Попросить все воркеры снять снимок; возвращает метку"""
+    label = datetime.now().strftime('%Y%m%d-%H%M%S')
+    os.makedirs(settings.MEMORY_DIR, exist_ok=True)
+    tmp_path = f'{_request_path()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(label)
+    os.replace(tmp_path, _request_path())
+    for old_label in list_snapshots()[MAX_SNAPSHOTS - 1:]:
+        shutil.rmtree(os.path.join(settings.MEMORY_DIR, 'snapshots', old_label), ignore_errors=True)
+    return label
+
+
+def list_snapshots():
+    """Метки снимков, новые первыми"""
+    directory = os.path.join(settings.MEMORY_DIR, 'snapshots')
+    if not os.path.isdir(directory):
+        return []
+    return sorted((name for name in os.listdir(directory) if SNAPSHOT_LABEL_RE.match(name)), reverse=True)
+
+
+def load_snapshot(label):
+    """{pid: (телеметрия, tracemalloc.Snapshot или None)} или None"""
+    if not SNAPSHOT_LABEL_RE.match(label):
+        return None
+    directory = os.path.join(settings.MEMORY_DIR, 'snapshots', label)
+    if not os.path.isdir(directory):
+        return None
+    workers = {}
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        pid = int(name[:-5])
+        trace_path = os.path.join(directory, f'{pid}.pickle')
+        try:
+            snapshot = tracemalloc.Snapshot.load(trace_path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            snapshot = None
+        workers[pid] = (_read_json(os.path.join(directory, name)), snapshot)
+    return workers
+
+
+def _trace_label(frame):
+    return f'{short_path(frame.filename)}:{frame.lineno}'
+
+
+def top_allocators(workers, limit=30):
+    """Места выделения памяти, суммарно по воркерам: [(строка, байт, блоков)]"""
+    sizes, counts = {}, {}
+    for _, snapshot in workers.values():
+        if snapshot is None:
+            continue
+        for stat in snapshot.statistics('lineno'):
+            key = _trace_label(stat.traceback[0])
+            sizes[key] = sizes.get(key, 0) + stat.size
+            counts[key] = counts.get(key, 0) + stat.count
+    rows = sorted(sizes, key=sizes.get, reverse=True)[:limit]
+    return [(key, sizes[key], counts[key]) for key in rows]
+
+
+def diff_allocators(old, new, limit=30):
+    """
+    Разница снимков по воркерам, присутствующим в обоих:
+    [(строка, прирост байт, прирост блоков, байт в новом)] по убыванию прироста
+    """
+    growth, count_growth, total = {}, {}, {}
+    for pid, (_, new_snapshot) in new.items():
+        old_snapshot = old.get(pid, (None, None))[1]
+        if new_snapshot is None or old_snapshot is None:
+            continue
+        for stat in new_snapshot.compare_to(old_snapshot, 'lineno'):
+            key = _trace_label(stat.traceback[0])
+            growth[key] = growth.get(key, 0) + stat.size_diff
+            count_growth[key] = count_growth.get(key, 0) + stat.count_diff
+            total[key] = total.get(key, 0) + stat.size
+    rows = sorted(growth, key=lambda key: abs(growth[key]), reverse=True)[:limit]
+    return [(key, growth[key], count_growth[key], total[key]) for key in rows]
@@ -0,0 +1,95 @@
+"""
+Middleware лендинга "Птицелов"
+"""
+import random
+import re
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_finished
+from django.dispatch import receiver
+
+from .log import request_id_var
+from .preload import PRELOAD_ROUTES, route_links
+from .profiling import profile_trigger, run_profiled
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+REQUEST_ID_RE = re.compile(r'^[\w.-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """
+    ID запроса для логов: берётся из X-Request-ID (nginx передаёт
+    $request_id) или генерируется, возвращается в ответе тем же заголовком.
+
+    ID сбрасывается по request_finished, а не на выходе из middleware:
+    django.request пишет 4xx/5xx уже после цепочки middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        if not REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        request_id_var.set(request_id)
+        response = self.get_response(request)
+        response[REQUEST_ID_HEADER] = request_id
+        return response
+
+
+@receiver(request_finished)
+def clear_request_id(**kwargs):
+    request_id_var.set('-')
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование отдельных запросов (landing/profiling.py). Стоит после
+    AuthenticationMiddleware — флаг ?_profile=1 проверяет request.user.
+    С PROFILING_ENABLED=False не подключается вовсе.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+
+    def __call__(self, request):
+        trigger = profile_trigger(request)
+        if trigger is None and self.sample_rate and random.random() < self.sample_rate:
+            trigger = 'sample'
+        if trigger is None:
+            return self.get_response(request)
+        return run_profiled(request, self.get_response, trigger)
+
+
+class PreloadMiddleware:
+    """
+    Заголовок Link: rel=preload для HTML-страниц (landing/preload.py):
+    CSS, JS, шрифты и изображение турели начинают грузиться, не дожидаясь
+    разбора HTML. Значение заголовка вычисляется один раз на версию контента.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = request.resolver_match
+        if (
+            match is not None
+            and match.view_name in PRELOAD_ROUTES
+            and request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and response.get('Content-Type', '').startswith('text/html')
+        ):
+            links = route_links(match.view_name)
+            if links:
+                existing = response.get('Link')
+                response['Link'] = f'{existing}, {links}' if existing else links
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:32
+
+import django.core.validators
+import landing.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0005_developmentplan_hardwareinterface_softwaremodule_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(storage=landing.storage.get_document_storage, upload_to='documents/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx', 'xls', 'xlsx'])], verbose_name='Файл'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='hero_title',
+            field=models.CharField(default='АРСЕНАЛ', max_length=200, verbose_name='Заголовок Hero'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='site_title',
+            field=models.CharField(default='Арсенал', max_length=200, verbose_name='Заголовок сайта'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# SQL зафиксирован на момент миграции: landing.search может меняться
+CREATE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS landing_search USING fts5("
+    "kind UNINDEXED, object_id UNINDEXED, title, body, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+# rowid = (префикс вида << 40) | pk
+FILL_SEARCH_TABLE = [
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (1 << 40) | d.id, 'document', d.id, COALESCE(d.title, ''), "
+    "COALESCE(d.description, '') || char(10) || COALESCE(c.name, '') "
+    "FROM landing_document d LEFT JOIN landing_documentcategory c ON c.id = d.category_id "
+    "WHERE d.is_active",
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (2 << 40) | s.id, 'specification', s.id, COALESCE(s.name, ''), "
+    "COALESCE(s.value, '') || char(10) || COALESCE(g.name, '') "
+    "FROM landing_specification s LEFT JOIN landing_specificationgroup g ON g.id = s.group_id",
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (3 << 40) | m.id, 'module', m.id, COALESCE(m.title, ''), "
+    "COALESCE(m.description, '') || char(10) || COALESCE(m.tech_details, '') "
+    "FROM landing_softwaremodule m WHERE m.is_active",
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (4 << 40) | p.id, 'roadmap', p.id, COALESCE(p.title, ''), COALESCE(p.description, '') "
+    "FROM landing_developmentplan p WHERE p.is_active",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SEARCH_TABLE)
+    for sql in FILL_SEARCH_TABLE:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS landing_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0006_document_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
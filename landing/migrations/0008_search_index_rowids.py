@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# SQL зафиксирован на момент миграции: landing.search может меняться.
+# rowid = (префикс вида << 40) | pk
+FILL_SEARCH_TABLE = [
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (1 << 40) | d.id, 'document', d.id, COALESCE(d.title, ''), "
+    "COALESCE(d.description, '') || char(10) || COALESCE(c.name, '') "
+    "FROM landing_document d LEFT JOIN landing_documentcategory c ON c.id = d.category_id "
+    "WHERE d.is_active",
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (2 << 40) | s.id, 'specification', s.id, COALESCE(s.name, ''), "
+    "COALESCE(s.value, '') || char(10) || COALESCE(g.name, '') "
+    "FROM landing_specification s LEFT JOIN landing_specificationgroup g ON g.id = s.group_id",
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (3 << 40) | m.id, 'module', m.id, COALESCE(m.title, ''), "
+    "COALESCE(m.description, '') || char(10) || COALESCE(m.tech_details, '') "
+    "FROM landing_softwaremodule m WHERE m.is_active",
+    "INSERT INTO landing_search (rowid, kind, object_id, title, body) "
+    "SELECT (4 << 40) | p.id, 'roadmap', p.id, COALESCE(p.title, ''), COALESCE(p.description, '') "
+    "FROM landing_developmentplan p WHERE p.is_active",
+]
+
+
+def rebuild_search_index(apps, schema_editor):
+    # Строки индекса теперь адресуются по rowid (вид + pk) — пересобираем
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DELETE FROM landing_search')
+    for sql in FILL_SEARCH_TABLE:
+        schema_editor.execute(sql)
+    schema_editor.execute("INSERT INTO landing_search (landing_search) VALUES ('optimize')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
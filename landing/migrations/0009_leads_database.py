@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:06
+
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, models, transaction
+
+from landing.routers import LEADS_DB
+
+
+def move_leads_data(apps, schema_editor):
+    """
+    Заявки и счётчики скачиваний переезжают из базы контента в базу
+    заявок. Выполняется при миграции default (router пропускает RunPython
+    для leads), поэтому leads должна быть смигрирована раньше.
+    """
+    if schema_editor.connection.alias != DEFAULT_DB_ALIAS or LEADS_DB not in connections:
+        return
+    ContactRequest = apps.get_model('landing', 'ContactRequest')
+    Document = apps.get_model('landing', 'Document')
+    DownloadCounter = apps.get_model('landing', 'DownloadCounter')
+
+    # В новой базе контента таблицы заявок нет — router её не создаёт
+    default_tables = schema_editor.connection.introspection.table_names()
+    requests = []
+    if ContactRequest._meta.db_table in default_tables:
+        requests = list(ContactRequest.objects.using(DEFAULT_DB_ALIAS).order_by('pk'))
+    counters = [
+        DownloadCounter(document_id=pk, count=count)
+        for pk, count in Document.objects.using(DEFAULT_DB_ALIAS)
+        .filter(download_count__gt=0).values_list('pk', 'download_count')
+    ]
+    if not requests and not counters:
+        return
+
+    leads_tables = connections[LEADS_DB].introspection.table_names()
+    if {ContactRequest._meta.db_table, DownloadCounter._meta.db_table} - set(leads_tables):
+        raise RuntimeError(
+            'Сначала создайте таблицы базы заявок: python manage.py migrate --database=leads'
+        )
+    with transaction.atomic(using=LEADS_DB):
+        ContactRequest.objects.using(LEADS_DB).bulk_create(requests, ignore_conflicts=True)
+        DownloadCounter.objects.using(LEADS_DB).bulk_create(counters, ignore_conflicts=True)
+    ContactRequest.objects.using(DEFAULT_DB_ALIAS).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0008_search_index_rowids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DownloadCounter',
+            fields=[
+                ('document_id', models.PositiveBigIntegerField(primary_key=True, serialize=False, verbose_name='ID документа')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество скачиваний')),
+            ],
+            options={
+                'verbose_name': 'Счётчик скачиваний',
+                'verbose_name_plural': 'Счётчики скачиваний',
+            },
+        ),
+        migrations.RunPython(move_leads_data, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='document',
+            name='download_count',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:10
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_notified(apps, schema_editor):
+    # По прежним заявкам письма уже ушли при сохранении
+    ContactRequest = apps.get_model('landing', 'ContactRequest')
+    ContactRequest.objects.using(schema_editor.connection.alias).update(notified_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0009_leads_database'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactrequest',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Уведомление отправлено'),
+        ),
+        # hints: router выполняет операцию в базе заявок
+        migrations.RunPython(
+            mark_existing_notified, migrations.RunPython.noop,
+            hints={'model_name': 'contactrequest'},
+        ),
+    ]
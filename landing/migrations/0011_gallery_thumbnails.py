@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0010_contactrequest_notified_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='galleryimage',
+            options={'ordering': ['order', 'id'], 'verbose_name': 'Изображение галереи', 'verbose_name_plural': 'Галерея'},
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='gallery/thumbs/', verbose_name='Миниатюра'),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='thumbnail_bytes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Размер миниатюры'),
+        ),
+        migrations.AddIndex(
+            model_name='galleryimage',
+            index=models.Index(fields=['is_active', 'order', 'id'], name='gallery_page_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:36
+
+import landing.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0011_gallery_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='preview',
+            field=models.ImageField(blank=True, editable=False, height_field='preview_height', storage=landing.storage.get_document_storage, upload_to='previews/', verbose_name='Превью', width_field='preview_width'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='preview_height',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='preview_width',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0012_document_previews'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactrequest',
+            name='notify_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
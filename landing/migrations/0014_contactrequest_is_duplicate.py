@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landing', '0013_contactrequest_notify_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactrequest',
+            name='is_duplicate',
+            field=models.BooleanField(db_default=False, default=False, editable=False, verbose_name='Похоже на повтор'),
+        ),
+    ]
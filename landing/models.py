@@ -2,9 +2,16 @@
 Модели данных для лендинга "Птицелов"
 """
 import os
-from django.db import models
+from django.db import models, router, transaction
 from django.core.validators import FileExtensionValidator
 
+from .storage import get_document_storage
+from .versioning import load_singleton
+
+
+# Допустимые форматы документов для скачивания
+DOCUMENT_EXTENSIONS = ['pdf', 'doc', 'docx', 'xls', 'xlsx']
+
 
 class DocumentCategory(models.Model):
     """Категории документов: Техническая документация, Сертификаты, Презентации"""
@@ -36,10 +43,17 @@ class Document(models.Model):
     file = models.FileField(
         'Файл',
         upload_to='documents/',
-        validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx', 'xls', 'xlsx'])]
+        storage=get_document_storage,
+        validators=[FileExtensionValidator(allowed_extensions=DOCUMENT_EXTENSIONS)]
     )
+    # Превью первой страницы PDF (landing/previews.py), строится в фоне
+    preview = models.ImageField(
+        'Превью', upload_to='previews/', storage=get_document_storage, blank=True, editable=False,
+        width_field='preview_width', height_field='preview_height'
+    )
+    preview_width = models.PositiveSmallIntegerField(null=True, editable=False)
+    preview_height = models.PositiveSmallIntegerField(null=True, editable=False)
     uploaded_at = models.DateTimeField('Дата загрузки', auto_now_add=True)
-    download_count = models.PositiveIntegerField('Количество скачиваний', default=0)
     is_active = models.BooleanField('Активен', default=True)
     
     class Meta:
@@ -68,6 +82,12 @@ class Document(models.Model):
         if self.file:
             return os.path.splitext(self.file.name)[1].lower().replace('.', '')
         return ''
+    
+    @property
+    def download_filename(self):
+        """Имя файла при скачивании (на диске файл назван по хэшу содержимого)"""
+        name = self.title.replace('/', '-').replace('\\', '-').strip() or 'document'
+        return f"{name}.{self.file_extension}" if self.file_extension else name
 
 
 class Feature(models.Model):
@@ -127,6 +147,9 @@ class GalleryImage(models.Model):
     """Изображения галереи"""
     title = models.CharField('Название', max_length=100)
     image = models.ImageField('Изображение', upload_to='gallery/')
+    # Миниатюра WebP для сетки (landing/gallery.py), создаётся при сохранении
+    thumbnail = models.ImageField('Миниатюра', upload_to='gallery/thumbs/', blank=True, editable=False)
+    thumbnail_bytes = models.PositiveIntegerField('Размер миниатюры', default=0, editable=False)
     description = models.TextField('Описание', blank=True)
     order = models.PositiveIntegerField('Порядок сортировки', default=0)
     is_active = models.BooleanField('Активен', default=True)
@@ -134,7 +157,11 @@ class GalleryImage(models.Model):
     class Meta:
         verbose_name = 'Изображение галереи'
         verbose_name_plural = 'Галерея'
-        ordering = ['order']
+        # id — для однозначного порядка при равном order (ключ страниц галереи)
+        ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['is_active', 'order', 'id'], name='gallery_page_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -149,6 +176,13 @@ class ContactRequest(models.Model):
     message = models.TextField('Сообщение')
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     is_processed = models.BooleanField('Обработано', default=False)
+    # Похоже на недавнюю заявку (landing/spam.py): письмо не отправляется.
+    # db_default — 0009 переносит старые заявки в уже смигрированную базу
+    is_duplicate = models.BooleanField('Похоже на повтор', default=False, db_default=False, editable=False)
+    # NULL — уведомление ещё не отправлено (landing/notifications.py)
+    notified_at = models.DateTimeField('Уведомление отправлено', null=True, blank=True, db_index=True)
+    # Когда воркер забрал заявку на отправку; просроченная отметка — воркер не дослал
+    notify_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     notes = models.TextField('Заметки менеджера', blank=True)
     
     # Поля для согласия на обработку ПДН (152-ФЗ)
@@ -166,6 +200,40 @@ class ContactRequest(models.Model):
         return f"{self.name} — {self.created_at.strftime('%d.%m.%Y %H:%M')}"
 
 
+class DownloadCounter(models.Model):
+    """
+    Счётчик скачиваний документа. Хранится в базе заявок
+    (landing/routers.py), а не в строке документа: скачивание не пишет
+    в базу контента и не меняет его версию.
+    """
+    document_id = models.PositiveBigIntegerField('ID документа', primary_key=True)
+    count = models.PositiveIntegerField('Количество скачиваний', default=0)
+    
+    class Meta:
+        verbose_name = 'Счётчик скачиваний'
+        verbose_name_plural = 'Счётчики скачиваний'
+    
+    def __str__(self):
+        return f'{self.document_id}: {self.count}'
+    
+    @classmethod
+    def increment(cls, document_ids):
+        """+1 к счётчикам документов: недостающие строки и один UPDATE на все"""
+        document_ids = list(document_ids)
+        with transaction.atomic(using=router.db_for_write(cls)):
+            cls.objects.bulk_create(
+                [cls(document_id=pk) for pk in document_ids], ignore_conflicts=True
+            )
+            cls.objects.filter(document_id__in=document_ids).update(
+                count=models.F('count') + 1
+            )
+    
+    @classmethod
+    def counts(cls, document_ids):
+        """{id документа: число скачиваний}"""
+        return dict(cls.objects.filter(document_id__in=document_ids).values_list('document_id', 'count'))
+
+
 class SiteSettings(models.Model):
     """Настройки сайта (синглтон)"""
     site_title = models.CharField('Заголовок сайта', max_length=200, default='Арсенал')
@@ -196,9 +264,8 @@ class SiteSettings(models.Model):
     
     @classmethod
     def get_settings(cls):
-        """Получить настройки или создать дефолтные"""
-        obj, created = cls.objects.get_or_create(pk=1)
-        return obj
+        """Получить настройки или создать дефолтные (кэшируются в процессе)"""
+        return load_singleton(cls)
 
 
 # ==================== ПРОГРАММНОЕ ОБЕСПЕЧЕНИЕ ====================
@@ -226,8 +293,8 @@ class SoftwarePlatform(models.Model):
     
     @classmethod
     def get_platform(cls):
-        obj, created = cls.objects.get_or_create(pk=1)
-        return obj
+        """Получить платформу ПО или создать дефолтную (кэшируется в процессе)"""
+        return load_singleton(cls)
 
 
 class SoftwareModule(models.Model):
@@ -0,0 +1,271 @@
+"""
+Уведомления о заявках лендинга "Птицелов"
+
+Заявка сохраняется с notified_at = NULL — база заявок и есть очередь
+уведомлений. После сохранения view будит поток-диспетчер процесса
+(lead_created), и тот отправляет письма через одно SMTP-соединение:
+оно остаётся открытым NOTIFY_SMTP_IDLE_TIMEOUT секунд и переиспользуется
+следующими письмами, а накопившиеся заявки уходят одним send_messages().
+
+NOTIFY_DIGEST_MINUTES > 0 — режим дайджеста: заявки копятся, пока
+самой старой из неотправленных не исполнится N минут, и уходят одним
+письмом.
+
+Заявки забираются на отправку в транзакции (notify_claimed_at), поэтому
+воркеры gunicorn не отправляют одну заявку одновременно; notified_at
+ставится только после успешного send_messages(). Если SMTP недоступен,
+заявки возвращаются в очередь и отправляются повторно через RETRY_DELAY
+секунд. Если воркер убит посреди отправки (max_requests, OOM), отметка
+остаётся, и через NOTIFY_CLAIM_TIMEOUT секунд заявки забирает другой
+диспетчер: письмо может прийти дважды, но не потеряется. Заявки,
+оставшиеся от перезапущенного воркера, подбирает диспетчер любого
+другого при старте (warmup).
+"""
+import logging
+import os
+import smtplib
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ContactRequest
+
+logger = logging.getLogger(__name__)
+
+# Заявок за одну отправку (в дайджесте — за одно письмо)
+MAX_BATCH = 100
+RETRY_DELAY = 60
+
+
+# ==================== ОЧЕРЕДЬ ====================
+
+def pending():
+    # Повторы (is_duplicate) не рассылаются — менеджер видит их в админке
+    return ContactRequest.objects.filter(notified_at__isnull=True, is_duplicate=False).order_by('created_at')
+
+
+def claim_expiry():
+    return timezone.now() - timedelta(seconds=settings.NOTIFY_CLAIM_TIMEOUT)
+
+
+def claimable():
+    """Неотправленные заявки, которые никто не отправляет (или не дослал)"""
+    return pending().filter(
+        Q(notify_claimed_at__isnull=True) | Q(notify_claimed_at__lt=claim_expiry())
+    )
+
+
+def claim(limit=MAX_BATCH):
+    """Забрать неотправленные заявки: другой процесс их уже не возьмёт"""
+    with transaction.atomic(using=router.db_for_write(ContactRequest)):
+        leads = list(claimable()[:limit])
+        ContactRequest.objects.filter(pk__in=[lead.pk for lead in leads]).update(
+            notify_claimed_at=timezone.now()
+        )
+    return leads
+
+
+def mark_sent(leads):
+    ContactRequest.objects.filter(pk__in=[lead.pk for lead in leads]).update(notified_at=timezone.now())
+
+
+def release(leads):
+    """Вернуть заявки в очередь (отправка не удалась)"""
+    ContactRequest.objects.filter(pk__in=[lead.pk for lead in leads]).update(notify_claimed_at=None)
+
+
+def claim_due():
+    """Когда истечёт самая ранняя отметка другого воркера (или None)"""
+    claimed = pending().filter(notify_claimed_at__isnull=False).order_by('notify_claimed_at')
+    oldest = claimed.values_list('notify_claimed_at', flat=True).first()
+    if oldest is None:
+        return None
+    return oldest + timedelta(seconds=settings.NOTIFY_CLAIM_TIMEOUT)
+
+
+def digest_due():
+    """Когда отправлять дайджест: самая старая неотправленная заявка + окно (или None)"""
+    oldest = pending().values_list('created_at', flat=True).first()
+    if oldest is None:
+        return None
+    return oldest + timedelta(minutes=settings.NOTIFY_DIGEST_MINUTES)
+
+
+# ==================== ПИСЬМА ====================
+
+def format_lead(lead):
+    local_time = timezone.localtime(lead.created_at)
+    return (
+        f'Имя: {lead.name}\n'
+        f'Email: {lead.email}\n'
+        f'Телефон: {lead.phone or "Не указан"}\n'
+        f'Организация: {lead.company or "Не указана"}\n'
+        f'\n'
+        f'Сообщение:\n'
+        f'{lead.message}\n'
+        f'\n'
+        f'---\n'
+        f'Дата: {local_time.strftime("%d.%m.%Y %H:%M")}\n'
+    )
+
+
+def build_messages(leads, digest=False):
+    """Письмо на каждую заявку или одно письмо-дайджест"""
+    if digest:
+        body = f'Новых заявок с сайта: {len(leads)}\n\n' + '\n\n'.join(
+            f'=== Заявка {number} ===\n{format_lead(lead)}'
+            for number, lead in enumerate(leads, 1)
+        )
+        return [EmailMessage(
+            subject=f'Заявки с сайта Арсенал: {len(leads)}',
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[settings.CONTACT_EMAIL],
+        )]
+    return [
+        EmailMessage(
+            subject=f'Новая заявка с сайта Арсенал от {lead.name}',
+            body=f'Новая заявка с сайта:\n\n{format_lead(lead)}',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[settings.CONTACT_EMAIL],
+            reply_to=[lead.email],
+        )
+        for lead in leads
+    ]
+
+
+# ==================== ДИСПЕТЧЕР ====================
+
+class Dispatcher:
+    """Поток отправки уведомлений процесса со своим SMTP-соединением"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._wake = threading.Event()
+        self._thread = None
+        self._connection = None
+        self._last_used = 0.0
+
+    def start(self):
+        """Запустить поток; он сразу проверит накопившиеся заявки"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notifications', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        self.start()
+        self._wake.set()
+
+    # ---------- SMTP ----------
+
+    def send(self, messages):
+        """Отправить письма через открытое соединение (при обрыве — одно переподключение)"""
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = get_connection(fail_silently=False)
+                self._connection.open()
+            try:
+                sent = self._connection.send_messages(messages)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Сервер закрыл простаивающее соединение
+                self.close()
+                if attempt:
+                    raise
+                continue
+            self._last_used = time.monotonic()
+            return sent
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def _idle_deadline(self):
+        if self._connection is None:
+            return None
+        return self._last_used + settings.NOTIFY_SMTP_IDLE_TIMEOUT
+
+    # ---------- Отправка ----------
+
+    def dispatch(self, force=False):
+        """
+        Отправить заявки, которым пора. Возвращает (число заявок, через
+        сколько секунд проверить снова или None — ждать новой заявки).
+        """
+        digest = settings.NOTIFY_DIGEST_MINUTES > 0
+        if digest and not force:
+            due = digest_due()
+            if due is None:
+                return 0, None
+            if due > timezone.now():
+                return 0, (due - timezone.now()).total_seconds()
+
+        leads = claim()
+        if not leads:
+            # Заявки, забранные другим воркером: проверить, когда отметка истечёт
+            due = claim_due()
+            if due is None:
+                return 0, None
+            return 0, max(0.0, (due - timezone.now()).total_seconds()) + 1
+        try:
+            self.send(build_messages(leads, digest))
+        except Exception:
+            release(leads)
+            logger.exception('Lead notification failed, retry in %d s', RETRY_DELAY, extra={'leads': len(leads)})
+            return 0, RETRY_DELAY
+        mark_sent(leads)
+        logger.info('Lead notifications sent', extra={'leads': len(leads), 'digest': digest})
+        # Забрали полную пачку — в очереди могут быть ещё
+        return len(leads), 0 if len(leads) == MAX_BATCH else None
+
+    def _run(self):
+        next_check = time.monotonic()
+        while True:
+            deadlines = [d for d in (next_check, self._idle_deadline()) if d is not None]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            woken = self._wake.wait(timeout)
+            self._wake.clear()
+
+            if woken or (next_check is not None and time.monotonic() >= next_check):
+                try:
+                    _, delay = self.dispatch()
+                except Exception:
+                    # Например, база недоступна — попробуем позже
+                    logger.exception('Lead notification dispatch failed')
+                    delay = RETRY_DELAY
+                finally:
+                    # Соединения с БД этого потока не закрываются сигналами запросов
+                    connections.close_all()
+                next_check = None if delay is None else time.monotonic() + delay
+
+            idle_deadline = self._idle_deadline()
+            if idle_deadline is not None and time.monotonic() >= idle_deadline:
+                self.close()
+
+    def _after_fork(self):
+        # Поток и сокет SMTP остались в родителе; сокет не закрываем —
+        # QUIT из дочернего процесса оборвал бы соединение родителя
+        self._lock = threading.Lock()
+        self._reset()
+
+
+dispatcher = Dispatcher()
+os.register_at_fork(after_in_child=dispatcher._after_fork)
+
+
+def lead_created(contact_request):
+    """Разбудить диспетчер после фиксации заявки"""
+    transaction.on_commit(dispatcher.wake, using=router.db_for_write(ContactRequest))
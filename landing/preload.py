@@ -0,0 +1,142 @@
+"""
+Заголовки Link: rel=preload для страниц лендинга "Птицелов"
+
+Браузер узнаёт о style.css, main.js, шрифтах и изображении турели только
+после загрузки и разбора HTML. Заголовок Link с ответом (PreloadMiddleware)
+начинает их загрузку параллельно с HTML, а 103 Early Hints
+(EarlyHintsMiddleware, только ASGI) — ещё до ответа view.
+
+Адреса статики берутся из манифеста collectstatic (имена с хэшем), шрифты —
+из @font-face локальных копий стилей (manage.py vendor_assets). Статическая
+часть заголовка вычисляется один раз за процесс (то есть за деплой),
+изображение турели — при смене версии SiteSettings.
+"""
+import logging
+import re
+
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.urls import Resolver404, resolve
+
+from .css import css_blocks, strip_comments
+from .vendor import is_vendored
+from .versioning import get_version
+
+logger = logging.getLogger(__name__)
+
+# Ресурсы всех страниц на base.html: путь в static/ -> as
+STATIC_PRELOADS = [
+    ('css/style.css', 'style'),
+    ('js/main.js', 'script'),
+]
+
+# Стили static/vendor/, шрифты из @font-face которых нужны первому экрану
+FONT_STYLESHEETS = ['fonts.css', 'fontawesome.css']
+
+# Маршрут -> нужно ли изображение турели (секция «О системе» главной)
+PRELOAD_ROUTES = {
+    'landing:index': True,
+    'landing:privacy': False,
+    'landing:cookies': False,
+}
+
+FONT_URL_RE = re.compile(r'url\(["\']?([^)"\']+\.woff2)["\']?\)')
+
+_static_links = None
+# Маршрут -> (версия SiteSettings, значение заголовка Link)
+_route_headers = {}
+
+
+def _link(url, kind, extra=''):
+    return f'<{url}>; rel=preload; as={kind}{extra}'
+
+
+def font_paths():
+    """Пути шрифтов woff2 (в static/) из @font-face собранных стилей"""
+    paths = []
+    for name in FONT_STYLESHEETS:
+        if not is_vendored(name):
+            continue
+        with open(finders.find(f'vendor/{name}'), encoding='utf-8') as f:
+            css = strip_comments(f.read())
+        for prelude, body in css_blocks(css):
+            if prelude == '@font-face':
+                paths += [f'vendor/{url}' for url in FONT_URL_RE.findall(body)]
+    return list(dict.fromkeys(paths))
+
+
+def static_links():
+    """Preload-ссылки статики (CSS, JS, шрифты) — один раз за процесс"""
+    global _static_links
+    if _static_links is None:
+        links = []
+        try:
+            links += [_link(static(path), kind) for path, kind in STATIC_PRELOADS]
+            # Шрифты загружаются в режиме CORS даже со своего домена
+            links += [
+                _link(static(path), 'font', '; type="font/woff2"; crossorigin')
+                for path in font_paths()
+            ]
+        except ValueError as e:
+            # Нет файла в манифесте collectstatic — без preload, страница всё равно работает
+            logger.warning('Preload links disabled: %s', e)
+            links = []
+        _static_links = links
+    return _static_links
+
+
+def route_links(route):
+    """Значение заголовка Link для маршрута ('landing:index') или ''"""
+    from .models import SiteSettings
+
+    with_image = PRELOAD_ROUTES[route]
+    version = get_version(SiteSettings) if with_image else None
+    cached = _route_headers.get(route)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    links = list(static_links())
+    if with_image:
+        turret_image = SiteSettings.get_settings().turret_image
+        if turret_image:
+            # Изображение ниже первого экрана: загрузка начинается рано,
+            # но не отнимает полосу у CSS и шрифтов
+            links.append(_link(turret_image.url, 'image', '; fetchpriority=low'))
+    header = ', '.join(links)
+    _route_headers[route] = (version, header)
+    return header
+
+
+def route_for_path(path):
+    try:
+        route = resolve(path).view_name
+    except Resolver404:
+        return None
+    return route if route in PRELOAD_ROUTES else None
+
+
+class EarlyHintsMiddleware:
+    """
+    ASGI-обёртка: 103 Early Hints со статическими preload-ссылками до
+    выполнения view. Работает, если сервер объявляет расширение ASGI
+    http.response.early_hint (например, Hypercorn); иначе ничего не делает.
+    Изображение турели в подсказки не входит — для него нужна БД.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope['type'] == 'http'
+            and scope['method'] in ('GET', 'HEAD')
+            and 'http.response.early_hint' in scope.get('extensions', {})
+            and route_for_path(scope['path'])
+        ):
+            links = static_links()
+            if links:
+                await send({
+                    'type': 'http.response.early_hint',
+                    'links': [link.encode() for link in links],
+                })
+        await self.app(scope, receive, send)
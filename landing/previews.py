@@ -0,0 +1,169 @@
+"""
+Превью документов лендинга "Птицелов"
+
+Для PDF рендерится первая страница (pypdfium2 — PDFium в колесе pip,
+без системных библиотек и сети) и сохраняется маленькой картинкой WebP.
+Превью лежит в том же хранилище, что и документ, и названо по хэшу его
+содержимого: previews/ab/ab12…ef-160.webp. Одинаковые файлы делят одно
+превью, а готовое превью не рендерится повторно.
+
+После загрузки документа превью строится в фоновом потоке процесса
+(schedule), ответ админки его не ждёт. Пока превью нет, карточка
+показывает иконку формата. Массовая пересборка — команда
+document_previews (пул процессов).
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+
+from django.core.files.base import ContentFile
+from django.db import connections
+
+from .models import Document
+from .storage import document_storage
+from .versioning import bump_version
+
+logger = logging.getLogger(__name__)
+
+# Карточка показывает превью шириной 80px; рендер вдвое больше для HiDPI
+PREVIEW_WIDTH = 160
+PREVIEW_QUALITY = 70
+PREVIEW_EXTENSIONS = {'pdf'}
+
+
+def is_available():
+    return find_spec('pypdfium2') is not None
+
+
+def preview_name(file_name):
+    """Имя превью по имени файла в хранилище (documents/ab/<sha256>.pdf)"""
+    directory, base = os.path.split(file_name)
+    digest = os.path.splitext(base)[0]
+    return f'previews/{os.path.basename(directory)}/{digest}-{PREVIEW_WIDTH}.webp'
+
+
+def has_preview(document):
+    return document.file_extension in PREVIEW_EXTENSIONS
+
+
+# ==================== РЕНДЕР ====================
+
+def render_first_page(path, width=PREVIEW_WIDTH):
+    """
+    Первая страница PDF в WebP: (байты, ширина, высота). Без обращений
+    к Django — вызывается и в процессах пула команды document_previews.
+    """
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        page = pdf[0]
+        try:
+            page_width = page.get_width()
+            bitmap = page.render(scale=width / page_width, draw_annots=False)
+            image = bitmap.to_pil().convert('RGB')
+        finally:
+            page.close()
+    finally:
+        pdf.close()
+    buffer = io.BytesIO()
+    image.save(buffer, 'WEBP', quality=PREVIEW_QUALITY, method=6)
+    return buffer.getvalue(), image.width, image.height
+
+
+def store_preview(document, rendered):
+    """Сохранить отрендеренное превью и записать его в документ"""
+    data, width, height = rendered
+    name = preview_name(document.file.name)
+    # Запись через временный файл и os.replace — старое превью заменяется атомарно
+    document_storage._save(name, ContentFile(data))
+    attach_preview(document, name, width, height)
+    return name
+
+
+def attach_preview(document, name, width, height):
+    # update() — без сигналов сохранения: файл документа не менялся
+    Document.objects.filter(file=document.file.name).update(
+        preview=name, preview_width=width, preview_height=height
+    )
+    bump_version(Document)
+
+
+def detach_preview(document):
+    """Документ больше не PDF — карточка возвращается к иконке"""
+    Document.objects.filter(pk=document.pk).update(preview='', preview_width=None, preview_height=None)
+    bump_version(Document)
+
+
+def build_preview(document, force=False):
+    """
+    Превью документа; существующий файл превью используется повторно
+    (тот же PDF у другого документа или повторный вызов). Возвращает
+    имя превью или None (не PDF, нет рендерера).
+    """
+    if not has_preview(document) or not is_available():
+        return None
+    name = preview_name(document.file.name)
+    if not force and document_storage.exists(name):
+        if document.preview.name != name:
+            from PIL import Image
+            with document_storage.open(name) as f, Image.open(f) as image:
+                attach_preview(document, name, image.width, image.height)
+        return name
+    return store_preview(document, render_first_page(document.file.path))
+
+
+def release_preview(file_name):
+    """Удалить превью файла, на который больше не ссылается ни один документ"""
+    name = preview_name(file_name)
+    if document_storage.exists(name):
+        document_storage.delete(name)
+
+
+# ==================== ФОНОВАЯ ГЕНЕРАЦИЯ ====================
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Один поток: PDFium не потокобезопасен, а превью строятся редко
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='previews')
+    return _executor
+
+
+def _after_fork():
+    global _executor, _executor_lock
+    _executor, _executor_lock = None, threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _build(pk):
+    try:
+        document = Document.objects.filter(pk=pk).first()
+        if document is not None and document.file:
+            build_preview(document)
+    except Exception:
+        logger.exception('Document preview failed', extra={'document': pk})
+    finally:
+        # Соединения потока с БД не переиспользуются
+        connections.close_all()
+
+
+def schedule(document):
+    """Построить превью в фоне (вызывать после коммита транзакции)"""
+    if not has_preview(document):
+        if document.preview:
+            detach_preview(document)
+        return
+    if is_available():
+        _get_executor().submit(_build, document.pk)
@@ -0,0 +1,270 @@
+"""
+Статистический профайлер запросов лендинга "Птицелов"
+
+ProfilingMiddleware включает профайлер для отдельных запросов:
+    - заголовок X-Profile с токеном, подписанным для сотрудника
+      (токен выдаётся на странице профилей в админке);
+    - параметр ?_profile=1 у вошедшего сотрудника;
+    - случайная выборка PROFILE_SAMPLE_RATE (доля запросов).
+
+Пока запрос выполняется, отдельный поток раз в PROFILE_INTERVAL секунд
+снимает стек потока запроса (sys._current_frames). Накопленные стеки
+в формате folded ("a;b;c": число выборок) вместе с метаданными запроса
+пишутся в PROFILE_DIR — приватный каталог, не media. Админка строит по
+ним flame graph и таблицу самых затратных функций.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+
+PROFILE_QUERY_FLAG = '_profile'
+TOKEN_SALT = 'landing.profiling'
+
+PROFILE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# Префиксы путей, которые обрезаются в подписях функций
+_PATH_PREFIXES = sorted(
+    {str(settings.BASE_DIR) + os.sep} | {path + os.sep for path in sys.path if path},
+    key=len, reverse=True,
+)
+
+
+def make_token(user):
+    """Токен для заголовка X-Profile (действует PROFILE_TOKEN_MAX_AGE секунд)"""
+    return signing.dumps({'user': user.pk}, salt=TOKEN_SALT)
+
+
+def check_token(token):
+    """Подпись верна и владелец токена всё ещё активный сотрудник"""
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    # Токен живёт дольше прав: сотрудника могли удалить или лишить доступа
+    return get_user_model()._default_manager.filter(
+        pk=data.get('user'), is_staff=True, is_active=True
+    ).exists()
+
+
+def short_path(filename):
+    """Путь к файлу кода относительно проекта или sys.path"""
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def _label(code):
+    return f'{code.co_name} ({short_path(code.co_filename)}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """
+    Снимает стек одного потока через равные интервалы. Стек берётся
+    начиная с кадра, вызвавшего start(): всё, что выше (gunicorn,
+    WSGI, внешние middleware), одинаково во всех выборках.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._labels = {}
+
+    def start(self):
+        caller = sys._getframe(1)
+        self._thread_id = threading.get_ident()
+        self._root = caller.f_code
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            codes = []
+            while frame is not None and frame.f_code is not self._root:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if not codes:
+                continue
+            self.stacks[tuple(reversed(codes))] += 1
+            self.samples += 1
+
+    def folded(self):
+        """Стеки в формате folded: {"f1;f2;f3": число выборок}"""
+        folded = Counter()
+        for codes, count in self.stacks.items():
+            labels = [self._labels.get(code) or self._labels.setdefault(code, _label(code)) for code in codes]
+            folded[';'.join(labels)] += count
+        return dict(folded.most_common())
+
+
+# ==================== ХРАНЕНИЕ ====================
+
+def _path(profile_id):
+    return settings.PROFILE_DIR / f'{profile_id}.json'
+
+
+def save_profile(meta, stacks):
+    """Записать профиль, удалить самые старые сверх PROFILE_MAX_FILES"""
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    profile_id = uuid.uuid4().hex
+    data = dict(meta, id=profile_id, created=datetime.now(timezone.utc).isoformat(), stacks=stacks)
+    tmp_path = f'{_path(profile_id)}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, _path(profile_id))
+
+    _prune()
+    return profile_id
+
+
+def _prune():
+    # Файлы может одновременно удалять другой воркер: пропавшие пропускаем
+    files = []
+    for path in settings.PROFILE_DIR.glob('*.json'):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    files.sort()
+    for _, path in files[:-settings.PROFILE_MAX_FILES]:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def load_profile(profile_id):
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(_path(profile_id), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def list_profiles():
+    """Метаданные сохранённых профилей, новые первыми (без стеков)"""
+    if not settings.PROFILE_DIR.is_dir():
+        return []
+    profiles = []
+    for path in settings.PROFILE_DIR.glob('*.json'):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        data.pop('stacks', None)
+        profiles.append(data)
+    return sorted(profiles, key=lambda profile: profile['created'], reverse=True)
+
+
+# ==================== АНАЛИЗ ====================
+
+def top_functions(stacks, limit=30):
+    """
+    Функции с наибольшим временем: (функция, собственные выборки,
+    выборки с учётом вложенных вызовов), по убыванию общего времени.
+    """
+    own, total = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        # Рекурсивная функция учитывается в стеке один раз
+        for frame in set(frames):
+            total[frame] += count
+    return [(name, own[name], count) for name, count in total.most_common(limit)]
+
+
+def flame_graph(stacks, min_fraction=0.002):
+    """
+    Прямоугольники flame graph (сверху вниз, как icicle):
+    [{'label', 'samples', 'depth', 'x', 'width'}], x и width — доли общей
+    ширины. Узлы уже min_fraction отбрасываются.
+    """
+    root = {'children': {}, 'samples': 0}
+    for stack, count in stacks.items():
+        root['samples'] += count
+        node = root
+        for frame in stack.split(';'):
+            node = node['children'].setdefault(frame, {'children': {}, 'samples': 0})
+            node['samples'] += count
+
+    total = root['samples'] or 1
+    rects = []
+
+    def walk(node, depth, x):
+        for label, child in sorted(node['children'].items()):
+            width = child['samples'] / total
+            if width >= min_fraction:
+                rects.append({
+                    'label': label, 'samples': child['samples'],
+                    'depth': depth, 'x': x, 'width': width,
+                })
+                walk(child, depth + 1, x)
+            x += width
+
+    walk(root, 0, 0.0)
+    return rects
+
+
+# ==================== ЗАПУСК ====================
+
+def profile_trigger(request):
+    """Запрошен ли профиль явно: 'header', 'query' или None"""
+    token = request.META.get('HTTP_X_PROFILE')
+    if token and check_token(token):
+        return 'header'
+    # Строку запроса разбираем, только если флаг в ней вообще есть
+    if PROFILE_QUERY_FLAG in request.META.get('QUERY_STRING', '') and request.GET.get(PROFILE_QUERY_FLAG):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return 'query'
+    return None
+
+
+def run_profiled(request, get_response, trigger):
+    """Выполнить запрос под профайлером и сохранить результат"""
+    sampler = StackSampler(settings.PROFILE_INTERVAL)
+    started, cpu_started = time.perf_counter(), time.thread_time()
+    sampler.start()
+    try:
+        response = get_response(request)
+    finally:
+        sampler.stop()
+    duration = time.perf_counter() - started
+    cpu = time.thread_time() - cpu_started
+
+    user = getattr(request, 'user', None)
+    profile_id = save_profile({
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'cpu_ms': round(cpu * 1000, 2),
+        'samples': sampler.samples,
+        'interval_ms': settings.PROFILE_INTERVAL * 1000,
+        'trigger': trigger,
+        'request_id': getattr(request, 'request_id', ''),
+        'user': user.get_username() if user is not None and user.is_authenticated else '',
+    }, sampler.folded())
+    if trigger != 'sample':
+        response['X-Profile-Id'] = profile_id
+    return response
@@ -0,0 +1,73 @@
+"""
+Маршрутизация запросов к базам данных лендинга "Птицелов"
+
+    default    — контент (админка пишет сюда), пользователи, журнал админки,
+                 поисковый индекс;
+    content_ro — тот же файл контента, открытый только на чтение
+                 (mode=ro, mmap): из него читают страницы сайта;
+    leads      — то, что пишут посетители: заявки, счётчики скачиваний,
+                 сессии.
+
+Запись посетителей не берёт блокировку базы контента, а чтение страниц
+идёт через отдельное read-only соединение.
+
+Внутри транзакции на default чтение контента тоже идёт в default:
+соединение content_ro не видит незафиксированных изменений (сохранение
+в админке, импорт контента, обновление поискового индекса).
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+LEADS_DB = 'leads'
+CONTENT_READ_DB = 'content_ro'
+
+# Модели базы заявок: 'app_label.model_name' или app_label целиком
+LEADS_MODELS = {'landing.contactrequest', 'landing.downloadcounter'}
+LEADS_APPS = {'sessions'}
+
+
+def is_leads_model(model):
+    meta = model._meta
+    return meta.app_label in LEADS_APPS or meta.label_lower in LEADS_MODELS
+
+
+def _database_for(model):
+    if is_leads_model(model) and LEADS_DB in settings.DATABASES:
+        return LEADS_DB
+    return DEFAULT_DB_ALIAS
+
+
+class DatabaseRouter:
+
+    def db_for_read(self, model, **hints):
+        db = _database_for(model)
+        if (
+            db == DEFAULT_DB_ALIAS
+            and CONTENT_READ_DB in settings.DATABASES
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return CONTENT_READ_DB
+        return db
+
+    def db_for_write(self, model, **hints):
+        return _database_for(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # content_ro — та же база, что и default
+        def group(db):
+            return DEFAULT_DB_ALIAS if db == CONTENT_READ_DB else db
+        return group(obj1._state.db) == group(obj2._state.db)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == CONTENT_READ_DB:
+            return False
+        if model_name is None:
+            # RunPython/RunSQL без подсказок — только в базе контента
+            target = LEADS_DB if app_label in LEADS_APPS else DEFAULT_DB_ALIAS
+        else:
+            target = LEADS_DB if (
+                app_label in LEADS_APPS or f'{app_label}.{model_name}' in LEADS_MODELS
+            ) else DEFAULT_DB_ALIAS
+        if target not in settings.DATABASES:
+            target = DEFAULT_DB_ALIAS
+        return db == target
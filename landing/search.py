@@ -0,0 +1,209 @@
+"""
+Полнотекстовый поиск по контенту лендинга "Птицелов"
+
+Индекс — виртуальная таблица SQLite FTS5 (landing_search, миграция
+0007). Строка индекса — одна запись контента: вид (SEARCH_SOURCES),
+id, заголовок и текст. Индекс обновляется сигналами при сохранении и
+удалении записей (в той же транзакции), команда rebuild_search_index
+пересобирает его целиком.
+
+Запрос разбивается на слова, каждое ищется по префиксу ("трек" найдёт
+"трекинг"), результаты сортируются по BM25 — совпадение в заголовке
+весит больше, чем в тексте.
+"""
+import re
+
+from django.apps import apps as global_apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import reverse
+from django.utils.html import escape
+
+SEARCH_TABLE = 'landing_search'
+MAX_QUERY_TERMS = 8
+DEFAULT_LIMIT = 20
+
+# Веса BM25 по колонкам таблицы: kind, object_id, title, body
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# Маркеры совпадений в snippet(): текст экранируется после, маркеры
+# заменяются на <mark> — разметка из контента в ответ не попадает
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+# Вид -> префикс rowid, модель, поля заголовка и текста, условие видимости
+# на сайте и секция главной страницы. Поля — пути для values_list, поэтому
+# в текст попадают и названия группы/категории.
+#
+# rowid строки индекса = (префикс << ROWID_SHIFT) | pk: обновление и
+# удаление записи идут по rowid, а не полным просмотром таблицы
+# (UNINDEXED-колонки FTS5 не индексируются)
+SEARCH_SOURCES = {
+    'document': {
+        'rowid_prefix': 1,
+        'model': 'landing.Document',
+        'title': ['title'],
+        'body': ['description', 'category__name'],
+        'filter': {'is_active': True},
+        'section': 'documents',
+    },
+    'specification': {
+        'rowid_prefix': 2,
+        'model': 'landing.Specification',
+        'title': ['name'],
+        'body': ['value', 'group__name'],
+        'filter': {},
+        'section': 'specs',
+    },
+    'module': {
+        'rowid_prefix': 3,
+        'model': 'landing.SoftwareModule',
+        'title': ['title'],
+        'body': ['description', 'tech_details'],
+        'filter': {'is_active': True},
+        'section': 'software',
+    },
+    'roadmap': {
+        'rowid_prefix': 4,
+        'model': 'landing.DevelopmentPlan',
+        'title': ['title'],
+        'body': ['description'],
+        'filter': {'is_active': True},
+        'section': 'software',
+    },
+}
+
+# Родительская модель -> (вид, поле связи): её название входит в текст
+# дочерних записей, поэтому после переименования они переиндексируются
+SEARCH_PARENTS = {
+    'landing.DocumentCategory': [('document', 'category')],
+    'landing.SpecificationGroup': [('specification', 'group')],
+}
+
+# Модели, от которых зависит выдача поиска (версии — в ETag ответа)
+SEARCH_MODELS = tuple(source['model'] for source in SEARCH_SOURCES.values()) + tuple(SEARCH_PARENTS)
+
+TERM_RE = re.compile(r'\w+')
+ROWID_SHIFT = 40
+
+
+def is_available(using=DEFAULT_DB_ALIAS):
+    """FTS5 есть только в SQLite — на других СУБД поиск отключён"""
+    return connections[using].vendor == 'sqlite'
+
+
+def source_for_model(label):
+    """Вид индекса для модели ('app.Model') или None"""
+    for kind, source in SEARCH_SOURCES.items():
+        if source['model'] == label:
+            return kind
+    return None
+
+
+def _rowid(kind, pk):
+    return (SEARCH_SOURCES[kind]['rowid_prefix'] << ROWID_SHIFT) | pk
+
+
+def _model(kind, apps):
+    return apps.get_model(SEARCH_SOURCES[kind]['model'])
+
+
+def _rows(kind, queryset):
+    """Строки индекса (rowid, kind, id, title, body) для видимых записей queryset"""
+    source = SEARCH_SOURCES[kind]
+    title_len = len(source['title'])
+    fields = source['title'] + source['body']
+    for pk, *values in queryset.filter(**source['filter']).values_list('pk', *fields):
+        values = [value or '' for value in values]
+        yield _rowid(kind, pk), kind, pk, ' '.join(values[:title_len]), '\n'.join(values[title_len:])
+
+
+def index_objects(kind, using=DEFAULT_DB_ALIAS, apps=global_apps, **lookups):
+    """
+    Переиндексировать записи вида kind, подходящие под lookups.
+    Скрытые записи (is_active=False) из индекса убираются.
+    """
+    # Чтение из той же базы, что и запись индекса: видны незафиксированные строки
+    queryset = _model(kind, apps).objects.using(using).filter(**lookups)
+    pks = list(queryset.values_list('pk', flat=True))
+    if not pks:
+        return
+    rows = list(_rows(kind, queryset))
+    with connections[using].cursor() as cursor:
+        placeholders = ','.join(['%s'] * len(pks))
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+            [_rowid(kind, pk) for pk in pks],
+        )
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def remove_object(kind, pk, using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [_rowid(kind, pk)])
+
+
+def rebuild(using=DEFAULT_DB_ALIAS, apps=global_apps):
+    """Пересобрать индекс целиком, вернуть {вид: число записей}"""
+    counts = {}
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for kind in SEARCH_SOURCES:
+            rows = list(_rows(kind, _model(kind, apps).objects.using(using)))
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+            counts[kind] = len(rows)
+        # Слить сегменты индекса после массовой вставки
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return counts
+
+
+def match_expression(query):
+    """
+    Выражение MATCH из пользовательского запроса: все слова, каждое по
+    префиксу. Слова берутся в кавычки, поэтому синтаксис FTS5 (OR, NEAR,
+    *, -) из запроса не интерпретируется.
+    """
+    terms = TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _highlight(text):
+    return escape(text).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+def _url(kind, pk):
+    if kind == 'document':
+        return reverse('landing:document_download', args=[pk])
+    return reverse('landing:index') + '#' + SEARCH_SOURCES[kind]['section']
+
+
+def search(query, limit=DEFAULT_LIMIT):
+    """Результаты поиска: список словарей, лучшие совпадения первыми"""
+    expression = match_expression(query)
+    if not expression or not is_available():
+        return []
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            f'SELECT kind, object_id, '
+            f"highlight({SEARCH_TABLE}, 2, '{MATCH_START}', '{MATCH_END}'), "
+            f"snippet({SEARCH_TABLE}, 3, '{MATCH_START}', '{MATCH_END}', '…', 16) "
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+            f'ORDER BY bm25({SEARCH_TABLE}, 0, 0, %s, %s) LIMIT %s',
+            [expression, TITLE_WEIGHT, BODY_WEIGHT, limit],
+        )
+        rows = cursor.fetchall()
+    return [
+        {
+            'kind': kind,
+            'id': pk,
+            'title': _highlight(title),
+            'snippet': _highlight(snippet),
+            'url': _url(kind, pk),
+        }
+        for kind, pk, title, snippet in rows
+    ]
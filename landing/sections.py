@@ -0,0 +1,84 @@
+"""
+Секции главной страницы и модели, от которых зависит их содержимое
+
+Секции ниже первого экрана отдаются отдельными HTML-фрагментами
+(landing/sections/<name>.html) и подгружаются при прокрутке.
+"""
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+from .models import (
+    DocumentCategory, Document, GalleryImage,
+    SpecificationGroup, Specification,
+    SoftwarePlatform, SoftwareModule, HardwareInterface, DevelopmentPlan
+)
+from .gallery import gallery_page
+from .icons import sprite_version
+from .versioning import get_versions
+
+APP_DIR = Path(__file__).resolve().parent
+
+SECTION_DEPENDENCIES = {
+    'specs': (SpecificationGroup, Specification),
+    'software_platform': (SoftwarePlatform,),
+    'software_modules': (SoftwareModule,),
+    'hardware_interfaces': (HardwareInterface,),
+    'roadmap': (DevelopmentPlan,),
+    'documents': (DocumentCategory, Document),
+    'gallery': (GalleryImage,),
+}
+
+
+@lru_cache(maxsize=None)
+def template_version():
+    """
+    Версия разметки текущей сборки: хэш шаблонов и тегов лендинга,
+    SVG-спрайта и манифеста статики. Считается один раз на процесс.
+    Кэш фрагментов лежит на томе и переживает деплой — без этой версии
+    новые воркеры отдавали бы HTML прошлой сборки.
+    """
+    digest = hashlib.sha256(sprite_version().encode())
+    paths = sorted((APP_DIR / 'templates' / 'landing').rglob('*.html'))
+    paths += sorted((APP_DIR / 'templatetags').glob('*.py'))
+    manifest_name = getattr(staticfiles_storage, 'manifest_name', None)
+    if manifest_name:
+        paths.append(Path(staticfiles_storage.path(manifest_name)))
+    for path in paths:
+        try:
+            digest.update(path.read_bytes())
+        except FileNotFoundError:
+            # Манифеста нет до collectstatic (разработка, тесты)
+            continue
+    return digest.hexdigest()[:12]
+
+
+def section_version(name):
+    """Версия секции — сочетание версий всех её моделей"""
+    return '.'.join(str(v) for v in get_versions(SECTION_DEPENDENCIES[name]))
+
+
+def section_context(name):
+    """Контекст шаблона фрагмента секции"""
+    if name == 'specs':
+        return {'spec_groups': SpecificationGroup.objects.prefetch_related('specifications')}
+    if name == 'software_platform':
+        return {'software_platform': SoftwarePlatform.get_platform()}
+    if name == 'software_modules':
+        return {'software_modules': SoftwareModule.objects.filter(is_active=True)}
+    if name == 'hardware_interfaces':
+        return {'hardware_interfaces': HardwareInterface.objects.filter(is_active=True)}
+    if name == 'roadmap':
+        return {'development_plans': DevelopmentPlan.objects.filter(is_active=True)}
+    if name == 'documents':
+        return {
+            'document_categories': DocumentCategory.objects.prefetch_related(
+                'documents'
+            ).filter(documents__is_active=True).distinct(),
+        }
+    if name == 'gallery':
+        images, next_cursor = gallery_page()
+        return {'gallery_images': images, 'gallery_next': next_cursor}
+    raise KeyError(name)
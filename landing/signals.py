@@ -0,0 +1,188 @@
+"""
+Сигналы лендинга "Птицелов"
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    DocumentCategory, Document, Feature,
+    SpecificationGroup, Specification, GalleryImage, SiteSettings,
+    SoftwarePlatform, SoftwareModule, HardwareInterface, DevelopmentPlan,
+    DownloadCounter,
+)
+from . import gallery, previews, search
+from .storage import document_storage
+from .versioning import bump_version
+
+# Модели, изменение которых меняет содержимое страниц
+CONTENT_MODELS = (
+    DocumentCategory, Document, Feature,
+    SpecificationGroup, Specification, GalleryImage, SiteSettings,
+    SoftwarePlatform, SoftwareModule, HardwareInterface, DevelopmentPlan,
+)
+
+# Служебные поля, которые не влияют на отображение: {модель: {поля}}
+# (счётчики скачиваний — отдельная модель DownloadCounter в базе заявок)
+VOLATILE_FIELDS = {}
+
+
+# Массовые изменения (landing.content): версии и поисковый индекс
+# обновляются один раз в конце, а не сигналом на каждую запись
+_bulk = threading.local()
+
+
+@contextmanager
+def bulk_changes():
+    _bulk.active = True
+    try:
+        yield
+    finally:
+        _bulk.active = False
+
+
+def in_bulk_changes():
+    return getattr(_bulk, 'active', False)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_content_version(sender, instance, **kwargs):
+    """Сменить версию модели контента после фиксации транзакции"""
+    if sender not in CONTENT_MODELS or in_bulk_changes():
+        return
+
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= VOLATILE_FIELDS.get(sender, set()):
+        return
+
+    # До коммита другие воркеры прочитали бы старые данные под новой версией
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+# ==================== ПОИСКОВЫЙ ИНДЕКС ====================
+
+@receiver(post_save)
+def update_search_index(sender, instance, **kwargs):
+    """Переиндексировать запись (и дочерние записи родительской модели)"""
+    using = kwargs['using']
+    if not search.is_available(using) or in_bulk_changes():
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= VOLATILE_FIELDS.get(sender, set()):
+        return
+
+    # В той же транзакции, что и запись: откат отменяет и изменение индекса
+    label = sender._meta.label
+    kind = search.source_for_model(label)
+    if kind:
+        search.index_objects(kind, using, pk=instance.pk)
+    for kind, field in search.SEARCH_PARENTS.get(label, ()):
+        search.index_objects(kind, using, **{field: instance.pk})
+
+
+@receiver(post_delete)
+def remove_from_search_index(sender, instance, **kwargs):
+    using = kwargs['using']
+    kind = search.source_for_model(sender._meta.label)
+    if kind and search.is_available(using) and not in_bulk_changes():
+        search.remove_object(kind, instance.pk, using)
+
+
+# ==================== ФАЙЛЫ ДОКУМЕНТОВ ====================
+
+def release_document_file(name, grace=None):
+    """
+    Удалить файл, если на него больше не ссылается ни один документ.
+    Файл, сохранённый или использованный повторно за последние grace
+    секунд (DOCUMENT_RELEASE_GRACE), остаётся: документ той загрузки
+    может быть ещё не зафиксирован.
+    """
+    if not name:
+        return
+    if grace is None:
+        grace = settings.DOCUMENT_RELEASE_GRACE
+    with document_storage.locked():
+        if Document.objects.filter(file=name).exists():
+            return
+        try:
+            modified = os.path.getmtime(document_storage.path(name))
+        except FileNotFoundError:
+            return
+        if time.time() - modified < grace:
+            return
+        document_storage.delete(name)
+        previews.release_preview(name)
+
+
+@receiver(pre_save, sender=Document)
+def remember_document_file(sender, instance, **kwargs):
+    """Запомнить прежний файл документа, чтобы освободить его после замены"""
+    update_fields = kwargs.get('update_fields')
+    if not instance.pk or (update_fields and 'file' not in update_fields):
+        instance._previous_file = None
+        return
+    instance._previous_file = (
+        Document.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Document)
+def release_replaced_document_file(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_file', None)
+    if previous and previous != instance.file.name:
+        transaction.on_commit(lambda: release_document_file(previous))
+
+
+@receiver(post_save, sender=Document)
+def schedule_document_preview(sender, instance, **kwargs):
+    """Превью нового файла строится в фоне, после коммита записи"""
+    if instance.file and instance.preview.name != previews.preview_name(instance.file.name):
+        transaction.on_commit(lambda: previews.schedule(instance))
+
+
+@receiver(post_delete, sender=Document)
+def release_deleted_document_file(sender, instance, **kwargs):
+    name, pk = instance.file.name, instance.pk
+    transaction.on_commit(lambda: release_document_file(name))
+    # Счётчик скачиваний — в базе заявок, вне транзакции удаления
+    transaction.on_commit(lambda: DownloadCounter.objects.filter(document_id=pk).delete())
+
+
+@receiver(pre_save, sender=GalleryImage)
+def build_gallery_thumbnail(sender, instance, **kwargs):
+    """Миниатюра для нового снимка или после замены изображения"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and 'image' not in update_fields:
+        return
+    if instance.thumbnail and instance.image._committed and instance.pk:
+        # Изображение могли заменить через image.save(save=False) — сверяем с БД
+        stored = GalleryImage.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+        if stored == instance.image.name:
+            return
+    instance._previous_thumbnail = instance.thumbnail.name or None
+    thumbnail = gallery.make_thumbnail(instance.image)
+    instance.thumbnail.save(thumbnail.name, thumbnail, save=False)
+    instance.thumbnail_bytes = thumbnail.size
+
+
+@receiver(post_save, sender=GalleryImage)
+def release_replaced_gallery_thumbnail(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_thumbnail', None)
+    instance._previous_thumbnail = None
+    if previous and previous != instance.thumbnail.name:
+        storage = instance.thumbnail.storage
+        transaction.on_commit(lambda: storage.delete(previous))
+
+
+@receiver(post_delete, sender=GalleryImage)
+def release_deleted_gallery_thumbnail(sender, instance, **kwargs):
+    if instance.thumbnail:
+        name, storage = instance.thumbnail.name, instance.thumbnail.storage
+        transaction.on_commit(lambda: storage.delete(name))
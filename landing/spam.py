@@ -0,0 +1,297 @@
+"""
+Фильтр повторяющихся заявок лендинга "Птицелов"
+
+Спам с формы обратной связи — обычно один и тот же текст с мелкими
+правками. Для каждого сообщения строится отпечаток:
+
+    - текст нормализуется (NFKC, регистр, ё -> е) и режется на слова;
+    - шинглы — пары подряд идущих слов;
+    - MinHash: минимум каждой из BINS хэш-функций по шинглам;
+    - значения группируются в BANDS полос по BAND_ROWS (LSH): у похожих
+      текстов (доля общих шинглов от ~0.7) совпадает несколько полос.
+
+Ключи полос хранятся в фильтре Блума в общем для воркеров файле
+(mmap, SPAM_FILTER_PATH). Фильтр из двух поколений по SPAM_FILTER_WINDOW
+секунд: новое поколение очищается при переходе окна, поэтому текст
+помнится от одного до двух окон. Сообщение — повтор, если в фильтре
+есть не меньше MATCH_BANDS его полос. Короткие сообщения (меньше
+MIN_SHINGLES шинглов) не проверяются: «Позвоните мне» пишут разные люди.
+
+Проверка занимает порядка 0.1–0.2 мс и не обращается к БД.
+"""
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+SHINGLE_SIZE = 2
+MIN_SHINGLES = 6
+BINS = 32
+BAND_ROWS = 4
+BANDS = BINS // BAND_ROWS
+MATCH_BANDS = 2
+
+# Вероятность ложного срабатывания фильтра Блума на один ключ полосы
+# при заполнении до SPAM_FILTER_CAPACITY сообщений
+BLOOM_ERROR_RATE = 0.001
+GENERATIONS = 2
+
+WORD_RE = re.compile(r'[^\W_]+')
+MINHASH_ROW = struct.Struct(f'<{BINS}I')
+
+MAGIC = b'LNDSPAM1'
+HEADER = struct.Struct(f'<8sIQ{GENERATIONS}q')
+DATA_OFFSET = mmap.PAGESIZE
+
+
+# ==================== ОТПЕЧАТОК ====================
+
+def normalize(text):
+    return unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+
+
+def shingles(text):
+    words = WORD_RE.findall(normalize(text))
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    """
+    MinHash из BINS хэш-функций: i-я функция — i-е 32-битное слово
+    SHAKE-128 от шингла. Один вызов хэша на шингл, минимумы по
+    функциям считаются в C (zip/min), а не в цикле Python.
+    """
+    rows = [MINHASH_ROW.unpack(hashlib.shake_128(shingle.encode()).digest(MINHASH_ROW.size)) for shingle in shingle_set]
+    return list(map(min, zip(*rows)))
+
+
+def fingerprint(text):
+    """Ключи LSH-полос сообщения или None, если оно слишком короткое"""
+    shingle_set = shingles(text)
+    if len(shingle_set) < MIN_SHINGLES:
+        return None
+    bins = minhash(shingle_set)
+    return [
+        hashlib.blake2b(
+            struct.pack(f'<B{BAND_ROWS}I', band, *bins[band * BAND_ROWS:(band + 1) * BAND_ROWS]),
+            digest_size=16,
+        ).digest()
+        for band in range(BANDS)
+    ]
+
+
+# ==================== ФИЛЬТР БЛУМА В ОБЩЕЙ ПАМЯТИ ====================
+
+def bloom_size(capacity, error_rate=BLOOM_ERROR_RATE):
+    """(бит на поколение, число хэш-функций) для capacity сообщений"""
+    items = capacity * BANDS
+    bits = math.ceil(-items * math.log(error_rate) / math.log(2) ** 2)
+    bits = (bits + 63) // 64 * 64
+    return bits, max(1, round(bits / items * math.log(2)))
+
+
+class SharedBloom:
+    """
+    Фильтр Блума из GENERATIONS поколений в файле, отображённом в память
+    всех воркеров. Чтение без блокировок; запись и смена поколения — под
+    flock (иначе два воркера, меняющие один байт, потеряли бы бит).
+    """
+
+    def __init__(self, path, capacity, window):
+        self.path = str(path)
+        self.window = window
+        self.bits, self.hashes = bloom_size(capacity)
+        self.size = DATA_OFFSET + GENERATIONS * self.bits // 8
+        self._open()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        while True:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            # Пока ждали блокировку, другой воркер мог заменить файл
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self.fd).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            os.close(self.fd)
+        try:
+            if os.fstat(self.fd).st_size != self.size or not self._valid_header():
+                # Новый файл или изменились размеры фильтра — начинаем с пустого
+                self._replace_file()
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.mm = mmap.mmap(self.fd, self.size)
+
+    def _replace_file(self):
+        """
+        Пустой фильтр — новым файлом через os.replace. Обрезать файл на
+        месте нельзя: у других воркеров он отображён в память, и обращение
+        за новый конец файла даёт SIGBUS. Они дорабатывают со старой копией
+        до перезапуска.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix='.spam-filter-')
+        try:
+            os.ftruncate(fd, self.size)
+            os.pwrite(fd, HEADER.pack(MAGIC, self.hashes, self.bits, *[-1] * GENERATIONS), 0)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.close(fd)
+            os.remove(tmp_path)
+            raise
+        # Блокировка старого файла снимается при закрытии
+        os.close(self.fd)
+        self.fd = fd
+
+    def _valid_header(self):
+        data = os.pread(self.fd, HEADER.size, 0)
+        if len(data) < HEADER.size:
+            return False
+        magic, hashes, bits, *_ = HEADER.unpack(data)
+        return magic == MAGIC and hashes == self.hashes and bits == self.bits
+
+    def _locked(self):
+        return _FileLock(self.fd)
+
+    def close(self):
+        self.mm.close()
+        os.close(self.fd)
+
+    # ---------- Поколения ----------
+
+    def _epochs(self):
+        return HEADER.unpack_from(self.mm, 0)[3:]
+
+    def _live_generations(self, epoch):
+        """Поколения текущего и предыдущего окна"""
+        return [
+            slot for slot, slot_epoch in enumerate(self._epochs())
+            if slot_epoch in (epoch, epoch - 1)
+        ]
+
+    def _positions(self, key):
+        h1, h2 = struct.unpack('<QQ', key)
+        h2 |= 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    # ---------- Операции ----------
+
+    def count(self, keys, now=None):
+        """Сколько ключей есть хотя бы в одном живом поколении"""
+        epoch = int((now or time.time()) // self.window)
+        offsets = [DATA_OFFSET + slot * self.bits // 8 for slot in self._live_generations(epoch)]
+        if not offsets:
+            return 0
+        mm = self.mm
+        found = 0
+        for key in keys:
+            positions = self._positions(key)
+            for offset in offsets:
+                if all(mm[offset + (p >> 3)] & (1 << (p & 7)) for p in positions):
+                    found += 1
+                    break
+        return found
+
+    def add(self, keys, now=None):
+        epoch = int((now or time.time()) // self.window)
+        slot = epoch % GENERATIONS
+        offset = DATA_OFFSET + slot * self.bits // 8
+        mm = self.mm
+        with self._locked():
+            epochs = list(self._epochs())
+            if epochs[slot] != epoch:
+                # Поколение двухоконной давности — очищаем под новое окно
+                mm[offset:offset + self.bits // 8] = bytes(self.bits // 8)
+                epochs[slot] = epoch
+                HEADER.pack_into(mm, 0, MAGIC, self.hashes, self.bits, *epochs)
+            for key in keys:
+                for p in self._positions(key):
+                    mm[offset + (p >> 3)] |= 1 << (p & 7)
+
+    def stats(self, now=None):
+        """Заполнение поколений и оценка вероятности ложного срабатывания на ключ"""
+        epoch = int((now or time.time()) // self.window)
+        live = self._live_generations(epoch)
+        fill = {}
+        for slot in live:
+            offset = DATA_OFFSET + slot * self.bits // 8
+            data = self.mm[offset:offset + self.bits // 8]
+            fill[slot] = int.from_bytes(data, 'little').bit_count() / self.bits
+        key_error = 1 - math.prod(1 - ratio ** self.hashes for ratio in fill.values())
+        return {
+            'bytes': self.size,
+            'bits': self.bits,
+            'hashes': self.hashes,
+            'fill': fill,
+            'key_error_rate': key_error,
+            'message_error_rate': _at_least(MATCH_BANDS, BANDS, key_error),
+        }
+
+
+class _FileLock:
+    def __init__(self, fd):
+        self.fd = fd
+
+    def __enter__(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def _at_least(k, n, p):
+    """P(не меньше k успехов из n) — вероятность ложного совпадения k полос"""
+    return sum(math.comb(n, i) * p ** i * (1 - p) ** (n - i) for i in range(k, n + 1))
+
+
+# ==================== ПРОВЕРКА ЗАЯВОК ====================
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def get_filter():
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                _filter = SharedBloom(
+                    settings.SPAM_FILTER_PATH, settings.SPAM_FILTER_CAPACITY, settings.SPAM_FILTER_WINDOW
+                )
+    return _filter
+
+
+def _after_fork():
+    # flock привязан к открытому файлу: после fork нужен свой дескриптор
+    global _filter, _filter_lock
+    _filter, _filter_lock = None, threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def is_duplicate(message):
+    """Похоже ли сообщение на недавнее (до записи в БД и внешних вызовов)"""
+    if not settings.SPAM_FILTER_ENABLED:
+        return False
+    keys = fingerprint(message)
+    return keys is not None and get_filter().count(keys) >= MATCH_BANDS
+
+
+def remember(message):
+    """Запомнить принятое сообщение"""
+    if not settings.SPAM_FILTER_ENABLED:
+        return
+    keys = fingerprint(message)
+    if keys is not None:
+        get_filter().add(keys)
@@ -0,0 +1,10 @@
+"""
+Статистика для нагрузочных и диагностических команд лендинга "Птицелов"
+"""
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу (values отсортированы)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
@@ -0,0 +1,140 @@
+"""
+Хранилище файлов с адресацией по содержимому для лендинга "Птицелов"
+
+Файл сохраняется под именем sha256 своего содержимого:
+documents/ab/ab12…ef.pdf. Повторная загрузка того же файла не создаёт
+копию, а имя файла никогда не меняет содержимое — nginx может отдавать
+такие файлы с Cache-Control: immutable.
+
+Файл удаляется, когда на него не осталось ссылок (landing.signals).
+Сохранение того же содержимого в это время вернуло бы имя удаляемого
+файла, поэтому проверка «файл уже есть» и удаление идут под общей
+блокировкой хранилища (locked), а повторное использование файла
+обновляет его mtime (claim) — свежий файл не удаляется.
+"""
+import fcntl
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_CHUNK_SIZE = 1024 * 1024
+LOCK_NAME = '.storage.lock'
+
+
+def file_sha256(content):
+    """sha256 файла Django, читая его частями"""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage, в котором имя файла — хэш содержимого.
+
+    Каталог берётся из upload_to поля (documents/), расширение — из
+    исходного имени. Ссылки на файл считаются по записям в БД
+    (см. landing.signals), файл удаляется, когда ссылок не осталось.
+    """
+
+    def hashed_name(self, name, digest):
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return '/'.join(filter(None, [directory, digest[:2], digest + ext]))
+
+    @contextmanager
+    def locked(self):
+        """Блокировка хранилища между процессами и потоками"""
+        os.makedirs(self.location, exist_ok=True)
+        with open(os.path.join(self.location, LOCK_NAME), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _touch(self, name):
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def claim(self, name):
+        """
+        Отметить хранимый файл как используемый (обновить mtime), чтобы
+        его не удалили до сохранения ссылающегося документа. False —
+        файла уже нет.
+        """
+        with self.locked():
+            return self._touch(name)
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, file_sha256(content))
+        with self.locked():
+            if self._touch(name):
+                # Такое содержимое уже хранится — просто ссылаемся на него
+                return name
+        # Новый файл пишется без блокировки: у него свежий mtime
+        return self._save(name, content)
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Пишем во временный файл рядом и атомарно переименовываем:
+        # параллельная загрузка того же файла запишет то же содержимое
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks(HASH_CHUNK_SIZE):
+                    f.write(chunk)
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
+
+    def store_local_file(self, path, name, digest):
+        """
+        Переместить готовый файл (например, собранную по частям загрузку)
+        в хранилище. Файл должен лежать на той же файловой системе —
+        тогда перемещение атомарно.
+        """
+        name = self.hashed_name(name, digest)
+        full_path = self.path(name)
+        with self.locked():
+            if self._touch(name):
+                os.remove(path)
+                return name
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.chmod(path, self.file_permissions_mode or 0o644)
+            os.replace(path, full_path)
+            # mtime части — время последнего куска, а не переноса
+            os.utime(full_path)
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        # Одинаковое имя означает одинаковое содержимое
+        return name
+
+
+document_storage = ContentAddressedStorage()
+
+
+def get_document_storage():
+    return document_storage
@@ -0,0 +1,155 @@
+"""
+Шаблонные теги лендинга "Птицелов"
+"""
+import logging
+import time
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from ..icons import ICON_PREFIX, ICONS, sprite_version
+from ..sections import SECTION_DEPENDENCIES, section_version, template_version
+from ..vendor import VENDOR_ASSETS, is_vendored
+
+register = template.Library()
+logger = logging.getLogger('landing.fragments')
+
+
+class CachedSectionNode(template.Node):
+    def __init__(self, name, nodelist):
+        self.name = name
+        self.nodelist = nodelist
+
+    def render(self, context):
+        start = time.perf_counter()
+        key = f'landing:fragment:{self.name}:{template_version()}:{section_version(self.name)}'
+        content = cache.get(key)
+        hit = content is not None
+        if not hit:
+            content = self.nodelist.render(context)
+            cache.set(key, content, settings.FRAGMENT_CACHE_TIMEOUT)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'Fragment %s: %s in %.2f ms',
+                self.name, 'hit' if hit else 'miss', (time.perf_counter() - start) * 1000
+            )
+        return mark_safe(content)
+
+
+@register.tag
+def cached_section(parser, token):
+    """
+    Кэширует фрагмент секции до изменения её моделей или шаблонов
+    (новая сборка — новый ключ):
+
+        {% cached_section 'specs' %} ... {% endcached_section %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' принимает одно имя секции")
+    name = bits[1].strip('\'"')
+    if name not in SECTION_DEPENDENCIES:
+        raise template.TemplateSyntaxError(f"Неизвестная секция '{name}'")
+    nodelist = parser.parse(('endcached_section',))
+    parser.delete_first_token()
+    return CachedSectionNode(name, nodelist)
+
+
+@register.simple_tag
+def vendor_asset(name):
+    """
+    <link>/<script> стороннего ассета: локальная копия из static/vendor/,
+    если она собрана (manage.py vendor_assets), иначе CDN:
+
+        {% vendor_asset 'aos.css' %}
+    """
+    asset = VENDOR_ASSETS[name]
+    if is_vendored(name):
+        url, extra = static(f'vendor/{name}'), ''
+    else:
+        url = asset['cdn']
+        extra = format_html(
+            ' integrity="{}" crossorigin="anonymous" referrerpolicy="no-referrer"', asset['integrity']
+        ) if 'integrity' in asset else ''
+    if name.endswith('.js'):
+        return format_html('<script src="{}"{}></script>', url, extra)
+    return _stylesheet_tag(url, extra)
+
+
+@lru_cache(maxsize=None)
+def _critical_css():
+    """Содержимое static/css/critical.css (manage.py build_critical_css) или ''"""
+    path = finders.find('css/critical.css')
+    if not path:
+        return ''
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def _stylesheet_tag(url, extra=''):
+    if not _critical_css():
+        return format_html('<link rel="stylesheet" href="{}"{}>', url, extra)
+    # Первый экран уже оформлен встроенным критическим CSS — остальное не блокирует отрисовку
+    return format_html(
+        '<link rel="preload" as="style" href="{}"{} onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{}"{}></noscript>',
+        url, extra, url, extra,
+    )
+
+
+@register.simple_tag
+def critical_css():
+    """Встроенный критический CSS первого экрана: {% critical_css %}"""
+    css = _critical_css()
+    return mark_safe(f'<style>{css}</style>') if css else ''
+
+
+@register.simple_tag
+def stylesheet(path):
+    """
+    Подключение стилей из static/: при собранном критическом CSS —
+    асинхронно, иначе обычным <link>:
+
+        {% stylesheet 'css/style.css' %}
+    """
+    return _stylesheet_tag(static(path))
+
+
+@register.simple_tag
+def vendored(name):
+    """Собрана ли локальная копия ассета: {% vendored 'fonts.css' as fonts_local %}"""
+    return is_vendored(name)
+
+
+@lru_cache(maxsize=None)
+def _sprite_url():
+    return f"{reverse('landing:icon_sprite')}?v={sprite_version()}"
+
+
+@register.simple_tag
+def icon(name, size=24, stroke=2, default='', css_class=''):
+    """
+    Иконка из SVG-спрайта (landing/icons.py):
+
+        {% icon feature.icon size=32 default='check-circle' %}
+
+    Неизвестное имя заменяется на default; без default ничего не выводится.
+    """
+    if name not in ICONS:
+        if not default:
+            return ''
+        name = default
+    href = f'{_sprite_url()}#{ICON_PREFIX}{name}'
+    return format_html(
+        '<svg class="icon{}" width="{}" height="{}" fill="none" stroke="currentColor" '
+        'stroke-width="{}" aria-hidden="true">'
+        '<use href="{}"/></svg>',
+        f' {css_class}' if css_class else '', size, size, stroke, href,
+    )
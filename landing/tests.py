@@ -0,0 +1,424 @@
+"""
+Тесты лендинга "Птицелов"
+"""
+import io
+import logging
+import os
+import re
+import shutil
+import tempfile
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
+
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import gallery, notifications, profiling, search, uploads
+from .log import SamplingFilter
+from .forms import DocumentAdminForm
+from .models import (
+    ContactRequest, DocumentCategory, Document, GalleryImage, SpecificationGroup, Specification, SoftwareModule,
+)
+from .signals import release_document_file
+
+# Версии контента и фрагменты — в памяти процесса, не в db/cache
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LeadsDatabaseMigrationTests(TransactionTestCase):
+    """0009 переносит заявки и счётчики скачиваний в базу заявок"""
+
+    databases = {'default', 'content_ro', 'leads'}
+    before = [('landing', '0008_search_index_rowids')]
+    after = [('landing', '0009_leads_database')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connections['default'])
+        executor.migrate(self.before)
+        self.apps = executor.loader.project_state(self.before).apps
+        # Таблица заявок в базе контента — как до разделения баз
+        ContactRequest = self.apps.get_model('landing', 'ContactRequest')
+        with connections['default'].schema_editor() as editor:
+            editor.create_model(ContactRequest)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connections['default'])
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_existing_leads_are_moved(self):
+        ContactRequest = self.apps.get_model('landing', 'ContactRequest')
+        DocumentCategory = self.apps.get_model('landing', 'DocumentCategory')
+        Document = self.apps.get_model('landing', 'Document')
+        ContactRequest.objects.using('default').create(
+            name='Иван', email='ivan@example.com', message='Нужна консультация'
+        )
+        category = DocumentCategory.objects.using('default').create(name='Паспорта', slug='passports')
+        document = Document.objects.using('default').create(
+            category=category, title='Паспорт', file='documents/passport.pdf', download_count=7
+        )
+
+        executor = MigrationExecutor(connections['default'])
+        executor.migrate(self.after)
+        apps = executor.loader.project_state(self.after).apps
+
+        leads = apps.get_model('landing', 'ContactRequest').objects.using('leads')
+        self.assertEqual(list(leads.values_list('email', flat=True)), ['ivan@example.com'])
+        counter = apps.get_model('landing', 'DownloadCounter').objects.using('leads').get()
+        self.assertEqual((counter.document_id, counter.count), (document.pk, 7))
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM landing_contactrequest')
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+
+@override_settings(CACHES=TEST_CACHES, ALLOWED_HOSTS=['testserver'])
+class SearchTests(TestCase):
+    # Внутри транзакции теста router читает контент из default, не из content_ro
+    databases = {'default', 'leads'}
+
+    def setUp(self):
+        self.category = DocumentCategory.objects.create(name='Паспорта', slug='passports')
+        self.group = SpecificationGroup.objects.create(name='Механика')
+
+    def get(self, query, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse('landing:search'), {'q': query}, **headers)
+
+    def test_etag_changes_with_content(self):
+        first = self.get('турель')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.get('турель', first['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SoftwareModule.objects.create(title='Турель', description='Наведение турели')
+        second = self.get('турель', first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual([result['kind'] for result in second.json()['results']], ['module'])
+
+    def test_etag_changes_with_parent_name(self):
+        first = self.get('механика')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.name = 'Механика и привод'
+            self.group.save()
+        self.assertEqual(self.get('механика', first['ETag']).status_code, 200)
+
+    def test_migration_sql_matches_rebuild(self):
+        """Зафиксированный в 0008 SQL строит тот же индекс, что и search.rebuild()"""
+        Document.objects.create(category=self.category, title='Паспорт', description='Изделие', file='documents/a.pdf')
+        Document.objects.create(category=self.category, title='Скрытый', file='documents/b.pdf', is_active=False)
+        Specification.objects.create(group=self.group, name='Масса', value='12 кг')
+        SoftwareModule.objects.create(title='Трекинг', description='Сопровождение', tech_details='20 fps')
+
+        search.rebuild()
+        expected = self.index_rows()
+        migration = import_module('landing.migrations.0008_search_index_rowids')
+        with connections['default'].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.SEARCH_TABLE}')
+            for sql in migration.FILL_SEARCH_TABLE:
+                cursor.execute(sql)
+        self.assertEqual(self.index_rows(), expected)
+
+    def index_rows(self):
+        with connections['default'].cursor() as cursor:
+            cursor.execute(f'SELECT rowid, kind, object_id, title, body FROM {search.SEARCH_TABLE} ORDER BY rowid')
+            return cursor.fetchall()
+
+
+class TempMediaMixin:
+    databases = {'default', 'leads'}
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.settings_override = override_settings(
+            CACHES=TEST_CACHES, MEDIA_ROOT=media, CHUNKED_UPLOAD_DIR=os.path.join(media, '.uploads')
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+
+class ChunkedUploadTests(TempMediaMixin, TestCase):
+
+    def upload(self, filename, data):
+        upload = uploads.create_upload(filename, len(data))
+        uploads.append_chunk(upload['id'], 0, io.BytesIO(data), len(data))
+        uploads.complete_upload(upload['id'])
+        return uploads.get_upload(upload['id'])
+
+    def test_rejects_extension_before_receiving_data(self):
+        for filename in ('page.html', 'logo.svg', 'noext'):
+            with self.subTest(filename=filename), self.assertRaises(uploads.UploadError):
+                uploads.create_upload(filename, 100)
+        self.assertFalse(os.path.exists(uploads.settings.CHUNKED_UPLOAD_DIR))
+
+    def test_resume_after_wrong_offset(self):
+        data = b'%PDF-1.4 ' * 100
+        upload = uploads.create_upload('passport.pdf', len(data))
+        self.assertEqual(uploads.append_chunk(upload['id'], 0, io.BytesIO(data[:300]), 300), 300)
+        # Повтор той же части (клиент не получил ответ) — 409 и текущее смещение
+        with self.assertRaises(uploads.UploadError) as error:
+            uploads.append_chunk(upload['id'], 0, io.BytesIO(data[:300]), 300)
+        self.assertEqual((error.exception.status, error.exception.offset), (409, 300))
+        uploads.append_chunk(upload['id'], 300, io.BytesIO(data[300:]), len(data) - 300)
+        name = uploads.complete_upload(upload['id'])
+        with uploads.document_storage.open(name) as f:
+            self.assertEqual(f.read(), data)
+
+    def test_form_discards_stored_file_with_bad_extension(self):
+        # Загрузка, начатая до проверки расширения в create_upload
+        upload = self.upload('passport.pdf', b'<html></html>')
+        meta, _ = uploads._read_meta(upload['id'])
+        meta['filename'] = 'page.html'
+        uploads._write_meta(upload['id'], meta)
+
+        form = DocumentAdminForm(data={'title': 'x', 'chunked_upload': upload['id']})
+        self.assertFalse(form.is_valid())
+        self.assertIn('chunked_upload', form.errors)
+        self.assertFalse(uploads.document_storage.exists(upload['stored_name']))
+
+    def test_form_rejects_file_released_after_upload(self):
+        upload = self.upload('passport.pdf', b'%PDF-1.4')
+        # Тот же файл был у удалённого документа и освобождён до отправки формы
+        uploads.document_storage.delete(upload['stored_name'])
+        form = DocumentAdminForm(data={'title': 'x', 'chunked_upload': upload['id']})
+        self.assertFalse(form.is_valid())
+        self.assertIn('chunked_upload', form.errors)
+
+
+class DocumentFileReleaseTests(TempMediaMixin, TestCase):
+    def store(self, data):
+        return uploads.document_storage.save('documents/passport.pdf', ContentFile(data))
+
+    def age(self, name, seconds=3600):
+        path = uploads.document_storage.path(name)
+        past = os.path.getmtime(path) - seconds
+        os.utime(path, (past, past))
+
+    def test_unreferenced_file_is_deleted(self):
+        name = self.store(b'%PDF-1.4 old')
+        self.age(name)
+        release_document_file(name)
+        self.assertFalse(uploads.document_storage.exists(name))
+
+    def test_file_reused_by_pending_upload_is_kept(self):
+        name = self.store(b'%PDF-1.4 same')
+        self.age(name)
+        # Параллельная загрузка того же содержимого: документ ещё не сохранён
+        self.assertEqual(self.store(b'%PDF-1.4 same'), name)
+        release_document_file(name)
+        self.assertTrue(uploads.document_storage.exists(name))
+
+    def test_referenced_file_is_kept(self):
+        category = DocumentCategory.objects.create(name='Паспорта', slug='passports')
+        name = self.store(b'%PDF-1.4 used')
+        Document.objects.create(category=category, title='Паспорт', file=name)
+        self.age(name)
+        release_document_file(name)
+        self.assertTrue(uploads.document_storage.exists(name))
+
+
+@override_settings(
+    CACHES=TEST_CACHES, NOTIFY_DIGEST_MINUTES=0, ALLOWED_HOSTS=['testserver'],
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class NotificationTests(TestCase):
+    databases = {'default', 'leads'}
+
+    def setUp(self):
+        self.lead = ContactRequest.objects.create(name='Иван', email='ivan@example.com', message='Нужна консультация')
+
+    def test_notified_only_after_send(self):
+        count, _ = notifications.Dispatcher().dispatch()
+        self.assertEqual((count, len(mail.outbox)), (1, 1))
+        self.lead.refresh_from_db()
+        self.assertIsNotNone(self.lead.notified_at)
+
+    def submit(self):
+        return self.client.post(reverse('landing:contact_submit'), {
+            'name': 'Пётр', 'email': 'petr@example.com', 'message': 'Тот же текст', 'consent': 'on',
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    @mock.patch('landing.spam.is_duplicate', return_value=True)
+    def test_duplicate_is_flagged_without_email(self, is_duplicate):
+        with self.assertLogs('landing.spam.duplicates', 'WARNING'):
+            self.assertTrue(self.submit().json()['success'])
+        duplicate = ContactRequest.objects.get(email='petr@example.com')
+        self.assertTrue(duplicate.is_duplicate)
+
+        count, _ = notifications.Dispatcher().dispatch()
+        self.assertEqual(count, 1)
+        self.assertNotIn('petr@example.com', mail.outbox[0].body)
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.notified_at)
+
+    @override_settings(SPAM_FILTER_ACTION='reject')
+    @mock.patch('landing.spam.is_duplicate', return_value=True)
+    def test_duplicate_rejected(self, is_duplicate):
+        self.assertTrue(self.submit().json()['success'])
+        self.assertFalse(ContactRequest.objects.filter(email='petr@example.com').exists())
+
+    def test_claim_of_killed_worker_expires(self):
+        # Воркер забрал заявку и умер, не успев отправить
+        self.assertEqual(notifications.claim(), [self.lead])
+        self.lead.refresh_from_db()
+        self.assertIsNone(self.lead.notified_at)
+
+        count, delay = notifications.Dispatcher().dispatch()
+        self.assertEqual(count, 0)
+        self.assertGreater(delay, 0)
+
+        with override_settings(NOTIFY_CLAIM_TIMEOUT=-1):
+            count, _ = notifications.Dispatcher().dispatch()
+        self.assertEqual((count, len(mail.outbox)), (1, 1))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ProfilingTests(TestCase):
+    databases = {'default', 'leads'}
+
+    def setUp(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        self.settings_override = override_settings(PROFILE_DIR=Path(profile_dir), PROFILE_MAX_FILES=2)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_token_requires_current_staff(self):
+        user = get_user_model().objects.create_user('admin', is_staff=True)
+        token = profiling.make_token(user)
+        self.assertTrue(profiling.check_token(token))
+        user.is_staff = False
+        user.save()
+        self.assertFalse(profiling.check_token(token))
+        user.delete()
+        self.assertFalse(profiling.check_token(token))
+
+    def test_prune_skips_files_removed_by_other_worker(self):
+        ids = [profiling.save_profile({}, {}) for _ in range(3)]
+        self.assertEqual(len(list(settings.PROFILE_DIR.glob('*.json'))), 2)
+
+        real_stat = Path.stat
+
+        def stat(path, *args, **kwargs):
+            # Файл удалён другим воркером между glob и stat
+            if path.name == f'{ids[-1]}.json':
+                raise FileNotFoundError(path)
+            return real_stat(path, *args, **kwargs)
+
+        with mock.patch.object(Path, 'stat', stat):
+            profile_id = profiling.save_profile({}, {})
+        self.assertIsNotNone(profiling.load_profile(profile_id))
+
+
+@override_settings(CACHES=TEST_CACHES, ALLOWED_HOSTS=['testserver'], GALLERY_PAGE_SIZE=3, GALLERY_PAGE_BYTES=1000)
+class GalleryPagingTests(TestCase):
+    databases = {'default', 'leads'}
+
+    def setUp(self):
+        # bulk_create — без построения миниатюр в pre_save
+        GalleryImage.objects.bulk_create([
+            GalleryImage(
+                title=f'Снимок {n}', image=f'gallery/{n}.jpg', thumbnail=f'gallery/thumbs/{n}.webp',
+                thumbnail_bytes=100, order=order, is_active=active,
+            )
+            for n, order, active in [(1, 2, True), (2, 1, True), (3, 1, True), (4, 1, False), (5, 0, True),
+                                     (6, 2, True), (7, 1, True), (8, 3, True)]
+        ])
+        GalleryImage.objects.bulk_create([GalleryImage(title='Без миниатюры', image='gallery/9.jpg', order=0)])
+
+    def pages(self):
+        url, titles = reverse('landing:gallery_page'), []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            titles.append(re.findall(r'data-title="([^"]+)"', response.content.decode()))
+            url = response.get('X-Next-Page')
+        return titles
+
+    def test_pages_follow_cursor(self):
+        expected = list(
+            GalleryImage.objects.filter(is_active=True).exclude(thumbnail='')
+            .order_by('order', 'id').values_list('title', flat=True)
+        )
+        pages = self.pages()
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_insert_before_cursor_does_not_shift_pages(self):
+        first, next_cursor = gallery.gallery_page()
+        # Новый снимок в начале галереи не сдвигает следующую страницу (как сдвинул бы OFFSET)
+        GalleryImage.objects.bulk_create([GalleryImage(
+            title='Новый', image='gallery/10.jpg', thumbnail='gallery/thumbs/10.webp', thumbnail_bytes=100,
+        )])
+        second, _ = gallery.gallery_page(gallery.parse_cursor(next_cursor))
+        self.assertFalse({image.pk for image in first} & {image.pk for image in second})
+        self.assertEqual(second[0].title, 'Снимок 7')
+
+    @override_settings(GALLERY_PAGE_BYTES=250)
+    def test_page_limited_by_thumbnail_bytes(self):
+        self.assertEqual([len(page) for page in self.pages()], [2, 2, 2, 1])
+
+    def test_etag_changes_with_templates(self):
+        url = reverse('landing:gallery_page')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with mock.patch('landing.views.template_version', return_value='next-build'):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_bad_cursor(self):
+        response = self.client.get(reverse('landing:gallery_page'), {'after': '1;DROP'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FragmentCacheTests(TestCase):
+    databases = {'default', 'leads'}
+
+    def render(self, value):
+        return Template(
+            "{% load landing_tags %}{% cached_section 'roadmap' %}{{ value }}{% endcached_section %}"
+        ).render(Context({'value': value}))
+
+    def test_new_templates_miss_old_fragments(self):
+        self.assertEqual(self.render('old'), 'old')
+        self.assertEqual(self.render('new'), 'old')
+        # Деплой с другими шаблонами — кэш на томе тот же, ключ другой
+        with mock.patch('landing.templatetags.landing_tags.template_version', return_value='next-build'):
+            self.assertEqual(self.render('new'), 'new')
+
+
+@override_settings(CACHES=TEST_CACHES, ALLOWED_HOSTS=['testserver'])
+class SectionFragmentTests(TestCase):
+    databases = {'default', 'leads'}
+
+    def test_etag_changes_with_templates(self):
+        url = reverse('landing:section_fragment', args=['roadmap'])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with mock.patch('landing.views.template_version', return_value='next-build'):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class SamplingFilterTests(SimpleTestCase):
+    def record(self, msg):
+        return logging.LogRecord('landing.spam', logging.WARNING, __file__, 1, msg, None, None)
+
+    def test_samples_by_message_template(self):
+        sampler = SamplingFilter({'landing.spam': 3})
+        self.assertEqual([sampler.filter(self.record('Honeypot triggered')) for _ in range(4)],
+                         [True, False, False, True])
+
+    def test_non_string_message_passes(self):
+        sampler = SamplingFilter({'landing.spam': 3})
+        for msg in ({'event': 'honeypot'}, ['a'], {'event': 'honeypot'}):
+            self.assertTrue(sampler.filter(self.record(msg)))
@@ -0,0 +1,247 @@
+"""
+Возобновляемая загрузка больших файлов по частям (для админки документов)
+
+Состояние загрузки хранится рядом с медиафайлами:
+    <id>.json — имя и полный размер файла
+    <id>.part — уже полученные байты; его размер и есть текущее смещение
+
+Части пишутся сразу на диск, поэтому память сервера не зависит от
+размера файла, а после обрыва соединения клиент продолжает с того
+смещения, которое вернёт сервер. Готовый файл атомарно перемещается
+в хранилище документов (та же файловая система).
+
+Запись части и завершение загрузки идут под flock на .part: две
+одновременные части с одним смещением не допишутся обе.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from .models import DOCUMENT_EXTENSIONS
+from .storage import HASH_CHUNK_SIZE, document_storage
+
+READ_SIZE = 64 * 1024
+
+# Хэш считается по мере получения частей. Если очередная часть пришла
+# в другой воркер, хэш досчитывается по файлу при завершении.
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """Ошибка загрузки; status — HTTP-код ответа"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def _paths(upload_id):
+    try:
+        uuid.UUID(hex=upload_id)
+    except (TypeError, ValueError):
+        raise UploadError('Неизвестная загрузка', status=404)
+    base = os.path.join(settings.CHUNKED_UPLOAD_DIR, upload_id)
+    return base + '.json', base + '.part'
+
+
+def _read_meta(upload_id):
+    meta_path, part_path = _paths(upload_id)
+    try:
+        with open(meta_path) as f:
+            return json.load(f), part_path
+    except FileNotFoundError:
+        raise UploadError('Неизвестная загрузка', status=404)
+
+
+def _open_part(upload_id, mode):
+    """
+    Файл .part под эксклюзивной блокировкой (снимается при закрытии) и
+    состояние загрузки, прочитанное уже под ней.
+    """
+    meta, part_path = _read_meta(upload_id)
+    try:
+        f = open(part_path, mode)
+    except FileNotFoundError:
+        # Уже перемещён в хранилище
+        raise UploadError('Загрузка уже завершена', status=409, offset=meta['size'])
+    fcntl.flock(f, fcntl.LOCK_EX)
+    try:
+        meta, _ = _read_meta(upload_id)
+    except UploadError:
+        f.close()
+        raise
+    return f, meta
+
+
+def check_extension(filename):
+    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    if ext not in DOCUMENT_EXTENSIONS:
+        raise UploadError(f'Недопустимое расширение файла: .{ext}')
+
+
+def _write_meta(upload_id, meta):
+    meta_path, _ = _paths(upload_id)
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def cleanup_stale_uploads():
+    """Удалить брошенные загрузки старше CHUNKED_UPLOAD_EXPIRY секунд"""
+    from .signals import release_document_file
+
+    directory = settings.CHUNKED_UPLOAD_DIR
+    if not os.path.isdir(directory):
+        return
+    deadline = time.time() - settings.CHUNKED_UPLOAD_EXPIRY
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json'):
+            continue
+        upload_id = entry.name[:-len('.json')]
+        try:
+            meta, part_path = _read_meta(upload_id)
+            # Активная загрузка обновляет .part при каждой части
+            modified = max(
+                entry.stat().st_mtime,
+                os.path.getmtime(part_path) if os.path.exists(part_path) else 0,
+            )
+        except (UploadError, OSError):
+            continue
+        if modified > deadline:
+            continue
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        os.remove(entry.path)
+        # Файл собран, но форма документа так и не была сохранена
+        release_document_file(meta.get('stored_name'))
+
+
+def create_upload(filename, size):
+    """Начать загрузку, вернуть её состояние"""
+    if size <= 0 or size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError('Недопустимый размер файла')
+    # До приёма байтов: готовый файл попадает в публичное хранилище
+    check_extension(filename)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    cleanup_stale_uploads()
+
+    upload_id = uuid.uuid4().hex
+    _, part_path = _paths(upload_id)
+    open(part_path, 'wb').close()
+    _write_meta(upload_id, {'filename': os.path.basename(filename), 'size': size})
+    with _hashers_lock:
+        _hashers[upload_id] = (0, hashlib.sha256())
+    return get_upload(upload_id)
+
+
+def get_upload(upload_id):
+    """Состояние загрузки: смещение, размер, имя файла в хранилище"""
+    meta, part_path = _read_meta(upload_id)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else meta['size']
+    return {
+        'id': upload_id,
+        'filename': meta['filename'],
+        'size': meta['size'],
+        'offset': offset,
+        'stored_name': meta.get('stored_name'),
+    }
+
+
+def append_chunk(upload_id, offset, stream, length):
+    """
+    Дописать часть файла с указанного смещения, читая запрос небольшими
+    блоками. Возвращает новое смещение.
+    """
+    f, meta = _open_part(upload_id, 'r+b')
+    with f:
+        if meta.get('stored_name'):
+            raise UploadError('Загрузка уже завершена', status=409, offset=meta['size'])
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            raise UploadError('Неверное смещение', status=409, offset=current)
+        if offset + length > meta['size']:
+            raise UploadError('Часть выходит за размер файла', status=416, offset=current)
+
+        with _hashers_lock:
+            hashed_offset, hasher = _hashers.pop(upload_id, (None, None))
+        if hashed_offset != offset:
+            hasher = None
+
+        written = 0
+        f.seek(offset)
+        while written < length:
+            data = stream.read(min(READ_SIZE, length - written))
+            if not data:
+                break
+            f.write(data)
+            if hasher is not None:
+                hasher.update(data)
+            written += len(data)
+        # Оборванная часть не должна оставлять «хвост» после смещения
+        f.truncate(offset + written)
+
+        if hasher is not None:
+            with _hashers_lock:
+                _hashers[upload_id] = (offset + written, hasher)
+    return offset + written
+
+
+def complete_upload(upload_id, upload_to='documents/'):
+    """Проверить размер, посчитать хэш и переместить файл в хранилище"""
+    try:
+        f, meta = _open_part(upload_id, 'rb')
+    except UploadError:
+        meta, _ = _read_meta(upload_id)
+        if meta.get('stored_name'):
+            return meta['stored_name']
+        raise
+    with f:
+        if meta.get('stored_name'):
+            return meta['stored_name']
+        check_extension(meta['filename'])
+        size = os.fstat(f.fileno()).st_size
+        if size != meta['size']:
+            raise UploadError('Файл загружен не полностью', status=409, offset=size)
+
+        with _hashers_lock:
+            hashed_offset, hasher = _hashers.pop(upload_id, (None, None))
+        if hashed_offset != size:
+            hasher = hashlib.sha256()
+            for data in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                hasher.update(data)
+
+        _, part_path = _paths(upload_id)
+        name = os.path.join(upload_to, meta['filename'])
+        meta['stored_name'] = document_storage.store_local_file(part_path, name, hasher.hexdigest())
+        _write_meta(upload_id, meta)
+    return meta['stored_name']
+
+
+def discard_upload(upload_id):
+    """Отменить загрузку: служебные файлы и собранный файл, если на него нет ссылок"""
+    from .signals import release_document_file
+
+    try:
+        meta, _ = _read_meta(upload_id)
+    except UploadError:
+        return
+    finish_upload(upload_id)
+    # Файл только что собран этой загрузкой — без ожидания
+    release_document_file(meta.get('stored_name'), grace=0)
+
+
+def finish_upload(upload_id):
+    """Убрать служебные файлы после сохранения документа"""
+    meta_path, part_path = _paths(upload_id)
+    for path in (meta_path, part_path):
+        if os.path.exists(path):
+            os.remove(path)
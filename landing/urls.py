@@ -8,8 +8,16 @@ app_name = 'landing'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('sections/<slug:name>/', views.section_fragment, name='section_fragment'),
+    path('gallery/', views.gallery_page, name='gallery_page'),
     path('privacy/', views.privacy_policy, name='privacy'),
     path('cookies/', views.cookie_policy, name='cookies'),
     path('document/<int:pk>/download/', views.document_download, name='document_download'),
+    path('documents/<slug:slug>/bundle.zip', views.document_bundle, name='document_bundle'),
     path('contact/', views.contact_submit, name='contact_submit'),
+    path('api/v1/<slug:resource>/', views.api_resource, name='api_resource'),
+    path('search/', views.search_view, name='search'),
+    path('icons.svg', views.icon_sprite, name='icon_sprite'),
+    path('healthz', views.healthz, name='healthz'),
+    path('readyz', views.readyz, name='readyz'),
 ]
@@ -0,0 +1,88 @@
+"""
+Сторонние ассеты лендинга: локальные копии вместо CDN
+
+Исходные файлы библиотек и шрифтов лежат в репозитории в vendor/.
+Команда vendor_assets собирает из них static/vendor/: шрифты и
+иконочный шрифт урезаются до используемых символов, остальное
+копируется как есть. Дальше файлы проходят обычный collectstatic
+(ManifestStaticFilesStorage добавляет хэш в имя).
+
+Пока локальной сборки ассета нет, шаблон подключает его с CDN.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+VENDOR_DIR = settings.BASE_DIR / 'vendor'
+STATIC_VENDOR_DIR = settings.BASE_DIR / 'static' / 'vendor'
+
+# Ассет в static/vendor/ -> адрес на CDN (и SRI), пока локальной копии нет
+VENDOR_ASSETS = {
+    'fonts.css': {
+        'cdn': 'https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700'
+               '&family=JetBrains+Mono:wght@400;500&display=swap',
+    },
+    'fontawesome.css': {
+        'cdn': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css',
+        'integrity': 'sha512-DTOQO9RWCH3ppGqcWaEA1BIZOC6xxalwEsw9c2QQeAIftl+Vegovlnee1c9QX4TctnWMn13TZye+giMm8e2LwA==',
+    },
+    'aos.css': {'cdn': 'https://unpkg.com/aos@2.3.1/dist/aos.css'},
+    'aos.js': {'cdn': 'https://unpkg.com/aos@2.3.1/dist/aos.js'},
+    'glightbox.css': {'cdn': 'https://cdn.jsdelivr.net/npm/glightbox/dist/css/glightbox.min.css'},
+    'glightbox.js': {'cdn': 'https://cdn.jsdelivr.net/npm/glightbox/dist/js/glightbox.min.js'},
+}
+
+# Копируются без изменений: ассет -> исходник в vendor/
+COPIED_ASSETS = {
+    'aos.css': 'aos-2.3.1/aos.css',
+    'aos.js': 'aos-2.3.1/aos.js',
+    'glightbox.css': 'glightbox/glightbox.min.css',
+    'glightbox.js': 'glightbox/glightbox.min.js',
+}
+
+# Текстовые шрифты (вариативные): оси фиксируются или сужаются до
+# используемых начертаний
+TEXT_FONTS = [
+    {
+        'family': 'Inter',
+        'source': 'inter/Inter[opsz,wght].ttf',
+        'output': 'inter',
+        'axes': {'opsz': 14, 'wght': (300, 700)},
+    },
+    {
+        'family': 'JetBrains Mono',
+        'source': 'jetbrains-mono/JetBrainsMono[wght].ttf',
+        'output': 'jetbrains-mono',
+        'axes': {'wght': (400, 500)},
+    },
+]
+
+# Символы, которые всегда остаются в текстовых шрифтах: текст правится
+# в админке, поэтому кроме найденных символов нужна латиница, кириллица
+# и типографская пунктуация
+TEXT_UNICODE_RANGES = [
+    (0x0020, 0x007E),
+    (0x00A0, 0x00FF),
+    (0x0401, 0x045F),
+    (0x2010, 0x2027),
+    (0x2030, 0x203A),
+    (0x20AC, 0x20AC),
+    (0x20BD, 0x20BD),
+    (0x2116, 0x2116),
+    (0x2122, 0x2122),
+]
+
+ICON_FONT = {
+    'family': 'Font Awesome 6 Free',
+    'weight': 900,
+    'source': 'fontawesome-6.5.1/webfonts/fa-solid-900.ttf',
+    'css': 'fontawesome-6.5.1/css/fontawesome.min.css',
+    'output': 'fa-solid-900',
+}
+
+
+@lru_cache(maxsize=None)
+def is_vendored(name):
+    """Есть ли локальная сборка ассета (static/vendor/<name>)"""
+    return finders.find(f'vendor/{name}') is not None
@@ -0,0 +1,74 @@
+"""
+Версии контента и кэш синглтонов для лендинга "Птицелов"
+
+У каждой модели контента есть номер версии в общем кэше Django.
+Версия меняется после сохранения или удаления записи, поэтому воркеры
+gunicorn сбрасывают свои локальные копии без запросов к БД.
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'landing:version:'
+
+# Локальные копии синглтонов процесса: label -> (версия, объект)
+_singletons = {}
+
+
+def _label(model):
+    # 'landing.Document' и класс модели — одна версия (ключ по label_lower)
+    return model.lower() if isinstance(model, str) else model._meta.label_lower
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def get_version(model):
+    """Текущая версия модели (класс или 'app.model')"""
+    key = VERSION_KEY_PREFIX + _label(model)
+    version = cache.get(key)
+    if version is None:
+        # Первое обращение или кэш очищен — заводим новую версию
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(models):
+    """Версии нескольких моделей за одно обращение к кэшу"""
+    labels = [_label(model) for model in models]
+    keys = [VERSION_KEY_PREFIX + label for label in labels]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _new_version(), None)
+            found[key] = cache.get(key)
+    return tuple(found[key] for key in keys)
+
+
+def bump_version(model):
+    """Сменить версию модели и сбросить локальную копию синглтона"""
+    label = _label(model)
+    cache.set(VERSION_KEY_PREFIX + label, _new_version(), None)
+    _singletons.pop(label, None)
+
+
+def load_singleton(model):
+    """
+    Получить запись синглтона (pk=1) из памяти процесса.
+
+    В БД обращаемся только если версия модели изменилась с момента
+    последней загрузки. Возвращаемый объект общий для всех запросов
+    процесса — его нельзя изменять.
+    """
+    label = _label(model)
+    # Версию читаем до загрузки: если запись сохранят между чтением и
+    # загрузкой, следующий запрос увидит новую версию и перечитает её
+    version = get_version(label)
+    cached = _singletons.get(label)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    obj, created = model.objects.get_or_create(pk=1)
+    _singletons[label] = (version, obj)
+    return obj
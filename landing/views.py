@@ -1,25 +1,42 @@
 """
 Views для лендинга "Птицелов"
 """
-import json
+import hashlib
 import logging
-import requests
+import os
+import re
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, FileResponse, Http404
-from django.views.decorators.http import require_POST
+from django.http import (
+    HttpResponse, HttpResponseNotModified, JsonResponse, FileResponse,
+    StreamingHttpResponse, Http404
+)
+from django.views.decorators.http import require_POST, require_safe
 from django.views.decorators.csrf import csrf_protect
-from django.core.mail import send_mail
+from django.views.decorators.cache import never_cache
 from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag, parse_etags
 
-from .models import (
-    DocumentCategory, Document, Feature,
-    SpecificationGroup,
-    ContactRequest, SiteSettings,
-    SoftwarePlatform, SoftwareModule, HardwareInterface, DevelopmentPlan
-)
+from .models import DocumentCategory, Document, DownloadCounter, Feature, GalleryImage
 from .forms import ContactForm
+from .api import ALL_RESOURCES, API_RESOURCES, get_snapshot
+from .icons import build_sprite
+from .notifications import lead_created
+from . import spam
+from .search import SEARCH_MODELS, search
+from .gallery import gallery_page as get_gallery_page, parse_cursor
+from .bundles import bundle_entries, bundle_version, stream_bundle
+from .sections import SECTION_DEPENDENCIES, section_context, section_version, template_version
+from .versioning import get_versions
 
 logger = logging.getLogger(__name__)
+# Срабатывания защиты от ботов — шумные, в лог идёт выборка (LOGGING)
+spam_logger = logging.getLogger('landing.spam')
+# Повторы заявок — без выборки: по ним разбирают ошибки фильтра
+duplicate_logger = logging.getLogger('landing.spam.duplicates')
+
+accepts_gzip_re = re.compile(r'\bgzip\b')
 
 
 def verify_smartcaptcha(token, ip=None):
@@ -33,6 +50,9 @@ def verify_smartcaptcha(token, ip=None):
         logger.warning('SmartCaptcha: Empty token received')
         return False
     
+    # requests нужен только для капчи — не импортируем его при старте воркера
+    import requests
+    
     try:
         response = requests.post(
             'https://smartcaptcha.yandexcloud.net/validate',
@@ -44,68 +64,186 @@ def verify_smartcaptcha(token, ip=None):
             timeout=5
         )
         result = response.json()
-        logger.info(f'SmartCaptcha response: {result}')
+        logger.debug('SmartCaptcha response: %s', result)
         return result.get('status') == 'ok'
     except Exception as e:
-        logger.error(f'SmartCaptcha verification error: {e}')
+        logger.error('SmartCaptcha verification error: %s', e)
         # В случае ошибки API пропускаем (можно изменить на False для строгой проверки)
         return True
 
 
-def index(request):
-    """Главная страница лендинга"""
-    site_settings = SiteSettings.get_settings()
-    
+def get_index_context(**extra):
+    """Контекст главной страницы (секции ниже первого экрана — отдельные фрагменты)"""
     context = {
-        'settings': site_settings,
         'features': Feature.objects.filter(is_active=True),
-        'spec_groups': SpecificationGroup.objects.prefetch_related('specifications'),
-        'document_categories': DocumentCategory.objects.prefetch_related(
-            'documents'
-        ).filter(documents__is_active=True).distinct(),
+        'has_gallery': GalleryImage.objects.filter(is_active=True).exclude(thumbnail='').exists(),
         'contact_form': ContactForm(),
         'smartcaptcha_client_key': settings.SMARTCAPTCHA_CLIENT_KEY,
-        # Раздел ПО
-        'software_platform': SoftwarePlatform.get_platform(),
-        'software_modules': SoftwareModule.objects.filter(is_active=True),
-        'hardware_interfaces': HardwareInterface.objects.filter(is_active=True),
-        'development_plans': DevelopmentPlan.objects.filter(is_active=True),
     }
-    return render(request, 'landing/index.html', context)
+    context.update(extra)
+    return context
+
+
+def index(request):
+    """Главная страница лендинга"""
+    return render(request, 'landing/index.html', get_index_context())
+
+
+def section_fragment(request, name):
+    """HTML-фрагмент секции главной страницы (подгружается при прокрутке)"""
+    if name not in SECTION_DEPENDENCIES:
+        raise Http404("Секция не найдена")
+    
+    # Версия секции известна без обращения к БД — повторный запрос
+    # браузера с If-None-Match не рендерит шаблон. Версия шаблонов —
+    # чтобы после деплоя браузер не получил 304 на старую разметку
+    etag = quote_etag(f'{template_version()}.{section_version(name)}')
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = render(request, f'landing/sections/{name}.html', section_context(name))
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.SECTION_FRAGMENT_MAX_AGE)
+    return response
+
+
+@require_safe
+def gallery_page(request):
+    """
+    Следующая страница галереи (?after=<order>-<id>): HTML снимков для
+    сетки, адрес следующей страницы — в заголовке X-Next-Page
+    """
+    try:
+        after = parse_cursor(request.GET.get('after'))
+    except ValueError:
+        raise Http404("Неверный курсор галереи")
+    
+    etag = quote_etag(f"{template_version()}.{section_version('gallery')}:{request.GET.get('after', '')}")
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        images, next_cursor = get_gallery_page(after)
+        response = render(request, 'landing/sections/gallery_items.html', {'gallery_images': images})
+        if next_cursor:
+            response['X-Next-Page'] = f"{request.path}?after={next_cursor}"
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.SECTION_FRAGMENT_MAX_AGE)
+    return response
+
+
+@require_safe
+def api_resource(request, resource):
+    """JSON API контента: готовый снимок ресурса, gzip и ETag/304"""
+    if resource != ALL_RESOURCES and resource not in API_RESOURCES:
+        raise Http404("Ресурс не найден")
+    snapshot = get_snapshot(resource)
+    
+    # Слабый ETag: JSON и его gzip-версия — одно и то же содержимое
+    etag = 'W/' + quote_etag(snapshot.etag)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    elif accepts_gzip_re.search(request.headers.get('Accept-Encoding', '')):
+        response = HttpResponse(snapshot.gzipped, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(snapshot.body, content_type='application/json')
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    patch_cache_control(response, public=True, max_age=settings.API_CACHE_MAX_AGE)
+    return response
+
+
+@require_safe
+def search_view(request):
+    """Поиск по документам, характеристикам, модулям ПО и планам (JSON)"""
+    query = request.GET.get('q', '').strip()[:settings.SEARCH_MAX_QUERY_LENGTH]
+    
+    # Ответ меняется только вместе с контентом — ETag без запроса к индексу
+    versions = get_versions(SEARCH_MODELS)
+    etag = quote_etag(hashlib.sha256(repr((query, versions)).encode()).hexdigest()[:16])
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(
+            {'query': query, 'results': search(query)},
+            json_dumps_params={'ensure_ascii': False},
+        )
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.API_CACHE_MAX_AGE)
+    return response
 
 
 def privacy_policy(request):
     """Страница Политики обработки персональных данных"""
-    site_settings = SiteSettings.get_settings()
-    return render(request, 'landing/privacy.html', {'settings': site_settings})
+    return render(request, 'landing/privacy.html')
 
 
 def cookie_policy(request):
     """Страница Политики обработки файлов cookie"""
-    site_settings = SiteSettings.get_settings()
-    return render(request, 'landing/cookies.html', {'settings': site_settings})
+    return render(request, 'landing/cookies.html')
 
 
 def document_download(request, pk):
     """Скачивание документа с учётом счётчика"""
     document = get_object_or_404(Document, pk=pk, is_active=True)
     
-    # Увеличиваем счётчик скачиваний
-    document.download_count += 1
-    document.save(update_fields=['download_count'])
+    # Увеличиваем счётчик скачиваний (в базе заявок, не контента)
+    DownloadCounter.increment([document.pk])
     
     # Возвращаем файл
     try:
         response = FileResponse(
             document.file.open('rb'),
             as_attachment=True,
-            filename=document.file.name.split('/')[-1]
+            filename=document.download_filename
         )
         return response
     except FileNotFoundError:
         raise Http404("Файл не найден")
 
 
+def document_bundle(request, slug):
+    """ZIP-архив всех активных документов категории (формируется потоково)"""
+    category = get_object_or_404(DocumentCategory, slug=slug)
+    documents = category.documents.filter(is_active=True).order_by('pk')
+    entries = bundle_entries(documents)
+    if not entries:
+        raise Http404("В категории нет документов")
+    
+    etag = quote_etag(bundle_version(entries))
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    
+    # Один UPDATE на все документы архива вместо записи на каждый файл
+    DownloadCounter.increment(document.pk for document, _, _ in entries)
+    
+    response = StreamingHttpResponse(stream_bundle(entries), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{category.slug}.zip"'
+    response['ETag'] = etag
+    # Архив можно переиспользовать, пока не изменился состав документов
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def icon_sprite(request):
+    """SVG-спрайт иконок; адрес с ?v=<версия> кэшируется навсегда"""
+    sprite, version = build_sprite()
+    etag = quote_etag(version)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(sprite, content_type='image/svg+xml')
+    response['ETag'] = etag
+    if request.GET.get('v') == version:
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
 @require_POST
 @csrf_protect
 def contact_submit(request):
@@ -116,16 +254,29 @@ def contact_submit(request):
     
     # Honeypot check - если поле website заполнено, это бот
     if request.POST.get('website'):
-        logger.warning(f'Honeypot triggered from IP: {request.META.get("REMOTE_ADDR")}')
+        spam_logger.warning('Honeypot triggered', extra={'client_ip': request.META.get('REMOTE_ADDR')})
         if is_ajax:
             return JsonResponse({'success': True, 'message': 'Спасибо!'})  # Fake success
-        return render(request, 'landing/thank_you.html', {'settings': SiteSettings.get_settings()})
+        return render(request, 'landing/thank_you.html')
     
     # SmartCaptcha verification
     captcha_token = request.POST.get('smart-token', '')
     client_ip = request.META.get('REMOTE_ADDR', '')
     
-    logger.info(f'Contact form: captcha_token={captcha_token[:20] if captcha_token else "EMPTY"}..., IP={client_ip}')
+    # Повтор недавнего сообщения — проверка до капчи и записи в БД
+    message = request.POST.get('message', '')
+    is_duplicate = spam.is_duplicate(message)
+    if is_duplicate:
+        duplicate_logger.warning('Duplicate message', extra={
+            'client_ip': client_ip, 'action': settings.SPAM_FILTER_ACTION,
+        })
+        if settings.SPAM_FILTER_ACTION == 'reject':
+            if is_ajax:
+                return JsonResponse({'success': True, 'message': 'Спасибо!'})  # Fake success
+            return render(request, 'landing/thank_you.html')
+    
+    # Сам токен в лог не пишем — только факт его наличия
+    logger.info('Contact form submitted', extra={'client_ip': client_ip, 'has_captcha_token': bool(captcha_token)})
     
     # Временно: пропускаем проверку если токен пустой (для отладки)
     if captcha_token and not verify_smartcaptcha(captcha_token, client_ip):
@@ -135,15 +286,10 @@ def contact_submit(request):
                 'errors': {'captcha': ['Пожалуйста, пройдите проверку капчи']}
             }, status=400)
         else:
-            return render(request, 'landing/index.html', {
-                'contact_form': ContactForm(request.POST),
-                'captcha_error': 'Пожалуйста, пройдите проверку капчи',
-                'settings': SiteSettings.get_settings(),
-                'features': Feature.objects.filter(is_active=True),
-                'spec_groups': SpecificationGroup.objects.prefetch_related('specifications'),
-                'document_categories': DocumentCategory.objects.prefetch_related('documents'),
-                'smartcaptcha_client_key': settings.SMARTCAPTCHA_CLIENT_KEY,
-            })
+            return render(request, 'landing/index.html', get_index_context(
+                contact_form=ContactForm(request.POST),
+                captcha_error='Пожалуйста, пройдите проверку капчи',
+            ))
     
     form = ContactForm(request.POST)
     
@@ -152,32 +298,14 @@ def contact_submit(request):
         contact_request = form.save(commit=False)
         contact_request.ip_address = request.META.get('REMOTE_ADDR')
         contact_request.user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]  # Ограничиваем длину
+        contact_request.is_duplicate = is_duplicate
         contact_request.save()
+        spam.remember(message)
         
-        # Отправляем email уведомление
-        try:
-            send_mail(
-                subject=f'Новая заявка с сайта Арсенал от {contact_request.name}',
-                message=f"""
-Новая заявка с сайта:
-
-Имя: {contact_request.name}
-Email: {contact_request.email}
-Телефон: {contact_request.phone or 'Не указан'}
-Организация: {contact_request.company or 'Не указана'}
-
-Сообщение:
-{contact_request.message}
-
----
-Дата: {contact_request.created_at.strftime('%d.%m.%Y %H:%M')}
-                """,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.CONTACT_EMAIL],
-                fail_silently=True,
-            )
-        except Exception:
-            pass  # Не прерываем процесс если email не отправился
+        # Письмо отправит поток уведомлений (через открытое SMTP-соединение
+        # или дайджестом) — ответ не ждёт SMTP-сервер
+        if not is_duplicate:
+            lead_created(contact_request)
         
         if is_ajax:
             return JsonResponse({
@@ -186,9 +314,7 @@ Email: {contact_request.email}
             })
         else:
             # Редирект для не-AJAX запросов
-            return render(request, 'landing/thank_you.html', {
-                'settings': SiteSettings.get_settings()
-            })
+            return render(request, 'landing/thank_you.html')
     else:
         if is_ajax:
             return JsonResponse({
@@ -197,10 +323,40 @@ Email: {contact_request.email}
             }, status=400)
         else:
             # Вернуть страницу с ошибками
-            return render(request, 'landing/index.html', {
-                'contact_form': form,
-                'settings': SiteSettings.get_settings(),
-                'features': Feature.objects.filter(is_active=True),
-                'spec_groups': SpecificationGroup.objects.prefetch_related('specifications'),
-                'document_categories': DocumentCategory.objects.prefetch_related('documents'),
-            })
+            return render(request, 'landing/index.html', get_index_context(
+                contact_form=form,
+            ))
+
+
+@never_cache
+def healthz(request):
+    """Проверка живости процесса (без обращения к БД)"""
+    return HttpResponse('ok', content_type='text/plain')
+
+
+@never_cache
+def readyz(request):
+    """Проверка готовности: доступность баз данных и тома с медиафайлами"""
+    checks = {}
+
+    for alias in connections:
+        key = 'database' if alias == 'default' else f'database_{alias}'
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            checks[key] = 'ok'
+        except Exception as e:
+            logger.error('Readiness: database %s check failed: %s', alias, e)
+            checks[key] = 'error'
+
+    media_root = str(settings.MEDIA_ROOT)
+    if os.path.isdir(media_root) and os.access(media_root, os.W_OK):
+        checks['media'] = 'ok'
+    else:
+        checks['media'] = 'error'
+
+    ready = all(status == 'ok' for status in checks.values())
+    return JsonResponse(
+        {'status': 'ok' if ready else 'error', 'checks': checks},
+        status=200 if ready else 503
+    )
@@ -0,0 +1,87 @@
+"""
+Прогрев процесса после старта: URLconf, шаблоны, кэши контента
+
+Вызывается из хуков gunicorn (gunicorn.conf.py), чтобы первые запросы
+к воркеру не платили за импорт views, компиляцию шаблонов и загрузку
+синглтонов.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.db import connections
+from django.http import HttpRequest
+from django.template import engines
+from django.template.loader import render_to_string
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / 'templates'
+
+
+def load_urlconf():
+    """Импортировать URLconf и все views"""
+    get_resolver().url_patterns
+
+
+def compile_templates():
+    """Скомпилировать все шаблоны лендинга в кэширующем загрузчике"""
+    engine = engines['django']
+    names = sorted(
+        path.relative_to(TEMPLATES_DIR).as_posix()
+        for path in TEMPLATES_DIR.rglob('*.html')
+    )
+    for name in names:
+        engine.get_template(name)
+    return len(names)
+
+
+def prime_caches():
+    """Загрузить синглтоны в память процесса, заполнить фрагменты секций и снимки API"""
+    from .api import ALL_RESOURCES, get_snapshot
+    from .models import SiteSettings, SoftwarePlatform
+    from .sections import SECTION_DEPENDENCIES, section_context
+    from .views import get_index_context
+
+    SiteSettings.get_settings()
+    SoftwarePlatform.get_platform()
+    # Без django.test: он тянет unittest в память каждого воркера
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = '/'
+    render_to_string('landing/index.html', get_index_context(), request=request)
+    for name in SECTION_DEPENDENCIES:
+        render_to_string(f'landing/sections/{name}.html', section_context(name), request=request)
+    # Снимок «всё» строит и снимки отдельных ресурсов API
+    get_snapshot(ALL_RESOURCES)
+
+
+def preload():
+    """Прогрев мастер-процесса до fork: результат наследуют все воркеры"""
+    started = time.perf_counter()
+    load_urlconf()
+    count = compile_templates()
+    # Соединения с БД не должны переходить в дочерние процессы
+    connections.close_all()
+    logger.info('Preload: %d templates in %.1f ms', count, (time.perf_counter() - started) * 1000)
+
+
+def warm_up():
+    """Прогрев воркера после fork"""
+    started = time.perf_counter()
+    load_urlconf()
+    compile_templates()
+    try:
+        prime_caches()
+    except Exception:
+        # Например, БД ещё не смигрирована — воркер всё равно должен стартовать
+        logger.exception('Warm-up: failed to prime caches')
+    finally:
+        connections.close_all()
+    # Поток уведомлений сразу подберёт заявки, оставшиеся от прежнего воркера
+    from .notifications import dispatcher
+    dispatcher.start()
+    from .memory import telemetry
+    telemetry.start()
+    logger.info('Warm-up done in %.1f ms', (time.perf_counter() - started) * 1000)
@@ -19,15 +19,25 @@ if [ ! -f .env ]; then
     exit 1
 fi
 
+# Сборка и миграции — до запуска: /readyz (healthcheck web, от него
+# зависят nginx и --wait) отвечает 503, пока нет файла базы контента
+echo "1. Сборка контейнеров..."
+docker compose build --no-cache
+
+echo "2. Применение миграций..."
+# Сначала база заявок: миграция базы контента переносит в неё заявки
+docker compose run --rm --no-deps -T web python manage.py migrate --database=leads --noinput
+docker compose run --rm --no-deps -T web python manage.py migrate --noinput
+
 # Проверка наличия SSL сертификата
 if [ ! -d "certbot/conf/live/$DOMAIN" ]; then
-    echo "1. SSL сертификат не найден, получаем..."
+    echo "3. SSL сертификат не найден, получаем..."
     
     # Используем временную конфигурацию nginx
     cp nginx/nginx-initial.conf nginx/nginx.conf
     
     # Запускаем контейнеры
-    docker compose up -d --build
+    docker compose up -d
     
     # Ждём запуска
     sleep 10
@@ -50,18 +60,11 @@ if [ ! -d "certbot/conf/live/$DOMAIN" ]; then
     
     echo "SSL сертификат получен!"
 else
-    echo "1. SSL сертификат уже существует"
+    echo "3. SSL сертификат уже существует"
 fi
 
-# Пересборка и запуск
-echo "2. Пересборка контейнеров..."
-docker compose build --no-cache
-
-echo "3. Запуск контейнеров..."
-docker compose up -d
-
-echo "4. Применение миграций..."
-docker compose exec -T web python manage.py migrate --noinput
+echo "4. Запуск контейнеров..."
+docker compose up -d --wait
 
 echo "5. Очистка..."
 docker system prune -f
@@ -0,0 +1,129 @@
+/**
+ * Арсенал — загрузка больших документов в админке по частям
+ *
+ * Файл отправляется частями (PUT + Content-Range) сразу после выбора.
+ * При обрыве связи загрузка продолжается с того смещения, которое
+ * вернёт сервер; после перезагрузки страницы — по ключу в localStorage.
+ */
+(function() {
+    'use strict';
+
+    const MAX_RETRIES = 5;
+
+    function getCookie(name) {
+        const match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
+    async function request(url, options) {
+        const response = await fetch(url, Object.assign({
+            credentials: 'same-origin',
+            headers: {}
+        }, options, {
+            headers: Object.assign({'X-CSRFToken': getCookie('csrftoken')}, options && options.headers)
+        }));
+        const data = await response.json().catch(() => ({}));
+        return {status: response.status, data: data};
+    }
+
+    async function resumeOrStart(uploadUrl, file, storageKey) {
+        const savedId = localStorage.getItem(storageKey);
+        if (savedId) {
+            const saved = await request(uploadUrl + savedId + '/', {method: 'GET'});
+            if (saved.status === 200) return saved.data;
+            localStorage.removeItem(storageKey);
+        }
+        const created = await request(uploadUrl, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({filename: file.name, size: file.size})
+        });
+        if (created.status !== 200) throw new Error(created.data.error || 'Не удалось начать загрузку');
+        localStorage.setItem(storageKey, created.data.id);
+        return created.data;
+    }
+
+    async function uploadFile(file, hidden, status) {
+        const uploadUrl = hidden.dataset.uploadUrl;
+        const chunkSize = parseInt(hidden.dataset.chunkSize, 10);
+        const storageKey = ['chunked-upload', file.name, file.size, file.lastModified].join(':');
+
+        let upload = await resumeOrStart(uploadUrl, file, storageKey);
+        let retries = 0;
+
+        while (!upload.stored_name) {
+            const start = upload.offset;
+            const end = Math.min(start + chunkSize, file.size);
+            status.textContent = 'Загрузка: ' + Math.floor(start / file.size * 100) + '%';
+            try {
+                const result = await request(uploadUrl + upload.id + '/', {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/octet-stream',
+                        'Content-Range': 'bytes ' + start + '-' + (end - 1) + '/' + file.size
+                    },
+                    body: file.slice(start, end)
+                });
+                if (result.status === 200) {
+                    upload = result.data;
+                    retries = 0;
+                } else if (result.status === 409 && result.data.offset !== null) {
+                    // Сервер уже получил часть данных — продолжаем с его смещения
+                    upload.offset = result.data.offset;
+                } else {
+                    throw new Error(result.data.error || 'Ошибка загрузки');
+                }
+            } catch (error) {
+                if (++retries > MAX_RETRIES) throw error;
+                status.textContent = 'Нет связи, повтор через ' + retries * 2 + ' с…';
+                await sleep(retries * 2000);
+                const current = await request(uploadUrl + upload.id + '/', {method: 'GET'});
+                if (current.status === 200) upload = current.data;
+            }
+        }
+
+        localStorage.removeItem(storageKey);
+        return upload;
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        const hidden = document.querySelector('input.chunked-upload-id');
+        const input = document.querySelector('input[type="file"][name="file"]');
+        if (!hidden || !input) return;
+
+        const form = input.form;
+        const status = document.createElement('div');
+        status.className = 'help';
+        input.parentNode.appendChild(status);
+        let uploading = false;
+
+        input.addEventListener('change', async function() {
+            const file = input.files[0];
+            if (!file) return;
+            uploading = true;
+            hidden.value = '';
+            try {
+                const upload = await uploadFile(file, hidden, status);
+                hidden.value = upload.id;
+                // Файл уже на сервере — не отправляем его повторно вместе с формой
+                input.value = '';
+                status.textContent = 'Файл загружен: ' + upload.filename;
+            } catch (error) {
+                status.textContent = error.message + '. Выберите файл снова, чтобы продолжить.';
+            } finally {
+                uploading = false;
+            }
+        });
+
+        form.addEventListener('submit', function(e) {
+            if (uploading) {
+                e.preventDefault();
+                status.textContent = 'Дождитесь окончания загрузки файла';
+            }
+        });
+    });
+})();
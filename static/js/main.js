@@ -21,6 +21,104 @@ function getCookie(name) {
     return cookieValue;
 }
 
+/**
+ * Scheduler
+ *
+ * - onScroll: one passive scroll listener; handlers run once per frame
+ *   (requestAnimationFrame) with the scroll position read once.
+ * - observe: IntersectionObservers are shared between all elements with
+ *   the same options; callbacks are kept in a per-element registry.
+ * - whenIdle: run non-critical initialisation when the main thread is idle.
+ */
+const Scheduler = (function() {
+    const scrollHandlers = [];
+    const observers = new Map();
+    let frameRequested = false;
+
+    function runScrollHandlers() {
+        frameRequested = false;
+        const state = {
+            y: window.scrollY,
+            maxY: document.documentElement.scrollHeight - window.innerHeight
+        };
+        scrollHandlers.forEach(handler => handler(state));
+    }
+
+    function requestFrame() {
+        if (frameRequested) return;
+        frameRequested = true;
+        requestAnimationFrame(runScrollHandlers);
+    }
+
+    function onScroll(handler) {
+        scrollHandlers.push(handler);
+        if (scrollHandlers.length === 1) {
+            window.addEventListener('scroll', requestFrame, { passive: true });
+            window.addEventListener('resize', requestFrame, { passive: true });
+        }
+        // Apply the initial state (page may be opened mid-scroll)
+        requestFrame();
+    }
+
+    function getObserver(options) {
+        const rootMargin = options.rootMargin || '0px';
+        const threshold = options.threshold || 0;
+        const key = rootMargin + '|' + threshold;
+
+        if (!observers.has(key)) {
+            const callbacks = new Map();
+            const observer = new IntersectionObserver(entries => {
+                entries.forEach(entry => {
+                    const list = callbacks.get(entry.target);
+                    if (list) list.slice().forEach(callback => callback(entry));
+                });
+            }, { rootMargin: rootMargin, threshold: threshold });
+            observers.set(key, { observer: observer, callbacks: callbacks });
+        }
+        return observers.get(key);
+    }
+
+    /**
+     * Call callback(entry) on every intersection change of element.
+     * Returns a function that stops observing.
+     */
+    function observe(element, callback, options) {
+        if (!('IntersectionObserver' in window)) {
+            // Treat as visible; async so the caller has its unobserve function
+            Promise.resolve().then(() => callback({ target: element, isIntersecting: true, intersectionRatio: 1 }));
+            return function() {};
+        }
+
+        const shared = getObserver(options || {});
+        if (!shared.callbacks.has(element)) {
+            shared.callbacks.set(element, []);
+            shared.observer.observe(element);
+        }
+        shared.callbacks.get(element).push(callback);
+
+        return function unobserve() {
+            const list = shared.callbacks.get(element);
+            if (!list) return;
+            const index = list.indexOf(callback);
+            if (index !== -1) list.splice(index, 1);
+            if (!list.length) {
+                shared.callbacks.delete(element);
+                shared.observer.unobserve(element);
+            }
+        };
+    }
+
+    function whenIdle(task) {
+        if ('requestIdleCallback' in window) {
+            requestIdleCallback(task, { timeout: 2000 });
+        } else {
+            setTimeout(task, 200);
+        }
+    }
+
+    return { onScroll: onScroll, observe: observe, whenIdle: whenIdle };
+})();
+
 document.addEventListener('DOMContentLoaded', function() {
     // Initialize Preloader
     initPreloader();
@@ -34,14 +132,6 @@ document.addEventListener('DOMContentLoaded', function() {
         disable: 'mobile'
     });
 
-    // Initialize GLightbox for gallery
-    const lightbox = GLightbox({
-        selector: '.glightbox',
-        touchNavigation: true,
-        loop: true,
-        closeButton: true
-    });
-
     // Mobile Navigation Toggle
     initMobileNav();
 
@@ -51,28 +141,90 @@ document.addEventListener('DOMContentLoaded', function() {
     // Navbar scroll effect
     initNavbarScroll();
 
-    // Document Filter
-    initDocumentFilter();
+    // Sections below the fold (specs, software, documents)
+    initLazySections();
 
     // Contact Form
     initContactForm();
 
-    // Typing effect for terminal (optional enhancement)
-    initTerminalEffect();
-    
     // UX Enhancements
     initScrollProgress();
     initBackToTop();
-    initFloatingContact();
     initSectionReveal();
     initActiveNavigation();
-    initImageLazyLoad();
-    initRealTimeValidation();
     
     // Cookie Banner
     initCookieBanner();
+
+    // Non-critical widgets: initialise when the main thread is idle
+    Scheduler.whenIdle(() => {
+        initLightbox();
+        initFloatingContact();
+        initImageLazyLoad();
+        initRealTimeValidation();
+        animateCounters();
+    });
 });
 
+/**
+ * Gallery Lightbox
+ */
+let lightbox = null;
+
+function initLightbox() {
+    if (!window.GLightbox) return;
+    // The grid shows thumbnails only; the full image is fetched when its
+    // slide opens, and preload fetches the neighbouring slides
+    lightbox = GLightbox({
+        selector: '.glightbox',
+        touchNavigation: true,
+        loop: true,
+        closeButton: true,
+        preload: true
+    });
+}
+
+/**
+ * Gallery: "show more" loads the next keyset page (X-Next-Page)
+ */
+function initGallery() {
+    const section = document.getElementById('gallery');
+    if (!section) return;
+    const grid = section.querySelector('.gallery-grid');
+    const button = section.querySelector('[data-next-url]');
+
+    initImageLazyLoad(section);
+    // Before idle the lightbox doesn't exist yet and will pick the items up itself
+    if (lightbox) lightbox.reload();
+    if (!grid || !button) return;
+
+    button.addEventListener('click', function() {
+        button.disabled = true;
+        fetch(button.dataset.nextUrl, {credentials: 'same-origin'})
+            .then(response => {
+                if (!response.ok) throw new Error(response.status);
+                return response.text().then(html => ({html, next: response.headers.get('X-Next-Page')}));
+            })
+            .then(({html, next}) => {
+                const page = document.createElement('template');
+                page.innerHTML = html;
+                const items = Array.from(page.content.children);
+                grid.append(...items);
+                items.forEach(item => initImageLazyLoad(item));
+                if (lightbox) lightbox.reload();
+                if (next) {
+                    button.dataset.nextUrl = next;
+                    button.disabled = false;
+                } else {
+                    button.parentElement.remove();
+                }
+            })
+            .catch(() => {
+                button.disabled = false;
+            });
+    });
+}
+
 /**
  * Mobile Navigation
  */
@@ -116,15 +268,78 @@ function initSmoothScroll() {
             const target = document.querySelector(href);
             if (target) {
                 e.preventDefault();
-                target.scrollIntoView({
-                    behavior: 'smooth',
-                    block: 'start'
+                // Load the sections above the target first so it doesn't shift while scrolling
+                loadSectionsBefore(target).then(() => {
+                    target.scrollIntoView({
+                        behavior: 'smooth',
+                        block: 'start'
+                    });
                 });
             }
         });
     });
 }
 
+/**
+ * Lazy-loaded Sections
+ *
+ * Placeholders carry data-fragment-url; the fragment is fetched shortly
+ * before the placeholder scrolls into view. Fragments are cached by the
+ * browser and revalidated with ETag.
+ */
+const sectionRequests = new Map();
+
+function loadSection(placeholder) {
+    if (sectionRequests.has(placeholder)) return sectionRequests.get(placeholder);
+
+    const request = fetch(placeholder.dataset.fragmentUrl, {credentials: 'same-origin'})
+        .then(response => {
+            if (!response.ok) throw new Error(response.status);
+            return response.text();
+        })
+        .then(html => {
+            placeholder.innerHTML = html;
+            placeholder.classList.add('loaded');
+            onSectionLoaded(placeholder.dataset.section);
+        })
+        .catch(() => {
+            // Try again next time the placeholder comes into view
+            sectionRequests.delete(placeholder);
+        });
+    sectionRequests.set(placeholder, request);
+    return request;
+}
+
+function loadSectionsBefore(target) {
+    const pending = [];
+    document.querySelectorAll('.lazy-section:not(.loaded)').forEach(placeholder => {
+        const position = target.compareDocumentPosition(placeholder);
+        if (position & (Node.DOCUMENT_POSITION_PRECEDING | Node.DOCUMENT_POSITION_CONTAINED_BY)) {
+            pending.push(loadSection(placeholder));
+        }
+    });
+    return Promise.all(pending);
+}
+
+function initLazySections() {
+    document.querySelectorAll('.lazy-section').forEach(placeholder => {
+        const unobserve = Scheduler.observe(placeholder, entry => {
+            if (!entry.isIntersecting) return;
+            loadSection(placeholder).then(() => {
+                if (placeholder.classList.contains('loaded')) unobserve();
+            });
+        }, { rootMargin: '600px 0px' });
+    });
+}
+
+function onSectionLoaded(name) {
+    if (name === 'specs') initTerminalEffect();
+    if (name === 'documents') initDocumentFilter();
+    if (name === 'gallery') initGallery();
+    // New [data-aos] elements need their offsets computed
+    if (window.AOS) AOS.refreshHard();
+}
+
 /**
  * Navbar Scroll Effect
  */
@@ -133,24 +348,19 @@ function initNavbarScroll() {
     if (!nav) return;
 
     let lastScroll = 0;
+    let hidden = false;
 
-    window.addEventListener('scroll', () => {
-        const currentScroll = window.pageYOffset;
-
+    Scheduler.onScroll(({ y }) => {
         // Add/remove scrolled class
-        if (currentScroll > 50) {
-            nav.classList.add('scrolled');
-        } else {
-            nav.classList.remove('scrolled');
-        }
+        nav.classList.toggle('scrolled', y > 50);
 
-        // Hide/show on scroll direction (optional)
-        if (currentScroll > lastScroll && currentScroll > 200) {
-            nav.style.transform = 'translateY(-100%)';
-        } else {
-            nav.style.transform = 'translateY(0)';
+        // Hide/show on scroll direction (optional); write only on change
+        const hide = y > lastScroll && y > 200;
+        if (hide !== hidden) {
+            nav.style.transform = hide ? 'translateY(-100%)' : 'translateY(0)';
+            hidden = hide;
         }
-        lastScroll = currentScroll;
+        lastScroll = y;
     });
 }
 
@@ -426,21 +636,17 @@ document.head.appendChild(style);
  */
 function initScrollAnimations() {
     const observerOptions = {
-        root: null,
         rootMargin: '0px',
         threshold: 0.1
     };
 
-    const observer = new IntersectionObserver((entries) => {
-        entries.forEach(entry => {
+    document.querySelectorAll('.animate-on-scroll').forEach(el => {
+        const unobserve = Scheduler.observe(el, entry => {
             if (entry.isIntersecting) {
                 entry.target.classList.add('visible');
+                unobserve();
             }
-        });
-    }, observerOptions);
-
-    document.querySelectorAll('.animate-on-scroll').forEach(el => {
-        observer.observe(el);
+        }, observerOptions);
     });
 }
 
@@ -470,20 +676,15 @@ function animateCounters() {
         };
         
         // Start animation when element is in view
-        const observer = new IntersectionObserver((entries) => {
-            if (entries[0].isIntersecting) {
+        const unobserve = Scheduler.observe(counter, entry => {
+            if (entry.isIntersecting) {
+                unobserve();
                 updateCounter();
-                observer.disconnect();
             }
         });
-        
-        observer.observe(counter);
     });
 }
 
-// Initialize counter animation
-document.addEventListener('DOMContentLoaded', animateCounters);
-
 /**
  * Preloader Handler
  */
@@ -520,12 +721,10 @@ function initScrollProgress() {
     const progressBar = document.querySelector('.scroll-progress');
     if (!progressBar) return;
     
-    window.addEventListener('scroll', () => {
-        const scrollTop = window.scrollY;
-        const docHeight = document.documentElement.scrollHeight - window.innerHeight;
-        const scrollPercent = (scrollTop / docHeight) * 100;
-        
-        progressBar.style.width = scrollPercent + '%';
+    // transform instead of width: no layout on every frame
+    Scheduler.onScroll(({ y, maxY }) => {
+        const ratio = maxY > 0 ? Math.min(y / maxY, 1) : 0;
+        progressBar.style.transform = 'scaleX(' + ratio + ')';
     });
 }
 
@@ -537,12 +736,8 @@ function initBackToTop() {
     if (!btn) return;
     
     // Show/hide based on scroll position
-    window.addEventListener('scroll', () => {
-        if (window.scrollY > 500) {
-            btn.classList.add('visible');
-        } else {
-            btn.classList.remove('visible');
-        }
+    Scheduler.onScroll(({ y }) => {
+        btn.classList.toggle('visible', y > 500);
     });
     
     // Scroll to top on click
@@ -578,8 +773,8 @@ function initFloatingContact() {
     // Hide when scrolling to contact section
     const contactSection = document.getElementById('contacts');
     if (contactSection) {
-        const observer = new IntersectionObserver((entries) => {
-            if (entries[0].isIntersecting) {
+        Scheduler.observe(contactSection, entry => {
+            if (entry.isIntersecting) {
                 menu.style.opacity = '0.3';
                 menu.style.pointerEvents = 'none';
             } else {
@@ -587,8 +782,6 @@ function initFloatingContact() {
                 menu.style.pointerEvents = 'auto';
             }
         }, { threshold: 0.5 });
-        
-        observer.observe(contactSection);
     }
 }
 
@@ -599,21 +792,17 @@ function initSectionReveal() {
     const sections = document.querySelectorAll('.section');
     
     const observerOptions = {
-        root: null,
         rootMargin: '-50px',
         threshold: 0.1
     };
     
-    const observer = new IntersectionObserver((entries) => {
-        entries.forEach(entry => {
+    sections.forEach(section => {
+        const unobserve = Scheduler.observe(section, entry => {
             if (entry.isIntersecting) {
                 entry.target.classList.add('visible');
+                unobserve();
             }
-        });
-    }, observerOptions);
-    
-    sections.forEach(section => {
-        observer.observe(section);
+        }, observerOptions);
     });
 }
 
@@ -627,36 +816,27 @@ function initActiveNavigation() {
     if (!sections.length || !navLinks.length) return;
     
     const observerOptions = {
-        root: null,
         rootMargin: '-30% 0px -70% 0px',
         threshold: 0
     };
     
-    const observer = new IntersectionObserver((entries) => {
-        entries.forEach(entry => {
-            if (entry.isIntersecting) {
-                const id = entry.target.getAttribute('id');
-                
-                navLinks.forEach(link => {
-                    link.classList.remove('active');
-                    if (link.getAttribute('href') === '#' + id) {
-                        link.classList.add('active');
-                    }
-                });
-            }
-        });
-    }, observerOptions);
-    
     sections.forEach(section => {
-        observer.observe(section);
+        Scheduler.observe(section, entry => {
+            if (!entry.isIntersecting) return;
+            const id = entry.target.getAttribute('id');
+            
+            navLinks.forEach(link => {
+                link.classList.toggle('active', link.getAttribute('href') === '#' + id);
+            });
+        }, observerOptions);
     });
 }
 
 /**
  * Lazy Load Images with Fade Effect
  */
-function initImageLazyLoad() {
-    const images = document.querySelectorAll('.gallery-item img, .about-image img');
+function initImageLazyLoad(root = document) {
+    const images = root.querySelectorAll('.gallery-item img, .about-image img');
     
     images.forEach(img => {
         // Add skeleton class while loading
@@ -812,19 +992,21 @@ function showToast(message, type = 'success') {
 
 /**
  * Download Document with Progress Feedback
+ * (delegated: the documents section is loaded after the page)
  */
-document.querySelectorAll('.doc-download').forEach(link => {
-    link.addEventListener('click', function() {
-        const icon = this.querySelector('svg');
-        if (icon) {
-            icon.style.animation = 'pulse 0.5s ease';
-            setTimeout(() => {
-                icon.style.animation = '';
-            }, 500);
-        }
-        
-        showToast('Загрузка документа началась...', 'success');
-    });
+document.addEventListener('click', function(e) {
+    const link = e.target.closest('.doc-download');
+    if (!link) return;
+
+    const icon = link.querySelector('svg');
+    if (icon) {
+        icon.style.animation = 'pulse 0.5s ease';
+        setTimeout(() => {
+            icon.style.animation = '';
+        }, 500);
+    }
+
+    showToast('Загрузка документа началась...', 'success');
 });
 
 /**